@@ -0,0 +1,141 @@
+"""Recall vs. memory of the corpus storage options.
+
+Builds the corpus once per storage configuration (quantization and
+Matryoshka truncation, see CORPUS_QUANTIZATION / CORPUS_DIMENSIONS) and
+compares search results with exact float32 brute force. Held-out corpus rows
+serve as queries. Runs against the real corpus pickle or a synthetic one:
+
+    python -m backend.benchmarks.corpus_recall --pickle backend/resume_embeddings.pkl
+    python -m backend.benchmarks.corpus_recall --synthetic 20000 --dim 3072
+"""
+
+import argparse
+import json
+import os
+import pickle
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from backend.main import CorpusSegment, SegmentedCorpus, normalize_rows, write_corpus_files
+
+DEFAULT_CONFIGS = "float32,float16,int8,float32@1024,float32@512,int8@1024,int8@512,int8@256"
+
+
+def synthetic_embeddings(size: int, dim: int, seed: int = 0, clusters: int = 64) -> np.ndarray:
+    """Clustered unit vectors whose variance decays across dimensions, like Matryoshka embeddings"""
+    rng = np.random.default_rng(seed)
+    decay = 1.0 / np.sqrt(1.0 + np.arange(dim) / 32.0)
+    centers = rng.standard_normal((clusters, dim)) * decay
+    rows = centers[rng.integers(clusters, size=size)] + 0.6 * rng.standard_normal((size, dim)) * decay
+    return normalize_rows(rows.astype(np.float32))
+
+
+def load_pickle_embeddings(path: str) -> np.ndarray:
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    return normalize_rows(embeddings.reshape(len(embeddings), -1))
+
+
+def parse_config(spec: str) -> Tuple[str, int]:
+    quantization, _, dimensions = spec.partition("@")
+    return quantization, int(dimensions or 0)
+
+
+def scan_bytes(segment: CorpusSegment) -> int:
+    """Bytes that have to stay in memory for fast scans"""
+    return segment.embeddings.nbytes + (segment.scales.nbytes if segment.scales is not None else 0)
+
+
+def recall(found: List[List[int]], truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len(set(rows) & set(expected)) / k for rows, expected in zip(found, truth.tolist())]))
+
+
+def evaluate_config(spec: str, index: np.ndarray, queries: np.ndarray, truth: np.ndarray,
+                    rerank_depth: int, workdir: str) -> Dict:
+    quantization, dimensions = parse_config(spec)
+    directory = os.path.join(workdir, spec.replace("@", "_"))
+    texts = [str(i) for i in range(len(index))]
+    write_corpus_files(directory, index, texts, {}, quantization=quantization, dimensions=dimensions)
+
+    corpus = SegmentedCorpus(os.path.join(workdir, "no-segments"), rerank_depth=rerank_depth)
+    corpus.set_base(directory)
+    k = truth.shape[1]
+
+    report = {
+        "config": spec,
+        "quantization": quantization,
+        "dimensions": corpus.base.dim,
+        "scan_bytes": scan_bytes(corpus.base),
+        "compression": round(index.nbytes / scan_bytes(corpus.base), 2),
+    }
+    depths = [0] if corpus.base.exact else [0, rerank_depth]
+    for depth in depths:
+        started = time.perf_counter()
+        found = [[row for _, _, row in corpus.top_rows(query, k, rerank_depth=depth)] for query in queries]
+        elapsed = time.perf_counter() - started
+        label = "rerank" if depth else "scan"
+        report[f"recall@{k}_{label}"] = round(recall(found, truth), 4)
+        report[f"query_ms_{label}"] = round(1000 * elapsed / len(queries), 3)
+    return report
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Recall vs. memory of quantized / truncated corpus storage")
+    parser.add_argument("--pickle", help="corpus pickle in the embed_resumes.py layout")
+    parser.add_argument("--synthetic", type=int, default=5000, help="synthetic corpus rows when no pickle is given")
+    parser.add_argument("--dim", type=int, default=3072, help="synthetic embedding dimensions")
+    parser.add_argument("--queries", type=int, default=200, help="held-out rows used as queries")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-depth", type=int, default=100)
+    parser.add_argument("--configs", default=DEFAULT_CONFIGS,
+                        help="comma-separated quantization[@dimensions] specs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict:
+    args = parse_args(argv)
+    if args.pickle:
+        embeddings = load_pickle_embeddings(args.pickle)
+    else:
+        embeddings = synthetic_embeddings(args.synthetic + args.queries, args.dim, args.seed)
+
+    rng = np.random.default_rng(args.seed)
+    order = rng.permutation(len(embeddings))
+    queries = embeddings[order[:args.queries]]
+    index = np.ascontiguousarray(embeddings[np.sort(order[args.queries:])])
+
+    exact = queries @ index.T
+    truth = np.argsort(-exact, axis=1)[:, :args.k]
+
+    with tempfile.TemporaryDirectory(prefix="corpus-recall-") as workdir:
+        results = [
+            evaluate_config(spec, index, queries, truth, args.rerank_depth, workdir)
+            for spec in args.configs.split(",") if spec
+        ]
+
+    report = {
+        "corpus_rows": len(index),
+        "full_dimensions": index.shape[1],
+        "float32_bytes": index.nbytes,
+        "queries": len(queries),
+        "k": args.k,
+        "rerank_depth": args.rerank_depth,
+        "source": args.pickle or f"synthetic:{args.synthetic}x{args.dim}",
+        "results": results,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
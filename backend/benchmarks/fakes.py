@@ -0,0 +1,883 @@
+"""Local stand-ins for the external services the backend talks to.
+
+Everything here runs offline on localhost so the real FastAPI app can be
+benchmarked (and tested) without spending money:
+
+- FakeOpenAIServer: chat completions and embeddings with configurable
+  latency distributions and canned responses, plus the files and batches
+  endpoints of the Batch API (OPENAI_BASE_URL).
+- FakeFirebaseAuthServer: the identitytoolkit REST calls used by
+  firebase_admin.auth (FIREBASE_AUTH_EMULATOR_HOST).
+- FakeFirestoreServer: the gRPC Firestore methods used by
+  google-cloud-firestore (FIRESTORE_EMULATOR_HOST).
+- SMTPSink: an SMTP server with STARTTLS and AUTH that keeps every message.
+"""
+
+import base64
+import datetime
+import email.parser
+import email.policy
+import hashlib
+import json
+import os
+import random
+import socket
+import socketserver
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class LatencyModel:
+    """Latency distribution parsed from a spec string (all values in seconds).
+
+    Supported specs: "0", "fixed:0.2", "uniform:0.1:0.5", "normal:0.3:0.05",
+    "lognormal:0.3:0.5" (median, sigma) and "exp:0.2" (mean).
+    """
+
+    def __init__(self, spec: str = "0", seed: Optional[int] = None):
+        self.spec = spec
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        parts = str(spec).split(":")
+        try:
+            if len(parts) == 1:
+                self.kind, self.params = "fixed", [float(parts[0])]
+            else:
+                self.kind, self.params = parts[0], [float(p) for p in parts[1:]]
+        except ValueError:
+            raise ValueError(f"Invalid latency spec: {spec}")
+        if self.kind not in ("fixed", "uniform", "normal", "lognormal", "exp"):
+            raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+    def sample(self) -> float:
+        with self._lock:
+            if self.kind == "fixed":
+                value = self.params[0]
+            elif self.kind == "uniform":
+                value = self._rng.uniform(self.params[0], self.params[1])
+            elif self.kind == "normal":
+                value = self._rng.gauss(self.params[0], self.params[1])
+            elif self.kind == "lognormal":
+                value = self.params[0] * float(np.exp(self._rng.gauss(0.0, self.params[1])))
+            else:
+                value = self._rng.expovariate(1.0 / self.params[0]) if self.params[0] > 0 else 0.0
+        return max(value, 0.0)
+
+    def wait(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def generate_private_key_pem() -> str:
+    """Throwaway RSA key so service-account credentials can be built offline."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode("ascii")
+
+
+class _JSONHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, owner, port: int):
+        self.owner = owner
+        super().__init__(("127.0.0.1", port), _JSONRequestHandler)
+
+
+class _JSONRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _handle(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        content_type = self.headers.get("Content-Type", "")
+        try:
+            if content_type.startswith("multipart/form-data"):
+                body = parse_multipart(content_type, raw)
+            else:
+                body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+        status, payload = self.server.owner.handle(method, self.path, body, self.headers)
+        if isinstance(payload, (bytes, bytearray)):
+            data, content_type = bytes(payload), "application/octet-stream"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def parse_multipart(content_type: str, raw: bytes) -> Dict:
+    """Form fields of a multipart body: text values as str, file uploads as bytes"""
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + raw
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        payload = part.get_payload(decode=True)
+        fields[name] = payload if part.get_filename() else payload.decode("utf-8")
+    return fields
+
+
+class _HTTPFake:
+    """Base class for the JSON-over-HTTP stand-ins."""
+
+    def __init__(self, port: int = 0):
+        self.port = port or free_port()
+        self.calls: Dict[str, int] = {}
+        self._calls_lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}"
+
+    def count(self, route: str):
+        with self._calls_lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+
+    def handle(self, method: str, path: str, body: Dict, headers):
+        raise NotImplementedError
+
+    def start(self):
+        self._server = _JSONHTTPServer(self, self.port)
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+DEFAULT_SKILLS = ["Python", "FastAPI", "PostgreSQL", "Docker", "AWS", "React", "Git", "REST API"]
+
+DEFAULT_CANNED = {
+    "skills": json.dumps(DEFAULT_SKILLS),
+    "name": "Alex Morgan",
+    "skill_match": json.dumps({
+        "match_score": 82.0,
+        "matching_skills": DEFAULT_SKILLS[:6],
+        "missing_skills": DEFAULT_SKILLS[6:],
+    }),
+    "job_role": "Software Engineer",
+    "summary": "Experienced software engineer with a strong backend background and hands-on cloud delivery.",
+    "default": "OK",
+}
+
+
+def classify_prompt(messages: List[Dict]) -> str:
+    """Map a chat request onto one of the backend's prompt kinds."""
+    text = " ".join(str(m.get("content", "")) for m in messages)
+    if "JSON array of skills" in text:
+        return "skills"
+    if "candidate's full name" in text:
+        return "name"
+    if "match_score" in text:
+        return "skill_match"
+    if "suitable job title" in text:
+        return "job_role"
+    if "professional summary" in text:
+        return "summary"
+    return "default"
+
+
+class FakeOpenAIServer(_HTTPFake):
+    """Chat completions, embeddings and Batch API endpoints of the OpenAI API.
+
+    Embeddings are deterministic per input: a shared base direction plus
+    hash-seeded noise, so resumes and JDs land at a realistic cosine similarity
+    (about 1 / (1 + noise**2)).
+
+    Batches run through the same handlers once `batch_latency` seconds have
+    passed, on the first retrieve after that. Requests whose custom id ends
+    with one of `batch_failures` get an error line instead of a response.
+    """
+
+    def __init__(self, port: int = 0, chat_latency: str = "0", embedding_latency: str = "0",
+                 canned: Optional[Dict[str, str]] = None, embedding_dim: int = 3072,
+                 embedding_noise: float = 0.5, seed: int = 0, batch_latency: float = 0.0,
+                 batch_failures: Tuple[str, ...] = ()):
+        super().__init__(port)
+        self.chat_latency = LatencyModel(chat_latency, seed)
+        self.embedding_latency = LatencyModel(embedding_latency, seed + 1)
+        self.canned = dict(DEFAULT_CANNED, **(canned or {}))
+        self.embedding_dim = embedding_dim
+        self.embedding_noise = embedding_noise
+        self.batch_latency = batch_latency
+        self.batch_failures = tuple(batch_failures)
+        self.files: Dict[str, bytes] = {}
+        self.batches: Dict[str, Dict] = {}
+        self._batch_lock = threading.Lock()
+        self._base = np.random.default_rng(seed).standard_normal(embedding_dim).astype(np.float32)
+        self._base /= np.linalg.norm(self._base)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def embed(self, text: str, dimensions: Optional[int] = None) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        noise = np.random.default_rng(seed).standard_normal(self.embedding_dim).astype(np.float32)
+        noise *= self.embedding_noise / np.sqrt(self.embedding_dim)
+        vector = self._base + noise
+        if dimensions:
+            vector = vector[:dimensions]
+        return vector / np.linalg.norm(vector)
+
+    def handle(self, method, path, body, headers):
+        path = path.split("?")[0]
+        if method == "POST" and path.endswith("/chat/completions"):
+            self.count("chat")
+            return 200, self.chat_completion(body)
+        if method == "POST" and path.endswith("/embeddings"):
+            self.count("embeddings")
+            self.embedding_latency.wait()
+            return 200, self.embeddings(body)
+        if method == "POST" and path.endswith("/files"):
+            self.count("files")
+            return 200, self.store_file(body["file"], body.get("purpose", "batch"))
+        if method == "GET" and path.endswith("/content") and "/files/" in path:
+            file_id = path.split("/")[-2]
+            if file_id not in self.files:
+                return 404, {"error": {"message": f"No such file {file_id}", "type": "invalid_request_error"}}
+            return 200, self.files[file_id]
+        if method == "POST" and path.endswith("/batches"):
+            self.count("batches")
+            return 200, self.create_batch(body)
+        if method == "GET" and "/batches/" in path:
+            batch = self.retrieve_batch(path.rsplit("/", 1)[-1])
+            if batch is None:
+                return 404, {"error": {"message": "No such batch", "type": "invalid_request_error"}}
+            return 200, batch
+        return 404, {"error": {"message": f"Unknown route {method} {path}", "type": "invalid_request_error"}}
+
+    def store_file(self, data: bytes, purpose: str) -> Dict:
+        file_id = f"file-{uuid.uuid4().hex[:24]}"
+        self.files[file_id] = data
+        return {"id": file_id, "object": "file", "bytes": len(data), "created_at": int(time.time()),
+                "filename": "requests.jsonl", "purpose": purpose, "status": "processed"}
+
+    def create_batch(self, body: Dict) -> Dict:
+        batch = {
+            "id": f"batch_{uuid.uuid4().hex[:24]}",
+            "object": "batch",
+            "endpoint": body["endpoint"],
+            "input_file_id": body["input_file_id"],
+            "completion_window": body.get("completion_window", "24h"),
+            "status": "validating",
+            "created_at": int(time.time()),
+            "output_file_id": None,
+            "error_file_id": None,
+            "errors": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+        }
+        with self._batch_lock:
+            self.batches[batch["id"]] = batch
+        return batch
+
+    def retrieve_batch(self, batch_id: str) -> Optional[Dict]:
+        with self._batch_lock:
+            batch = self.batches.get(batch_id)
+            if batch and batch["status"] == "validating" and time.time() - batch["created_at"] >= self.batch_latency:
+                self.run_batch(batch)
+            return dict(batch) if batch else None
+
+    def run_batch(self, batch: Dict):
+        outputs, errors = [], []
+        for line in self.files[batch["input_file_id"]].splitlines():
+            request = json.loads(line)
+            custom_id = request["custom_id"]
+            if custom_id.endswith(self.batch_failures):
+                errors.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": custom_id, "response": None,
+                               "error": {"code": "server_error", "message": "Injected failure"}})
+                continue
+            self.count("batch_requests")
+            if request["url"].endswith("/embeddings"):
+                response = self.embeddings(request["body"])
+            else:
+                response = self.chat_completion(request["body"])
+            outputs.append({"id": f"batch_req_{uuid.uuid4().hex[:12]}", "custom_id": custom_id,
+                            "response": {"status_code": 200, "request_id": uuid.uuid4().hex, "body": response},
+                            "error": None})
+
+        def jsonl(rows):
+            return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+        batch["output_file_id"] = self.store_file(jsonl(outputs), "batch_output")["id"]
+        if errors:
+            batch["error_file_id"] = self.store_file(jsonl(errors), "batch_output")["id"]
+        batch["request_counts"] = {"total": len(outputs) + len(errors), "completed": len(outputs),
+                                   "failed": len(errors)}
+        batch["status"] = "completed"
+        batch["completed_at"] = int(time.time())
+
+    def chat_completion(self, body: Dict) -> Dict:
+        kind = classify_prompt(body.get("messages", []))
+        self.count(f"chat:{kind}")
+        self.chat_latency.wait()
+        content = self.canned.get(kind, self.canned["default"])
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-3.5-turbo"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+        }
+
+    def embeddings(self, body: Dict) -> Dict:
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        as_base64 = body.get("encoding_format") == "base64"
+        data = []
+        for index, text in enumerate(inputs):
+            vector = self.embed(str(text), body.get("dimensions"))
+            if as_base64:
+                embedding = base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+            else:
+                embedding = vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+        tokens = sum(len(str(text)) // 4 for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-3-large"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+
+class FakeFirebaseAuthServer(_HTTPFake):
+    """The identitytoolkit account endpoints used by firebase_admin.auth."""
+
+    def __init__(self, port: int = 0, latency: str = "0", seed: int = 0):
+        super().__init__(port)
+        self.latency = LatencyModel(latency, seed)
+        self.users: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def handle(self, method, path, body, headers):
+        self.latency.wait()
+        path = path.split("?")[0]
+        if method == "POST" and path.endswith("/accounts"):
+            self.count("create_user")
+            return self.create_user(body)
+        if method == "POST" and path.endswith("/accounts:lookup"):
+            self.count("lookup")
+            return 200, {"kind": "identitytoolkit#GetAccountInfoResponse", "users": self.lookup(body)}
+        return 404, {"error": {"code": 404, "message": "NOT_FOUND"}}
+
+    def create_user(self, body: Dict):
+        with self._lock:
+            email = body.get("email")
+            if email and any(u.get("email") == email for u in self.users.values()):
+                return 400, {"error": {"code": 400, "message": "EMAIL_EXISTS"}}
+            uid = body.get("localId") or uuid.uuid4().hex[:28]
+            user = {key: value for key, value in body.items() if key != "password"}
+            user.update({"localId": uid, "createdAt": str(int(time.time() * 1000))})
+            self.users[uid] = user
+        return 200, {"kind": "identitytoolkit#SignupNewUserResponse", "localId": uid}
+
+    def lookup(self, body: Dict) -> List[Dict]:
+        with self._lock:
+            found = []
+            for uid in body.get("localId", []):
+                if uid in self.users:
+                    found.append(self.users[uid])
+            emails = set(body.get("email", []))
+            if emails:
+                found.extend(u for u in self.users.values() if u.get("email") in emails)
+            return found
+
+
+class FakeFirestoreServer:
+    """In-memory gRPC Firestore covering get/get_all, set/batch writes and equality/`in` queries."""
+
+    SERVICE = "google.firestore.v1.Firestore"
+
+    def __init__(self, port: int = 0, latency: str = "0", seed: int = 0, max_workers: int = 32):
+        self.port = port or free_port()
+        self.latency = LatencyModel(latency, seed)
+        self.documents: Dict[str, object] = {}
+        self.calls: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._max_workers = max_workers
+
+    @property
+    def host(self) -> str:
+        return f"127.0.0.1:{self.port}"
+
+    def _count(self, method: str):
+        with self._lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+    def start(self):
+        import grpc
+        from google.cloud.firestore_v1.types import firestore as firestore_pb
+
+        handlers = {
+            "BatchGetDocuments": grpc.unary_stream_rpc_method_handler(
+                self.batch_get_documents,
+                request_deserializer=firestore_pb.BatchGetDocumentsRequest.deserialize,
+                response_serializer=firestore_pb.BatchGetDocumentsResponse.serialize,
+            ),
+            "Commit": grpc.unary_unary_rpc_method_handler(
+                self.commit,
+                request_deserializer=firestore_pb.CommitRequest.deserialize,
+                response_serializer=firestore_pb.CommitResponse.serialize,
+            ),
+            "BatchWrite": grpc.unary_unary_rpc_method_handler(
+                self.batch_write,
+                request_deserializer=firestore_pb.BatchWriteRequest.deserialize,
+                response_serializer=firestore_pb.BatchWriteResponse.serialize,
+            ),
+            "RunQuery": grpc.unary_stream_rpc_method_handler(
+                self.run_query,
+                request_deserializer=firestore_pb.RunQueryRequest.deserialize,
+                response_serializer=firestore_pb.RunQueryResponse.serialize,
+            ),
+        }
+        self._server = grpc.server(ThreadPoolExecutor(max_workers=self._max_workers))
+        self._server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(self.SERVICE, handlers),))
+        self._server.add_insecure_port(self.host)
+        self._server.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.stop(grace=None)
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @staticmethod
+    def _now():
+        return datetime.datetime.now(datetime.timezone.utc)
+
+    def batch_get_documents(self, request, context):
+        from google.cloud.firestore_v1.types import firestore as firestore_pb
+
+        self._count("BatchGetDocuments")
+        self.latency.wait()
+        now = self._now()
+        for name in request.documents:
+            with self._lock:
+                document = self.documents.get(name)
+            if document is not None:
+                yield firestore_pb.BatchGetDocumentsResponse(found=document, read_time=now)
+            else:
+                yield firestore_pb.BatchGetDocumentsResponse(missing=name, read_time=now)
+
+    def _apply_write(self, write, now):
+        from google.cloud.firestore_v1.types import document as document_pb, write as write_pb
+
+        operation = write_pb.Write.pb(write).WhichOneof("operation")
+        if operation == "delete":
+            with self._lock:
+                self.documents.pop(write.delete, None)
+            return
+        if operation != "update":
+            return
+
+        name = write.update.name
+        with self._lock:
+            existing = self.documents.get(name)
+            if write_pb.Write.pb(write).HasField("current_document"):
+                precondition = write.current_document
+                if precondition.exists is False and existing is not None:
+                    raise KeyError(name)
+            fields = {}
+            if existing is not None and write_pb.Write.pb(write).HasField("update_mask"):
+                fields.update(existing.fields)
+                for path in write.update_mask.field_paths:
+                    fields.pop(path, None)
+            fields.update(write.update.fields)
+            for transform in write.update_transforms:
+                fields[transform.field_path] = document_pb.Value(timestamp_value=now)
+            self.documents[name] = document_pb.Document(
+                name=name,
+                fields=fields,
+                create_time=existing.create_time if existing is not None else now,
+                update_time=now,
+            )
+
+    def commit(self, request, context):
+        import grpc
+        from google.cloud.firestore_v1.types import firestore as firestore_pb, write as write_pb
+
+        self._count("Commit")
+        self.latency.wait()
+        now = self._now()
+        for write in request.writes:
+            try:
+                self._apply_write(write, now)
+            except KeyError as e:
+                context.abort(grpc.StatusCode.ALREADY_EXISTS, f"Document already exists: {e}")
+        return firestore_pb.CommitResponse(
+            write_results=[write_pb.WriteResult(update_time=now) for _ in request.writes],
+            commit_time=now,
+        )
+
+    def batch_write(self, request, context):
+        from google.cloud.firestore_v1.types import firestore as firestore_pb, write as write_pb
+        from google.rpc import status_pb2
+
+        self._count("BatchWrite")
+        self.latency.wait()
+        now = self._now()
+        statuses = []
+        for write in request.writes:
+            try:
+                self._apply_write(write, now)
+                statuses.append(status_pb2.Status(code=0))
+            except KeyError:
+                statuses.append(status_pb2.Status(code=6, message="ALREADY_EXISTS"))
+        return firestore_pb.BatchWriteResponse(
+            write_results=[write_pb.WriteResult(update_time=now) for _ in request.writes],
+            status=statuses,
+        )
+
+    def run_query(self, request, context):
+        from google.cloud.firestore_v1.types import document as document_pb, firestore as firestore_pb, query as query_pb
+
+        self._count("RunQuery")
+        self.latency.wait()
+        now = self._now()
+        query = request.structured_query
+        prefix = f"{request.parent}/{query.from_[0].collection_id}/"
+        filters = []
+        if query.where.field_filter.field.field_path:
+            filters.append(query.where.field_filter)
+        for sub in query.where.composite_filter.filters:
+            filters.append(sub.field_filter)
+
+        limit = query.limit or None
+        with self._lock:
+            candidates = [d for n, d in self.documents.items() if n.startswith(prefix) and "/" not in n[len(prefix):]]
+
+        def matches(field_filter, value) -> bool:
+            if value is None:
+                return False
+            actual = document_pb.Value.pb(value)
+            if field_filter.op == query_pb.StructuredQuery.FieldFilter.Operator.IN:
+                return any(actual == document_pb.Value.pb(v) for v in field_filter.value.array_value.values)
+            return actual == document_pb.Value.pb(field_filter.value)
+
+        matched = 0
+        for document in candidates:
+            ok = all(matches(f, document.fields.get(f.field.field_path)) for f in filters)
+            if ok:
+                matched += 1
+                yield firestore_pb.RunQueryResponse(document=document, read_time=now)
+                if limit and matched >= limit:
+                    return
+        if not matched:
+            yield firestore_pb.RunQueryResponse(read_time=now)
+
+
+class _SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, sink, port):
+        self.sink = sink
+        super().__init__(("127.0.0.1", port), _SMTPHandler)
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self):
+        sink = self.server.sink
+        sink._count("connections")
+        self._reply("220 localhost ESMTP fake sink")
+        mail_from, rcpts = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            line = raw.decode("utf-8", "replace").rstrip("\r\n")
+            command = line.split(" ", 1)[0].upper()
+
+            if command in ("EHLO", "HELO"):
+                self.wfile.write(b"250-localhost\r\n")
+                if sink.ssl_context and not isinstance(self.connection, ssl.SSLSocket):
+                    self.wfile.write(b"250-STARTTLS\r\n")
+                self._reply("250 AUTH PLAIN LOGIN")
+            elif command == "STARTTLS":
+                self._reply("220 Ready to start TLS")
+                self.connection = sink.ssl_context.wrap_socket(self.connection, server_side=True)
+                self.rfile = self.connection.makefile("rb")
+                self.wfile = self.connection.makefile("wb")
+            elif command == "AUTH":
+                parts = line.split()
+                if parts[1].upper() == "LOGIN":
+                    self._reply("334 VXNlcm5hbWU6")
+                    self.rfile.readline()
+                    self._reply("334 UGFzc3dvcmQ6")
+                    self.rfile.readline()
+                elif len(parts) < 3:
+                    self._reply("334 ")
+                    self.rfile.readline()
+                sink._count("logins")
+                self._reply("235 2.7.0 Authentication successful")
+            elif command == "MAIL":
+                mail_from, rcpts = line.split(":", 1)[1].strip().strip("<>"), []
+                self._reply("250 OK")
+            elif command == "RCPT":
+                rcpts.append(line.split(":", 1)[1].strip().strip("<>"))
+                self._reply("250 OK")
+            elif command == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    if data_line.startswith(b".."):
+                        data_line = data_line[1:]
+                    lines.append(data_line)
+                sink.latency.wait()
+                if sink._take_failure():
+                    self._reply("451 4.3.0 Temporary failure, try again later")
+                else:
+                    sink._store(mail_from, rcpts, b"".join(lines))
+                    self._reply("250 OK queued")
+                mail_from, rcpts = None, []
+            elif command == "RSET":
+                mail_from, rcpts = None, []
+                self._reply("250 OK")
+            elif command == "NOOP":
+                self._reply("250 OK")
+            elif command == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class SMTPSink:
+    """SMTP server that accepts (and keeps) every message.
+
+    Supports STARTTLS with a throwaway self-signed certificate and accepts
+    any AUTH credentials. `transient_failures` makes the next N messages fail
+    with a 451 so retry paths can be exercised.
+    """
+
+    def __init__(self, port: int = 0, latency: str = "0", starttls: bool = True,
+                 transient_failures: int = 0, seed: int = 0):
+        self.port = port or free_port()
+        self.latency = LatencyModel(latency, seed)
+        self.messages: List[Dict] = []
+        self.calls: Dict[str, int] = {}
+        self.transient_failures = transient_failures
+        self._lock = threading.Lock()
+        self._server = None
+        self._tmpdir = None
+        self.ssl_context = self._make_ssl_context() if starttls else None
+
+    @property
+    def host(self) -> str:
+        return "127.0.0.1"
+
+    def _make_ssl_context(self) -> ssl.SSLContext:
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import rsa
+        from cryptography.x509.oid import NameOID
+
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        cert = (
+            x509.CertificateBuilder()
+            .subject_name(name)
+            .issuer_name(name)
+            .public_key(key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now - datetime.timedelta(days=1))
+            .not_valid_after(now + datetime.timedelta(days=1))
+            .sign(key, hashes.SHA256())
+        )
+        self._tmpdir = tempfile.mkdtemp(prefix="smtp-sink-")
+        cert_path = os.path.join(self._tmpdir, "cert.pem")
+        key_path = os.path.join(self._tmpdir, "key.pem")
+        with open(cert_path, "wb") as f:
+            f.write(cert.public_bytes(serialization.Encoding.PEM))
+        with open(key_path, "wb") as f:
+            f.write(key.private_bytes(
+                serialization.Encoding.PEM,
+                serialization.PrivateFormat.PKCS8,
+                serialization.NoEncryption(),
+            ))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        return context
+
+    def _count(self, key: str):
+        with self._lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+
+    def _take_failure(self) -> bool:
+        with self._lock:
+            if self.transient_failures > 0:
+                self.transient_failures -= 1
+                self.calls["transient_failures"] = self.calls.get("transient_failures", 0) + 1
+                return True
+            return False
+
+    def _store(self, mail_from, rcpts, data: bytes):
+        with self._lock:
+            self.messages.append({"from": mail_from, "to": list(rcpts), "data": data})
+            self.calls["messages"] = self.calls.get("messages", 0) + 1
+
+    def recipients(self) -> List[str]:
+        with self._lock:
+            return [rcpt for message in self.messages for rcpt in message["to"]]
+
+    def start(self):
+        self._server = _SMTPServer(self, self.port)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeServices:
+    """Start every stand-in together and expose the env vars that point the app at them."""
+
+    def __init__(self, openai_chat_latency: str = "0", openai_embedding_latency: str = "0",
+                 firestore_latency: str = "0", auth_latency: str = "0", smtp_latency: str = "0",
+                 canned: Optional[Dict[str, str]] = None, embedding_dim: int = 3072, seed: int = 0):
+        self.openai = FakeOpenAIServer(
+            chat_latency=openai_chat_latency, embedding_latency=openai_embedding_latency,
+            canned=canned, embedding_dim=embedding_dim, seed=seed,
+        )
+        self.auth = FakeFirebaseAuthServer(latency=auth_latency, seed=seed)
+        self.firestore = FakeFirestoreServer(latency=firestore_latency, seed=seed)
+        self.smtp = SMTPSink(latency=smtp_latency, seed=seed)
+        self.project_id = "demo-resume-bench"
+
+    def start(self):
+        for service in (self.openai, self.auth, self.firestore, self.smtp):
+            service.start()
+        return self
+
+    def stop(self):
+        for service in (self.openai, self.auth, self.firestore, self.smtp):
+            service.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def env(self) -> Dict[str, str]:
+        return {
+            "OPENAI_API_KEY": "sk-local-fake",
+            "OPENAI_BASE_URL": self.openai.base_url,
+            "FIREBASE_PROJECT_ID": self.project_id,
+            "FIREBASE_CLIENT_EMAIL": f"bench@{self.project_id}.iam.gserviceaccount.com",
+            "FIREBASE_PRIVATE_KEY": generate_private_key_pem(),
+            "FIREBASE_TOKEN_URI": "https://oauth2.googleapis.com/token",
+            "FIREBASE_AUTH_EMULATOR_HOST": self.auth.host,
+            "FIRESTORE_EMULATOR_HOST": self.firestore.host,
+            "SMTP_SERVER": self.smtp.host,
+            "SMTP_PORT": str(self.smtp.port),
+            "EMAIL_ADDRESS": "hiring@example.com",
+            "EMAIL_PASSWORD": "local-fake",
+        }
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "openai": dict(self.openai.calls),
+            "firebase_auth": dict(self.auth.calls),
+            "firestore": dict(self.firestore.calls),
+            "smtp": dict(self.smtp.calls),
+        }
+
+
+def serve_forever(conn, options: Dict):
+    """Process entry point: start FakeServices, send their env, and stop when asked."""
+    with FakeServices(**options) as services:
+        conn.send(services.env())
+        while True:
+            message = conn.recv()
+            if message == "stats":
+                conn.send(services.stats())
+            elif message == "stop":
+                conn.send(services.stats())
+                return
+
@@ -0,0 +1,321 @@
+"""End-to-end load benchmark for POST /evaluate-resumes/.
+
+Starts the stand-ins from fakes.py in a separate process, runs the real app
+under uvicorn against them and drives it with concurrent uploads. Reports
+p50/p95/p99 request latency and resumes per second. Runs fully offline:
+
+    python -m backend.benchmarks.load_test --requests 20 --batch-size 5 --concurrency 4 \\
+        --chat-latency lognormal:0.4:0.3 --embedding-latency uniform:0.05:0.15
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+import numpy as np
+
+from backend.benchmarks.fakes import free_port, serve_forever
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_JOB_DESCRIPTION = (
+    "We are hiring a Senior Backend Engineer. Requirements: 5+ years of experience with Python, "
+    "3 years with FastAPI or Django, PostgreSQL, Docker and AWS. Experience with React is a plus. "
+    "You will design REST APIs, own CI/CD pipelines and mentor junior engineers."
+)
+
+_FIRST_NAMES = ["Alex", "Priya", "Chen", "Maria", "Omar", "Sofia", "Liam", "Aisha", "Kenji", "Noah"]
+_LAST_NAMES = ["Morgan", "Sharma", "Wei", "Garcia", "Haddad", "Rossi", "Brown", "Okafor", "Sato", "Meyer"]
+_SKILLS = ["Python", "FastAPI", "Django", "PostgreSQL", "Docker", "Kubernetes", "AWS", "React",
+           "TypeScript", "Redis", "Git", "CI/CD", "GraphQL", "Terraform", "Java", "Go"]
+_CATEGORIES = ["INFORMATION-TECHNOLOGY", "ENGINEERING", "FINANCE", "HR", "SALES", "DESIGNER"]
+
+
+def synthetic_resume_text(index: int, rng: random.Random) -> str:
+    first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+    skills = rng.sample(_SKILLS, 6)
+    years = rng.randint(1, 12)
+    lines = [
+        f"{first} {last}",
+        f"{first.lower()}.{last.lower()}{index}@example.com | +1 555 {rng.randint(1000, 9999)}",
+        "",
+        "SUMMARY",
+        f"Software engineer with {years} years of experience building web services.",
+        "",
+        "SKILLS",
+        ", ".join(skills),
+        "",
+        "EXPERIENCE",
+    ]
+    for skill in skills[:3]:
+        lines.append(f"{skill} {rng.randint(1, years)} years")
+    for job in range(3):
+        lines.append(f"Engineer at Company {rng.randint(1, 500)} ({2024 - 3 * job - 3} - {2024 - 3 * job})")
+        lines.append(f"- Built and operated services using {', '.join(rng.sample(skills, 2))}.")
+    lines += ["", "EDUCATION", "B.Sc. Computer Science"]
+    return "\n".join(lines)
+
+
+def make_resume_pdf(text: str) -> bytes:
+    import fitz
+
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def load_pdfs(directory: str) -> List[Tuple[str, bytes]]:
+    pdfs = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(".pdf"):
+            with open(os.path.join(directory, name), "rb") as f:
+                pdfs.append((name, f.read()))
+    if not pdfs:
+        raise SystemExit(f"No PDF files found in {directory}")
+    return pdfs
+
+
+def write_synthetic_corpus(path: str, size: int, dim: int, seed: int = 0):
+    """Corpus pickle in the same layout embed_resumes.py produces."""
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((size, dim)).astype(np.float32)
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+    text_rng = random.Random(seed)
+    metadata = [
+        {
+            "ID": i,
+            "Category": _CATEGORIES[i % len(_CATEGORIES)],
+            "clean_resume": " ".join(synthetic_resume_text(i, text_rng).split()),
+        }
+        for i in range(size)
+    ]
+    with open(path, "wb") as f:
+        pickle.dump({"embeddings": embeddings, "metadata": metadata}, f)
+
+
+def start_app(env: Dict[str, str], port: int, workers: int, log_file) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning",
+    ]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def wait_until_ready(url: str, process: subprocess.Popen, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"App exited during startup with code {process.returncode}")
+        try:
+            if httpx.get(url + "/", timeout=1.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit(f"App did not become ready within {timeout:.0f}s")
+
+
+async def run_load(url: str, job_description: str, pdfs: List[Tuple[str, bytes]], requests: int,
+                   batch_size: int, concurrency: int, timeout: float, compact: bool = False) -> List[Dict]:
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def one_request(client: httpx.AsyncClient, index: int):
+        batch = [pdfs[(index * batch_size + j) % len(pdfs)] for j in range(batch_size)]
+        files = [("resume_pdfs", (f"{index}-{name}", data, "application/pdf")) for name, data in batch]
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    url + "/evaluate-resumes/", files=files,
+                    data={"job_description": job_description, "compact": str(compact).lower()},
+                )
+                response_bytes = len(response.content)
+                body = response.json()
+                failed = response.status_code != 200 or "error" in body
+                report_errors = sum(1 for r in body.get("reports", []) if "error" in r)
+            except (httpx.HTTPError, ValueError):
+                failed, report_errors, response_bytes = True, batch_size, 0
+            results.append({
+                "latency": time.perf_counter() - started,
+                "response_bytes": response_bytes,
+                "resumes": batch_size,
+                "failed": failed,
+                "report_errors": report_errors,
+            })
+
+    async with httpx.AsyncClient(timeout=timeout) as client:
+        await asyncio.gather(*(one_request(client, i) for i in range(requests)))
+    return results
+
+
+def summarize(results: List[Dict], wall_time: float) -> Dict:
+    latencies = np.array([r["latency"] for r in results]) if results else np.zeros(1)
+    resumes = sum(r["resumes"] for r in results)
+    return {
+        "requests": len(results),
+        "resumes": resumes,
+        "failed_requests": sum(1 for r in results if r["failed"]),
+        "resume_errors": sum(r["report_errors"] for r in results),
+        "wall_time_s": round(wall_time, 3),
+        "latency_s": {
+            "mean": round(float(latencies.mean()), 4),
+            "p50": round(float(np.percentile(latencies, 50)), 4),
+            "p95": round(float(np.percentile(latencies, 95)), 4),
+            "p99": round(float(np.percentile(latencies, 99)), 4),
+            "max": round(float(latencies.max()), 4),
+        },
+        "response_bytes_mean": round(float(np.mean([r["response_bytes"] for r in results])), 1) if results else 0.0,
+        "requests_per_s": round(len(results) / wall_time, 3) if wall_time else 0.0,
+        "resumes_per_s": round(resumes / wall_time, 3) if wall_time else 0.0,
+    }
+
+
+def diff_calls(after: Dict[str, Dict[str, int]], before: Dict[str, Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+    """Upstream call counts made during the measured run only."""
+    return {
+        service: {key: count - before.get(service, {}).get(key, 0) for key, count in counts.items()}
+        for service, counts in after.items()
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load benchmark for /evaluate-resumes/")
+    parser.add_argument("--requests", type=int, default=10, help="number of upload requests")
+    parser.add_argument("--batch-size", type=int, default=3, help="resumes per request")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--warmup", type=int, default=1, help="requests sent before measuring")
+    parser.add_argument("--pdf-dir", help="use the PDFs in this directory instead of synthetic resumes")
+    parser.add_argument("--unique-resumes", type=int, default=20, help="synthetic resumes to generate")
+    parser.add_argument("--job-description", default=DEFAULT_JOB_DESCRIPTION)
+    parser.add_argument("--corpus-size", type=int, default=2000, help="synthetic similarity corpus rows")
+    parser.add_argument("--embedding-dim", type=int, default=3072)
+    parser.add_argument("--chat-latency", default="fixed:0.05", help="latency spec for chat completions")
+    parser.add_argument("--embedding-latency", default="fixed:0.02", help="latency spec for embeddings")
+    parser.add_argument("--firestore-latency", default="fixed:0.01")
+    parser.add_argument("--auth-latency", default="fixed:0.02")
+    parser.add_argument("--smtp-latency", default="0")
+    parser.add_argument("--canned", help="JSON file overriding canned chat responses by prompt kind")
+    parser.add_argument("--database-url", help="defaults to a SQLite file in the work dir")
+    parser.add_argument("--workdir", help="directory for the corpus and database (default: temp dir)")
+    parser.add_argument("--compact", action="store_true", help="request compact (orjson, id-based preview) responses")
+    parser.add_argument("--llm-cache", help="LLM response cache file for the app (LLM_CACHE_PATH)")
+    parser.add_argument("--timeout", type=float, default=300.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict:
+    args = parse_args(argv)
+    workdir = args.workdir or tempfile.mkdtemp(prefix="resume-bench-")
+    os.makedirs(workdir, exist_ok=True)
+
+    canned = None
+    if args.canned:
+        with open(args.canned) as f:
+            canned = json.load(f)
+
+    corpus_path = os.path.join(workdir, "resume_embeddings.pkl")
+    write_synthetic_corpus(corpus_path, args.corpus_size, args.embedding_dim, args.seed)
+
+    if args.pdf_dir:
+        pdfs = load_pdfs(args.pdf_dir)
+    else:
+        rng = random.Random(args.seed)
+        pdfs = [
+            (f"resume_{i}.pdf", make_resume_pdf(synthetic_resume_text(i, rng)))
+            for i in range(args.unique_resumes)
+        ]
+
+    options = {
+        "openai_chat_latency": args.chat_latency,
+        "openai_embedding_latency": args.embedding_latency,
+        "firestore_latency": args.firestore_latency,
+        "auth_latency": args.auth_latency,
+        "smtp_latency": args.smtp_latency,
+        "canned": canned,
+        "embedding_dim": args.embedding_dim,
+        "seed": args.seed,
+    }
+    context = multiprocessing.get_context("spawn")
+    parent_conn, child_conn = context.Pipe()
+    fakes = context.Process(target=serve_forever, args=(child_conn, options), daemon=True)
+    fakes.start()
+    app = None
+    app_log = open(os.path.join(workdir, "app.log"), "wb")
+    try:
+        fake_env = parent_conn.recv()
+        env = dict(os.environ)
+        env.update(fake_env)
+        env["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+        env["RESUME_EMBEDDINGS_PATH"] = corpus_path
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [REPO_ROOT, env.get("PYTHONPATH")]))
+        # Measure uncached calls unless a response cache is asked for
+        env.pop("LLM_CACHE_PATH", None)
+        if args.llm_cache:
+            env["LLM_CACHE_PATH"] = args.llm_cache
+
+        port = free_port()
+        url = f"http://127.0.0.1:{port}"
+        app = start_app(env, port, args.workers, app_log)
+        wait_until_ready(url, app)
+
+        if args.warmup:
+            asyncio.run(run_load(url, args.job_description, pdfs, args.warmup, args.batch_size, 1, args.timeout,
+                                 args.compact))
+        parent_conn.send("stats")
+        calls_before = parent_conn.recv()
+
+        started = time.perf_counter()
+        results = asyncio.run(run_load(
+            url, args.job_description, pdfs, args.requests, args.batch_size, args.concurrency, args.timeout,
+            args.compact,
+        ))
+        wall_time = time.perf_counter() - started
+
+        parent_conn.send("stats")
+        report = summarize(results, wall_time)
+        report["config"] = {
+            key: getattr(args, key)
+            for key in ("requests", "batch_size", "concurrency", "workers", "corpus_size", "embedding_dim",
+                        "chat_latency", "embedding_latency", "firestore_latency", "auth_latency", "compact")
+        }
+        report["upstream_calls"] = diff_calls(parent_conn.recv(), calls_before)
+        report["app_log"] = app_log.name
+    finally:
+        if app is not None:
+            app.terminate()
+            try:
+                app.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                app.kill()
+        parent_conn.send("stop")
+        parent_conn.recv()
+        fakes.join(timeout=10)
+        app_log.close()
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main()
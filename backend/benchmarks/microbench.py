@@ -0,0 +1,283 @@
+"""Microbenchmarks for the CPU-bound helpers, with a JSON baseline as a regression gate.
+
+Runs offline: resumes, job descriptions, PDFs and similarity corpora are
+generated from a fixed seed (plus the sample resume PDFs in backend/tests),
+so no API keys or network are needed.
+
+    python -m backend.benchmarks.microbench --output micro.json
+    python -m backend.benchmarks.microbench --rounds 3 --save-baseline backend/benchmarks/microbench_baseline.json
+    python -m backend.benchmarks.microbench --baseline backend/benchmarks/microbench_baseline.json --tolerance 0.5
+
+Each case reports the median time per call over --repeat runs, each at least
+--min-time long. Times are also expressed relative to a fixed pure-Python
+calibration loop timed just before each case. The gate compares those relative times, so a baseline
+recorded on one machine stays roughly meaningful on another. Cases over the
+tolerance are measured once more before they count. The exit status is 1 when
+any case is more than --tolerance slower than the baseline.
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+import backend.main as main_module
+from backend.benchmarks.corpus_recall import synthetic_embeddings
+from backend.benchmarks.load_test import DEFAULT_JOB_DESCRIPTION, synthetic_resume_text
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SAMPLE_PDF = os.path.join(REPO_ROOT, "backend", "tests", "sample_resume.pdf")
+
+_JD_FILLER = ("You will collaborate with product managers, designers and other engineers to ship reliable "
+              "features, review code, improve observability and take part in an on-call rotation. ")
+_JD_REQUIREMENTS = [
+    "5+ years of experience with Python", "3 years of experience in Django or FastAPI",
+    "at least 2 years with AWS", "minimum 4 years of experience using PostgreSQL",
+    "Kubernetes: 2+ years", "Experience with Docker - 3 years",
+]
+
+
+def resume_text(size: int, seed: int = 0) -> str:
+    """Synthetic resumes concatenated to `size` characters"""
+    rng = random.Random(seed)
+    parts, length, index = [], 0, 0
+    while length < size:
+        parts.append(synthetic_resume_text(index, rng))
+        length += len(parts[-1]) + 2
+        index += 1
+    return "\n\n".join(parts)[:size]
+
+
+def job_description(size: int, seed: int = 0) -> str:
+    """A posting with experience requirements spread through `size` characters of prose"""
+    rng = random.Random(seed)
+    parts, length = [DEFAULT_JOB_DESCRIPTION], len(DEFAULT_JOB_DESCRIPTION)
+    while length < size:
+        parts.append(_JD_FILLER if rng.random() < 0.7 else f"Requirement: {rng.choice(_JD_REQUIREMENTS)}. ")
+        length += len(parts[-1])
+    return "".join(parts)[:size]
+
+
+def sparse_text(size: int, seed: int = 0) -> str:
+    """Long prose without any numbers, the worst case for the requirement patterns"""
+    rng = random.Random(seed)
+    words = _JD_FILLER.replace(",", "").replace(".", "").split()
+    text = " ".join(rng.choice(words) for _ in range(size // 4))
+    return text[:size]
+
+
+def multi_page_pdf(text: str, pages: int) -> bytes:
+    """`text` split evenly over `pages` pages"""
+    import fitz
+
+    doc = fitz.open()
+    chunk = -(-len(text) // pages)
+    for start in range(0, len(text), chunk):
+        page = doc.new_page()
+        # insert_textbox writes nothing when the text overflows, so keep each page's share small
+        page.insert_textbox(fitz.Rect(40, 40, 570, 800), text[start:start + chunk], fontsize=7)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def calibration():
+    """Fixed pure-Python work that the case times are expressed relative to"""
+    total = 0
+    for i in range(20000):
+        total += i * i % 7
+    return total
+
+
+def cold(fn: Callable[[], object]) -> Callable[[], object]:
+    """`fn` without the tokenizer cache, which would otherwise answer every repeated call"""
+    def call():
+        main_module._tokenize.cache_clear()
+        return fn()
+    return call
+
+
+def build_cases(stack: ExitStack, quick: bool = False) -> Dict[str, Callable[[], object]]:
+    """Benchmark cases by name; `stack` owns the temporary corpora"""
+    scale = 0.25 if quick else 1
+    resumes = {label: resume_text(int(size * scale)) for label, size in (("1k", 1000), ("5k", 5000), ("20k", 20000))}
+    jds = {"short": DEFAULT_JOB_DESCRIPTION, "2k": job_description(int(2000 * scale)),
+           "sparse_2k": sparse_text(int(2000 * scale)), "sparse_20k": sparse_text(int(20000 * scale))}
+    skills = [variant for variants in main_module.SKILL_TAXONOMY.values() for variant in variants]
+    skills = (skills + [canonical.upper() for canonical in main_module.SKILL_TAXONOMY] + ["  Unknown Tool  "])[:200]
+    jd_skills = ["Python", "FastAPI", "PostgreSQL", "Docker", "AWS", "Kubernetes"]
+
+    cases: Dict[str, Callable[[], object]] = {
+        "normalize_skill/200_skills": lambda: [main_module.normalize_skill(skill) for skill in skills],
+    }
+    for label, text in resumes.items():
+        cases[f"extract_email_from_resume/resume_{label}"] = lambda text=text: main_module.extract_email_from_resume(text)
+        cases[f"extract_experience_years/resume_{label}"] = cold(
+            lambda text=text: main_module.extract_experience_years(text, "python")
+        )
+    for label, text in jds.items():
+        cases[f"extract_jd_requirements/jd_{label}"] = lambda text=text: main_module.extract_jd_requirements(text)
+    cases["calculate_experience_score/resume_5k_jd_2k"] = cold(
+        lambda: main_module.calculate_experience_score(resumes["5k"], jds["2k"], jd_skills)
+    )
+
+    pdfs = {"1_page": multi_page_pdf(resumes["1k"], 1), "5_pages": multi_page_pdf(resumes["5k"], 5)}
+    if os.path.exists(SAMPLE_PDF):
+        with open(SAMPLE_PDF, "rb") as f:
+            pdfs["sample_resume"] = f.read()
+    for label, data in pdfs.items():
+        cases[f"extract_text_from_pdf/{label}"] = lambda data=data: main_module.extract_text_from_pdf(data)
+
+    rng = np.random.default_rng(0)
+    a, b = rng.standard_normal(3072), rng.standard_normal(3072)
+    cases["cosine_similarity/3072"] = lambda: main_module.cosine_similarity(a, b)
+
+    workdir = stack.enter_context(tempfile.TemporaryDirectory(prefix="microbench-"))
+    sizes = (500, 2000) if quick else (1000, 10000)
+    dim = 256 if quick else 3072
+    categories = ["INFORMATION-TECHNOLOGY", "ENGINEERING", "FINANCE", "HR", "SALES", "DESIGNER"]
+    for size in sizes:
+        directory = os.path.join(workdir, f"corpus_{size}")
+        embeddings = synthetic_embeddings(size, dim, seed=size)
+        main_module.write_corpus_files(directory, embeddings, [f"resume {i}" for i in range(size)], {},
+                                       categories=[categories[i % len(categories)] for i in range(size)])
+        corpus = main_module.SegmentedCorpus(os.path.join(workdir, f"segments_{size}"))
+        corpus.set_base(directory)
+        query = embeddings[size // 2]
+
+        def search(corpus=corpus, query=query):
+            # search_similar_resumes reads the module-level corpus
+            previous, main_module.corpus = main_module.corpus, corpus
+            try:
+                return main_module.search_similar_resumes(query, top_k=5)
+            finally:
+                main_module.corpus = previous
+
+        cases[f"search_similar_resumes/corpus_{size}"] = search
+    return cases
+
+
+def measure(fn: Callable[[], object], min_time: float, repeat: int) -> Dict:
+    """Median seconds per call over `repeat` runs; loops double until one run takes at least `min_time`"""
+    gc_was_enabled = gc.isenabled()
+    gc.disable()  # As timeit does: collections would land on whichever case happens to trigger them
+    try:
+        return _measure(fn, min_time, repeat)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def _measure(fn: Callable[[], object], min_time: float, repeat: int) -> Dict:
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    runs = [elapsed / loops]
+    for _ in range(repeat - 1):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        runs.append((time.perf_counter() - started) / loops)
+    return {"seconds": statistics.median(runs), "best_seconds": min(runs), "loops": loops}
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """Cases whose relative time exceeds the baseline's by more than `tolerance`"""
+    regressions = []
+    for name, result in report["results"].items():
+        expected = baseline.get("results", {}).get(name)
+        if not expected:
+            continue
+        ratio = result["relative"] / expected["relative"]
+        if ratio > 1 + tolerance:
+            regressions.append({"case": name, "baseline_seconds": expected["seconds"],
+                                "seconds": result["seconds"], "slowdown": round(ratio, 2)})
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the CPU-bound helpers with a regression gate")
+    parser.add_argument("--cases", help="comma-separated substrings; only matching cases run")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case; the median counts")
+    parser.add_argument("--rounds", type=int, default=1,
+                        help="measure each case this many times and keep the median (use 3+ for baselines)")
+    parser.add_argument("--min-time", type=float, default=0.1, help="minimum seconds per timed run")
+    parser.add_argument("--quick", action="store_true", help="small inputs and single runs (smoke test)")
+    parser.add_argument("--baseline", help="compare against this baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown vs. the baseline (0.5 = 50%%)")
+    parser.add_argument("--save-baseline", help="write the results as a new baseline")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict:
+    args = parse_args(argv)
+    repeat, min_time = (1, 0.0) if args.quick else (args.repeat, args.min_time)
+    selected: Optional[List[str]] = args.cases.split(",") if args.cases else None
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    def run_case(fn):
+        # Calibrated next to each case, so drift in machine speed during the run cancels out
+        calibration_seconds = measure(calibration, 0.02, 3)["seconds"]
+        result = measure(fn, min_time, repeat)
+        result["relative"] = result["seconds"] / calibration_seconds
+        result["calibration_seconds"] = calibration_seconds
+        return result
+
+    results = {}
+    with ExitStack() as stack:
+        cases = build_cases(stack, args.quick)
+        for name, fn in cases.items():
+            if selected and not any(part in name for part in selected):
+                continue
+            rounds = sorted((run_case(fn) for _ in range(args.rounds)), key=lambda result: result["relative"])
+            results[name] = rounds[len(rounds) // 2]
+            print(f"{name:55s} {results[name]['seconds'] * 1e3:12.4f} ms  x{results[name]['loops']}", file=sys.stderr)
+
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "quick": args.quick,
+            "results": results,
+        }
+        if baseline is not None:
+            # A regression has to show up twice: a single slow run is usually a noisy neighbour
+            for regression in compare(report, baseline, args.tolerance):
+                name = regression["case"]
+                retry = run_case(cases[name])
+                if retry["relative"] < results[name]["relative"]:
+                    results[name] = retry
+            report["tolerance"] = args.tolerance
+            report["regressions"] = compare(report, baseline, args.tolerance)
+            for regression in report["regressions"]:
+                print(f"REGRESSION {regression['case']}: {regression['slowdown']}x the baseline", file=sys.stderr)
+    print(json.dumps(report, indent=2))
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return report
+
+
+if __name__ == "__main__":
+    sys.exit(1 if main().get("regressions") else 0)
@@ -0,0 +1,237 @@
+"""Evaluate a directory (or manifest) of resume PDFs against one job description, without the HTTP API.
+
+Usage:
+    python -m backend.bulk_evaluate --jd-file jd.txt --input resumes/ --output results.parquet [--db]
+
+`--input` is a directory (searched recursively for PDFs), a CSV manifest with
+a `path` column, or a text file with one path per line; relative manifest
+paths are resolved against the manifest's directory. PDF parsing and the
+local scoring run in a process pool; the OpenAI calls of up to
+`--concurrency` resumes run concurrently, with the independent prompts of
+each resume fanned out together. Results are written to Parquet or CSV (by
+extension) as they complete; rerunning with the same output skips the resumes
+already evaluated and retries the ones that failed. `--db` also saves a
+ResumeReport for each resume.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import backend.main as evaluator
+
+COLUMNS = [
+    "path", "candidate_name", "candidate_email", "score_out_of_100", "status", "skill_match_score",
+    "experience_score", "relevance_score", "suggested_job_role", "resume_summary", "skills_present",
+    "matching_skills", "missing_skills", "report_id", "error",
+]
+
+
+def list_inputs(source: str) -> List[str]:
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+        return sorted(paths)
+    base = os.path.dirname(os.path.abspath(source))
+    if source.lower().endswith(".csv"):
+        entries = pd.read_csv(source)["path"].dropna().astype(str).tolist()
+    else:
+        with open(source) as f:
+            entries = [line.strip() for line in f if line.strip()]
+    return [os.path.normpath(os.path.join(base, entry)) for entry in entries]
+
+
+def read_resume(path: str) -> str:
+    with open(path, "rb") as f:
+        return evaluator.extract_text_from_pdf(f.read())
+
+
+class ResultWriter:
+    """Results file that is appended to as resumes complete, in Parquet or CSV"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = path.lower().endswith(".parquet")
+        self._rows: List[Dict] = []
+
+    def load(self) -> Dict[str, Dict]:
+        """Rows already written, by path; failed rows are dropped so they are retried"""
+        if not os.path.exists(self.path):
+            return {}
+        existing = pd.read_parquet(self.path) if self.parquet else pd.read_csv(self.path)
+        done = existing[existing["error"].isna()] if "error" in existing else existing
+        self._rows = done.to_dict("records")
+        self._write(self._rows, mode="w")
+        return {row["path"]: row for row in self._rows}
+
+    def append(self, rows: List[Dict]):
+        if not rows:
+            return
+        self._rows.extend(rows)
+        if self.parquet:
+            # Parquet can't be appended to, so the (small) file is rewritten
+            self._write(self._rows, mode="w")
+        else:
+            self._write(rows, mode="a")
+
+    def _write(self, rows: List[Dict], mode: str):
+        frame = pd.DataFrame(rows, columns=COLUMNS)
+        if self.parquet:
+            temporary = self.path + ".tmp"
+            frame.to_parquet(temporary, index=False)
+            os.replace(temporary, self.path)
+        else:
+            header = mode == "w" or not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            frame.to_csv(self.path, mode=mode, header=header, index=False)
+
+
+def result_row(path: str, analysis: Optional[Dict] = None, report_id: Optional[int] = None,
+               error: Optional[str] = None) -> Dict:
+    row = dict.fromkeys(COLUMNS)
+    row.update(path=path, report_id=report_id, error=error)
+    if analysis:
+        row.update(
+            candidate_name=analysis["candidate_name"],
+            candidate_email=analysis["candidate_email"],
+            score_out_of_100=analysis["final_score"],
+            status=analysis["status"],
+            skill_match_score=round(analysis["skill_score"], 1),
+            experience_score=round(analysis["experience_score"], 1),
+            relevance_score=round(analysis["relevance_score"], 1),
+            suggested_job_role=analysis["suggested_job_role"],
+            resume_summary=analysis["resume_summary"],
+            # JSON strings, so CSV and Parquet outputs hold the same values
+            skills_present=json.dumps(analysis["resume_skills"]),
+            matching_skills=json.dumps(analysis["matching_skills"]),
+            missing_skills=json.dumps(analysis["missing_skills"]),
+        )
+    return row
+
+
+async def evaluate_resume(path: str, job_description: str, jd_skills: List[str], job_embedding: np.ndarray,
+                          processes: ProcessPoolExecutor, threads: ThreadPoolExecutor, save: bool,
+                          pending_accounts: List[Dict]) -> Dict:
+    """The analyze_resume pipeline with its independent API calls made concurrently"""
+    loop = asyncio.get_running_loop()
+
+    def call(fn, *args):
+        return loop.run_in_executor(threads, fn, *args)
+
+    try:
+        resume_text = await loop.run_in_executor(processes, read_resume, path)
+        if not resume_text.strip():
+            return result_row(path, error="Could not extract text from PDF")
+
+        candidate_name, resume_skills, resume_embedding, resume_summary, suggested_job_role = await asyncio.gather(
+            call(evaluator.extract_name_from_resume, resume_text),
+            call(evaluator.extract_skills_with_gpt, resume_text, "resume"),
+            call(evaluator.get_embedding, resume_text),
+            call(evaluator.generate_resume_summary, resume_text, job_description),
+            call(evaluator.recommend_job_type, resume_text),
+        )
+        skill_match = await call(
+            evaluator.calculate_skill_match_score,
+            [evaluator.normalize_skill(skill) for skill in resume_skills],
+            [evaluator.normalize_skill(skill) for skill in jd_skills],
+        )
+        analysis = await loop.run_in_executor(
+            processes, evaluator.score_resume, resume_text, job_description, jd_skills, job_embedding,
+            candidate_name, resume_skills, skill_match, resume_embedding, resume_summary, suggested_job_role,
+        )
+        report_id = None
+        if save:
+            report_id = (await call(evaluator.save_report, os.path.basename(path), analysis, pending_accounts))[0]
+        return result_row(path, analysis, report_id)
+    except Exception as e:
+        evaluator.logger.error(f"Error evaluating {path}: {e}")
+        return result_row(path, error=str(e))
+
+
+async def run(job_description: str, paths: List[str], output: str, workers: int, concurrency: int,
+              save: bool, flush_every: int) -> Dict[str, int]:
+    writer = ResultWriter(output)
+    done = writer.load()
+    todo = [path for path in paths if path not in done]
+    summary = {"inputs": len(paths), "already_done": len(paths) - len(todo), "evaluated": 0, "failed": 0}
+    if not todo:
+        return summary
+
+    loop = asyncio.get_running_loop()
+    pending_accounts: List[Dict] = []
+    buffered: List[Dict] = []
+    # Spawned, not forked: the parent already runs API client and executor threads
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as processes, \
+            ThreadPoolExecutor(concurrency * 5, thread_name_prefix="bulk-api") as threads:
+        jd_skills, job_embedding = await loop.run_in_executor(
+            threads, evaluator.analyze_job_description, job_description
+        )
+
+        try:
+            # Tasks are started as others finish, so a huge input list isn't scheduled all at once
+            queue = iter(todo)
+            running = set()
+            while True:
+                while len(running) < concurrency:
+                    path = next(queue, None)
+                    if path is None:
+                        break
+                    running.add(asyncio.ensure_future(evaluate_resume(
+                        path, job_description, jd_skills, job_embedding, processes, threads, save, pending_accounts
+                    )))
+                if not running:
+                    break
+                finished, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    row = task.result()
+                    summary["failed" if row["error"] else "evaluated"] += 1
+                    buffered.append(row)
+                if len(buffered) >= flush_every:
+                    writer.append(buffered)
+                    buffered = []
+        finally:
+            writer.append(buffered)
+            if pending_accounts:
+                await loop.run_in_executor(threads, evaluator.provision_interview_accounts, pending_accounts)
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate resume PDFs against one job description")
+    jd = parser.add_mutually_exclusive_group(required=True)
+    jd.add_argument("--job-description", help="job description text")
+    jd.add_argument("--jd-file", help="file containing the job description")
+    parser.add_argument("--input", required=True, help="directory of PDFs, CSV manifest with a path column, "
+                                                       "or a file with one path per line")
+    parser.add_argument("--output", required=True, help="results file (.parquet or .csv); resumed if it exists")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for PDF and scoring work")
+    parser.add_argument("--concurrency", type=int, default=8, help="resumes with API calls in flight")
+    parser.add_argument("--flush-every", type=int, default=50, help="results buffered before writing")
+    parser.add_argument("--db", action="store_true", help="also save a ResumeReport per resume (DATABASE_URL)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> Dict[str, int]:
+    args = parse_args(argv)
+    job_description = args.job_description
+    if args.jd_file:
+        with open(args.jd_file) as f:
+            job_description = f.read()
+
+    started = time.perf_counter()
+    summary = asyncio.run(run(job_description, list_inputs(args.input), args.output, args.workers,
+                              args.concurrency, args.db, args.flush_every))
+    summary["seconds"] = round(time.perf_counter() - started, 2)
+    print(json.dumps(summary))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -45,3 +45,9 @@ with open("resume_embeddings.pkl", "wb") as f:
     pickle.dump({"embeddings": embeddings, "metadata": metadata}, f)
 
 print("Embeddings and metadata saved.")
+
+# Prebuild the memory-mapped artifact the API workers attach to
+from main import build_corpus_artifact
+
+build_corpus_artifact("resume_embeddings.pkl", "resume_embeddings.corpus")
+print("Corpus artifact saved.")
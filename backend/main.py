@@ -1,36 +1,46 @@
 import os
+import asyncio
 import pickle
-import gdown
 import re
 import json
+import queue
+import tarfile
+import zlib
+import zipfile
 import numpy as np
 import smtplib
 import secrets
-from openai import OpenAI
+import hashlib
+import shutil
+import threading
+import bisect
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
 import string
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from fastapi import FastAPI, UploadFile, File, Form
+from fastapi import FastAPI, UploadFile, File, Form, Body, BackgroundTasks
+from fastapi.responses import PlainTextResponse, JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine, Column, Integer, String, Text, ARRAY, Float, DateTime, Boolean
+from sqlalchemy import (
+    create_engine, event, text, update, Column, Integer, String, Text, ARRAY, Float, Date, DateTime, Boolean, JSON,
+    Index, LargeBinary,
+)
 from dotenv import load_dotenv
 from typing import List, Dict, Tuple, Optional
 from numpy.linalg import norm
-import fitz
-import openai
 import logging
-from datetime import datetime
-import firebase_admin
-from firebase_admin import credentials, auth as firebase_auth
-from google.cloud import firestore
-from google.oauth2 import service_account
+from datetime import datetime, timedelta
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 load_dotenv()
-openai.api_key = os.getenv("OPENAI_API_KEY")
 DATABASE_URL = os.getenv("DATABASE_URL")
 
 # Email configuration
@@ -45,45 +55,207 @@ INTERVIEW_PLATFORM_URL = os.getenv("INTERVIEW_PLATFORM_URL", "https://ai-intervi
 # Configurable threshold
 SUITABILITY_THRESHOLD = float(os.getenv("SUITABILITY_THRESHOLD", "75.0"))
 
-# Firebase Admin SDK setup
-try:
-    firebase_cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
+# Similarity corpus (downloaded on first start if missing). Workers memory-map a
+# prebuilt artifact directory derived from the pickle, so the corpus is held once
+# in the page cache no matter how many worker processes attach to it.
+RESUME_EMBEDDINGS_PATH = os.getenv("RESUME_EMBEDDINGS_PATH", "resume_embeddings.pkl")
+CORPUS_ARTIFACT_DIR = os.getenv("CORPUS_ARTIFACT_DIR", os.path.splitext(RESUME_EMBEDDINGS_PATH)[0] + ".corpus")
+
+
+class StageMetrics:
+    """Per-stage latency histograms and call/error/fallback counters in Prometheus text format.
+
+    Series are labeled by stage and model (empty for non-model stages). Values
+    are per process; with several workers, scrape each one or aggregate upstream.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+    def __init__(self, prefix: str = "resume_evaluator"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], List] = {}
+        self._counters: Dict[str, Dict[Tuple[str, str], float]] = {
+            "calls": {}, "errors": {}, "fallbacks": {}, "cache_hits": {},
+        }
+
+    def observe(self, stage: str, model: str, seconds: float):
+        key = (stage, model)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # [bucket counts..., sum, count]
+                histogram = self._histograms[key] = [0] * len(self.BUCKETS) + [0.0, 0]
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+            calls = self._counters["calls"]
+            calls[key] = calls.get(key, 0) + 1
+
+    def increment(self, counter: str, stage: str, model: str = ""):
+        with self._lock:
+            values = self._counters[counter]
+            values[(stage, model)] = values.get((stage, model), 0) + 1
+
+    @staticmethod
+    def _labels(stage: str, model: str, **extra) -> str:
+        labels = {"stage": stage, "model": model, **extra}
+        return ",".join(
+            '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in labels.items()
+        )
+
+    def render(self) -> str:
+        name = f"{self.prefix}_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Time spent in each processing stage.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            histograms = {key: list(values) for key, values in self._histograms.items()}
+            counters = {kind: dict(values) for kind, values in self._counters.items()}
+
+        for (stage, model), values in sorted(histograms.items()):
+            for bound, count in zip(self.BUCKETS, values):
+                lines.append(f"{name}_bucket{{{self._labels(stage, model, le=bound)}}} {count}")
+            lines.append(f'{name}_bucket{{{self._labels(stage, model, le="+Inf")}}} {values[-1]}')
+            lines.append(f"{name}_sum{{{self._labels(stage, model)}}} {values[-2]}")
+            lines.append(f"{name}_count{{{self._labels(stage, model)}}} {values[-1]}")
+
+        descriptions = {
+            "calls": "Calls made to each stage.",
+            "errors": "Stage calls that raised an error.",
+            "fallbacks": "Stage calls that returned a default value instead of a real result.",
+            "cache_hits": "Stage calls answered from a cache or a near-duplicate resume instead of the API.",
+        }
+        for kind, description in descriptions.items():
+            counter = f"{self.prefix}_stage_{kind}_total"
+            lines.append(f"# HELP {counter} {description}")
+            lines.append(f"# TYPE {counter} counter")
+            for (stage, model), value in sorted(counters[kind].items()):
+                lines.append(f"{counter}{{{self._labels(stage, model)}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+stage_metrics = StageMetrics()
+
 
+@contextmanager
+def track_stage(stage: str, model: str = ""):
+    """Time a block and count it as a call to `stage`; exceptions are counted as errors and re-raised."""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        stage_metrics.increment("errors", stage, model)
+        raise
+    finally:
+        stage_metrics.observe(stage, model, time.perf_counter() - started)
+
+
+def record_fallback(stage: str, model: str = ""):
+    stage_metrics.increment("fallbacks", stage, model)
+
+# External clients are created lazily on first use so that importing this
+# module (and starting a worker) does no network or credential work.
+_clients_lock = threading.RLock()
+_clients: Dict[str, object] = {}
+_client_errors: Dict[str, str] = {}
+
+
+def _lazy_client(name: str, factory):
+    """Create a client once; a failed factory is recorded and retried on the next call."""
+    if name in _clients:
+        return _clients[name]
+    with _clients_lock:
+        if name not in _clients:
+            try:
+                _clients[name] = factory()
+                _client_errors.pop(name, None)
+            except Exception as e:
+                logger.error(f"Failed to initialize {name}: {e}")
+                _client_errors[name] = str(e)
+                return None
+        return _clients[name]
+
+
+def _firebase_certificate():
+    """Service-account certificate from FIREBASE_CREDENTIALS_PATH or the FIREBASE_* environment variables."""
+    from firebase_admin import credentials
+
+    firebase_cred_path = os.getenv("FIREBASE_CREDENTIALS_PATH")
     if firebase_cred_path and os.path.exists(firebase_cred_path):
-        cred = credentials.Certificate(firebase_cred_path)
-        firebase_admin.initialize_app(cred)
-        logger.info("Firebase Admin SDK initialized using service account file.")
-    elif all([
+        return credentials.Certificate(firebase_cred_path)
+
+    if not all([
         os.getenv("FIREBASE_PROJECT_ID"),
         os.getenv("FIREBASE_PRIVATE_KEY"),
         os.getenv("FIREBASE_CLIENT_EMAIL")
     ]):
-        firebase_config = {
-            "type": "service_account",
-            "project_id": os.getenv("FIREBASE_PROJECT_ID"),
-            "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID", ""),  # optional
-            "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace("\\n", "\n"),
-            "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
-            "client_id": os.getenv("FIREBASE_CLIENT_ID", ""),  # optional
-            "auth_uri": "https://accounts.google.com/o/oauth2/auth",
-            "token_uri": "https://oauth2.googleapis.com/token",
-            "auth_provider_x509_cert_url": "https://www.googleapis.com/oauth2/v1/certs",
-            "client_x509_cert_url": os.getenv("FIREBASE_CLIENT_X509_CERT_URL", "")
-        }
-        cred = credentials.Certificate(firebase_config)
-        firebase_admin.initialize_app(cred)
-        logger.info("Firebase Admin SDK initialized using inline environment config.")
-    else:
-        logger.warning("Firebase credentials not found. Email integration will be disabled.")
-        firebase_admin = None
+        raise RuntimeError("Firebase credentials not found")
+
+    return credentials.Certificate({
+        "type": "service_account",
+        "project_id": os.getenv("FIREBASE_PROJECT_ID"),
+        "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID", ""),  # optional
+        "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace("\\n", "\n"),
+        "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
+        "client_id": os.getenv("FIREBASE_CLIENT_ID", ""),  # optional
+        "auth_uri": os.getenv("FIREBASE_AUTH_URI", "https://accounts.google.com/o/oauth2/auth"),
+        "token_uri": os.getenv("FIREBASE_TOKEN_URI", "https://oauth2.googleapis.com/token"),
+        "auth_provider_x509_cert_url": os.getenv(
+            "FIREBASE_AUTH_PROVIDER_CERT_URL", "https://www.googleapis.com/oauth2/v1/certs"
+        ),
+        # Both names were in use before the Firebase setup was consolidated
+        "client_x509_cert_url": os.getenv("FIREBASE_CLIENT_CERT_URL") or os.getenv("FIREBASE_CLIENT_X509_CERT_URL", ""),
+        "universe_domain": os.getenv("FIREBASE_UNIVERSE_DOMAIN", "googleapis.com"),
+    })
+
+
+def _init_firebase_app():
+    import firebase_admin
+
+    try:
+        return firebase_admin.get_app()
+    except ValueError:
+        app = firebase_admin.initialize_app(_firebase_certificate())
+        logger.info("Firebase Admin SDK initialized.")
+        return app
+
+
+def get_firebase_app():
+    """Firebase Admin app, or None if Firebase is not configured."""
+    return _lazy_client("firebase", _init_firebase_app)
+
+
+def _init_firestore_client():
+    from google.cloud import firestore
+
+    certificate = _firebase_certificate()
+    return firestore.Client(credentials=certificate.get_credential(), project=certificate.project_id)
+
+
+def get_firestore_client():
+    """Firestore client sharing the Firebase service account, or None if not configured."""
+    return _lazy_client("firestore", _init_firestore_client)
+
+
+def _init_openai_client():
+    from openai import OpenAI
+
+    return OpenAI()
+
+
+def get_openai_client():
+    return _lazy_client("openai", _init_openai_client)
 
-except Exception as e:
-    logger.error(f"Firebase initialization error: {e}")
-    firebase_admin = None
 
 Base = declarative_base()
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+SessionLocal = sessionmaker()
+
+# Postgres arrays; stored as JSON on SQLite so local benchmarks run without Postgres
+StringArray = ARRAY(String).with_variant(JSON(), "sqlite")
 
 class ResumeReport(Base):
     __tablename__ = "resume_reports"
@@ -93,65 +265,277 @@ class ResumeReport(Base):
     candidate_name = Column(String)
     suggested_job_role = Column(String)
     resume_summary = Column(Text)
-    skills_present = Column(ARRAY(String))
-    skills_missing = Column(ARRAY(String))
-    normalized_skills = Column(ARRAY(String))
-    matching_skills = Column(ARRAY(String))
-    missing_skills = Column(ARRAY(String))
+    skills_present = Column(StringArray)
+    skills_missing = Column(StringArray)
+    normalized_skills = Column(StringArray)
+    matching_skills = Column(StringArray)
+    missing_skills = Column(StringArray)
     score_out_of_100 = Column(Integer)
     experience_score = Column(Float, default=0.0)
     skill_match_score = Column(Float, default=0.0)
+    # Scoring signals kept for rescoring; NULL on reports evaluated before they were stored
+    relevance_score = Column(Float)
+    resume_markers = Column(Integer)
     status = Column(String)
     email_sent = Column(Boolean, default=False)
     interview_username = Column(String)
     interview_password = Column(String)
     firebase_uid = Column(String)
+    # L2-normalized float32 resume embedding, indexed by CandidateIndex
+    resume_embedding = Column(LargeBinary)
+    # MinHash signature of the resume text's word shingles (see resume_sketch)
+    resume_sketch = Column(LargeBinary)
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
-def migrate_database():
-    """Add new columns if they don't exist"""
-    from sqlalchemy import text
+class InvitationOutbox(Base):
+    """Interview invitations queued for the background sender"""
+    __tablename__ = "invitation_outbox"
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, nullable=False, index=True)
+    status = Column(String, default="pending", index=True)  # pending, sending, sent, failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+
+class BatchEvaluation(Base):
+    """An offline evaluation run through the OpenAI Batch API (see advance_batch_evaluation)"""
+    __tablename__ = "batch_evaluations"
+    id = Column(Integer, primary_key=True, index=True)
+    status = Column(String, default="extracting", index=True)  # extracting, matching, completed, failed
+    job_description = Column(Text)
+    jd_skills = Column(StringArray)
+    jd_embedding = Column(LargeBinary)
+    batch_ids = Column(JSON)  # OpenAI batches of the current round
+    last_error = Column(Text)
+    next_poll_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime)
+
+
+class BatchEvaluationItem(Base):
+    __tablename__ = "batch_evaluation_items"
+    id = Column(Integer, primary_key=True, index=True)
+    evaluation_id = Column(Integer, nullable=False, index=True)
+    filename = Column(String)
+    resume_text = Column(Text)
+    results = Column(JSON)  # Response content by prompt kind; missing kinds fall back like the sync calls
+    resume_embedding = Column(LargeBinary)
+    report_id = Column(Integer)
+
+
+# Dashboard aggregates, kept current on every report insert (see _count_inserted_report)
+# so analytics reads a handful of rows however large resume_reports grows.
+SCORE_BUCKET_WIDTH = 10
+
+
+class ScoreBucketCount(Base):
+    __tablename__ = "report_score_buckets"
+    bucket = Column(Integer, primary_key=True)  # score // SCORE_BUCKET_WIDTH; 100 falls in the top bucket
+    count = Column(Integer, nullable=False, default=0)
+
+
+class StatusDailyCount(Base):
+    __tablename__ = "report_status_daily"
+    day = Column(Date, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
 
+
+class SkillCount(Base):
+    __tablename__ = "report_skill_counts"
+    kind = Column(String, primary_key=True)  # matching or missing
+    skill = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    __table_args__ = (Index("ix_report_skill_counts_kind_count", "kind", "count"),)
+
+
+def score_bucket(score: int) -> int:
+    return min(int(score) // SCORE_BUCKET_WIDTH, 100 // SCORE_BUCKET_WIDTH - 1)
+
+
+def report_aggregate_deltas(reports, sign: int = 1) -> Dict[type, Counter]:
+    """Aggregate count changes for adding (sign=1) or removing (sign=-1) reports.
+
+    `reports` are ResumeReport rows or anything with the same attributes.
+    """
+    deltas = {ScoreBucketCount: Counter(), StatusDailyCount: Counter(), SkillCount: Counter()}
+    for report in reports:
+        if report.score_out_of_100 is not None:
+            deltas[ScoreBucketCount][(score_bucket(report.score_out_of_100),)] += sign
+        if report.status:
+            day = (report.created_at or datetime.utcnow()).date()
+            deltas[StatusDailyCount][(day, report.status)] += sign
+        for kind, skills in (("matching", report.matching_skills), ("missing", report.missing_skills)):
+            for skill in set(skills or []):
+                deltas[SkillCount][(kind, skill)] += sign
+    return deltas
+
+
+def apply_aggregate_deltas(connection, deltas: Dict[type, Counter]):
+    """Add the deltas with INSERT ... ON CONFLICT DO UPDATE, so concurrent writers never lose counts"""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    for model, counts in deltas.items():
+        keys = [c.name for c in model.__table__.primary_key.columns]
+        # Sorted so concurrent transactions lock rows in the same order
+        rows = [dict(zip(keys, key), count=n) for key, n in sorted(counts.items()) if n]
+        if not rows:
+            continue
+        statement = insert(model.__table__).values(rows)
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=keys, set_={"count": model.__table__.c.count + statement.excluded["count"]}
+        ))
+
+
+@event.listens_for(ResumeReport, "after_insert")
+def _count_inserted_report(mapper, connection, report):
+    apply_aggregate_deltas(connection, report_aggregate_deltas([report]))
+
+
+def rebuild_report_aggregates(connection):
+    """Recount the aggregates from resume_reports (one full scan, for backfills)"""
+    from sqlalchemy import inspect
+    from types import SimpleNamespace
+
+    table = ResumeReport.__table__
+    names = ["score_out_of_100", "status", "created_at", "matching_skills", "missing_skills"]
+    # Very old databases may lack some of the columns
+    existing = {c["name"] for c in inspect(connection).get_columns(table.name)}
+    columns = [table.c[name] for name in names if name in existing]
+    deltas = {ScoreBucketCount: Counter(), StatusDailyCount: Counter(), SkillCount: Counter()}
+    result = connection.execution_options(yield_per=10000).execute(table.select().with_only_columns(*columns))
+    for row in result:
+        report = SimpleNamespace(**{**dict.fromkeys(names), **row._mapping})
+        for model, counts in report_aggregate_deltas([report]).items():
+            deltas[model].update(counts)
+    for model in deltas:
+        connection.execute(model.__table__.delete())
+    apply_aggregate_deltas(connection, deltas)
+
+
+# Ordered schema migrations: (version, description, steps). A step is either
+# ("add_column", table, column, type), applied only when the column is missing,
+# an idempotent SQL string, or a function called with the connection. New tables
+# come from the models via create_all, so their version needs no steps (unless
+# they must be backfilled). Append new versions; never edit applied ones.
+SCHEMA_MIGRATIONS = [
+    (1, "Scoring columns", [
+        ("add_column", "resume_reports", "experience_score", "FLOAT DEFAULT 0.0"),
+        ("add_column", "resume_reports", "skill_match_score", "FLOAT DEFAULT 0.0"),
+    ]),
+    (2, "Interview integration columns", [
+        ("add_column", "resume_reports", "candidate_email", "VARCHAR(255)"),
+        ("add_column", "resume_reports", "candidate_name", "VARCHAR(255)"),
+        ("add_column", "resume_reports", "email_sent", "BOOLEAN DEFAULT FALSE"),
+        ("add_column", "resume_reports", "interview_username", "VARCHAR(255)"),
+        ("add_column", "resume_reports", "interview_password", "VARCHAR(255)"),
+        ("add_column", "resume_reports", "firebase_uid", "VARCHAR(255)"),
+        ("add_column", "resume_reports", "created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP"),
+    ]),
+    (3, "Invitation outbox table", []),
+    (4, "Stored resume embeddings", [
+        ("add_column", "resume_reports", "resume_embedding", "BYTEA"),
+    ]),
+    (5, "Stored scoring signals", [
+        ("add_column", "resume_reports", "relevance_score", "FLOAT"),
+        ("add_column", "resume_reports", "resume_markers", "INTEGER"),
+    ]),
+    (6, "Report analytics aggregates", [rebuild_report_aggregates]),
+    (7, "Batch evaluation tables", []),
+    (8, "Resume text sketches", [
+        ("add_column", "resume_reports", "resume_sketch", "BYTEA"),
+    ]),
+]
+LATEST_SCHEMA_VERSION = SCHEMA_MIGRATIONS[-1][0]
+
+# Postgres advisory lock key held while migrating so concurrent replicas don't race
+MIGRATION_LOCK_KEY = 0x5E5A11E
+
+
+def schema_version(engine) -> int:
+    """Current schema version (0 if the database has never been versioned)"""
     try:
         with engine.connect() as connection:
-            # Existing migrations
-            try:
-                connection.execute(text("ALTER TABLE resume_reports ADD COLUMN experience_score FLOAT DEFAULT 0.0"))
-                logger.info("Added experience_score column")
-            except Exception:
-                logger.info("experience_score column already exists")
+            return connection.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar() or 0
+    except Exception:
+        return 0
 
-            try:
-                connection.execute(text("ALTER TABLE resume_reports ADD COLUMN skill_match_score FLOAT DEFAULT 0.0"))
-                logger.info("Added skill_match_score column")
-            except Exception:
-                logger.info("skill_match_score column already exists")
-
-            # New columns for interview integration
-            new_columns = [
-                ("candidate_email", "VARCHAR(255)"),
-                ("candidate_name", "VARCHAR(255)"),
-                ("email_sent", "BOOLEAN DEFAULT FALSE"),
-                ("interview_username", "VARCHAR(255)"),
-                ("interview_password", "VARCHAR(255)"),
-                ("firebase_uid", "VARCHAR(255)"),
-                ("created_at", "TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
-            ]
 
-            for column_name, column_type in new_columns:
-                try:
-                    connection.execute(text(f"ALTER TABLE resume_reports ADD COLUMN {column_name} {column_type}"))
-                    logger.info(f"Added {column_name} column")
-                except Exception:
-                    logger.info(f"{column_name} column already exists")
+def migrate_database(engine=None) -> int:
+    """Create missing tables and apply pending migrations once; returns the schema version"""
+    from sqlalchemy import inspect
 
-            connection.commit()
-    except Exception as e:
-        logger.error(f"Migration error: {e}")
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            # Released at commit; a second replica waits here, then finds nothing to do
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+        connection.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, description VARCHAR(255), "
+            "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        ))
+        current = connection.execute(text("SELECT MAX(version) FROM schema_migrations")).scalar() or 0
+        if current >= LATEST_SCHEMA_VERSION:
+            return current
 
-Base.metadata.create_all(bind=engine)
-migrate_database()
+        fresh = not inspect(connection).has_table("resume_reports")
+        Base.metadata.create_all(bind=connection)
+
+        for version, description, steps in SCHEMA_MIGRATIONS:
+            if version <= current:
+                continue
+            # A fresh database already has every column from the models
+            if not fresh:
+                inspector = inspect(connection)
+                for step in steps:
+                    if callable(step):
+                        step(connection)
+                        continue
+                    if isinstance(step, str):
+                        connection.execute(text(step))
+                        continue
+                    _, table, column, column_type = step
+                    if column not in {c["name"] for c in inspector.get_columns(table)}:
+                        connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+                        logger.info(f"Added {table}.{column} column")
+            connection.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:version, :description)"),
+                {"version": version, "description": description},
+            )
+            logger.info(f"Applied schema migration {version}: {description}")
+
+    return LATEST_SCHEMA_VERSION
+
+
+def _init_engine():
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    # Startup costs a single version check once the schema is current
+    if schema_version(engine) < LATEST_SCHEMA_VERSION:
+        migrate_database(engine)
+    SessionLocal.configure(bind=engine)
+    return engine
+
+
+def get_engine():
+    """SQLAlchemy engine; the schema is created and migrated on first use."""
+    engine = _lazy_client("database", _init_engine)
+    if engine is None:
+        raise RuntimeError(f"Database unavailable: {_client_errors.get('database')}")
+    return engine
+
+
+def get_session():
+    get_engine()
+    return SessionLocal()
 
 # Skill taxonomy (keeping the existing one)
 SKILL_TAXONOMY = {
@@ -254,8 +638,7 @@ def extract_email_from_resume(text: str) -> Optional[str]:
     
     return None
 
-def extract_name_from_resume(text: str) -> Optional[str]:
-    """Extract candidate name from resume text using GPT"""
+def name_request(text: str) -> Dict:
     prompt = f"""
     Extract the candidate's full name from this resume text. Return ONLY the name, nothing else.
     If multiple names are present, return the main candidate's name (usually at the top).
@@ -265,23 +648,25 @@ def extract_name_from_resume(text: str) -> Optional[str]:
     
     Name:
     """
-    
+    return {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1, "max_tokens": 50}
+
+def parse_name(content: str) -> Optional[str]:
+    name = content.strip()
+    # Clean up the name (remove titles, extra text)
+    name = re.sub(r'\b(Mr|Mrs|Ms|Dr|Prof)\.?\s*', '', name, flags=re.IGNORECASE)
+    name = name.split('\n')[0].strip()
+
+    return name if name and len(name.split()) <= 4 else None
+
+def extract_name_from_resume(text: str) -> Optional[str]:
+    """Extract candidate name from resume text using GPT"""
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=50
-        )
-        
-        name = response.choices[0].message.content.strip()
-        # Clean up the name (remove titles, extra text)
-        name = re.sub(r'\b(Mr|Mrs|Ms|Dr|Prof)\.?\s*', '', name, flags=re.IGNORECASE)
-        name = name.split('\n')[0].strip()
-        
-        return name if name and len(name.split()) <= 4 else None
+        response = create_chat_completion(stage="extract_name", **name_request(text))
+        return parse_name(response.choices[0].message.content)
     except Exception as e:
         logger.error(f"Error extracting name: {e}")
+        record_fallback("extract_name", "gpt-3.5-turbo")
         return None
 
 def generate_credentials() -> Tuple[str, str]:
@@ -294,138 +679,622 @@ def generate_credentials() -> Tuple[str, str]:
     
     return username, password
 
-load_dotenv()  # Load from .env
-
-firebase_credentials = {
-    "type": "service_account",
-    "project_id": os.getenv("FIREBASE_PROJECT_ID"),
-    "private_key_id": "dummy-key-id",  # Not used but required
-    "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace('\\n', '\n'),
-    "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
-    "client_id": os.getenv("FIREBASE_CLIENT_ID"),
-    "auth_uri": os.getenv("FIREBASE_AUTH_URI"),
-    "token_uri": os.getenv("FIREBASE_TOKEN_URI"),
-    "auth_provider_x509_cert_url": os.getenv("FIREBASE_AUTH_PROVIDER_CERT_URL"),
-    "client_x509_cert_url": os.getenv("FIREBASE_CLIENT_CERT_URL"),
-    "universe_domain": os.getenv("FIREBASE_UNIVERSE_DOMAIN")
-}
-
-credentials = service_account.Credentials.from_service_account_info(firebase_credentials)
+# Firestore caps a write batch at 500 operations and an `in` filter at 30 values
+FIRESTORE_BATCH_LIMIT = 500
+FIRESTORE_IN_LIMIT = 30
+FIREBASE_PROVISION_CONCURRENCY = int(os.getenv("FIREBASE_PROVISION_CONCURRENCY", "8"))
+USERNAME_ATTEMPTS = 3
+USERNAME_CACHE_SIZE = int(os.getenv("USERNAME_CACHE_SIZE", "10000"))
+USERNAME_CACHE_TTL = float(os.getenv("USERNAME_CACHE_TTL", "600"))
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, object]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return item[1]
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class UsernameRepository:
+    """Interview usernames in Firestore.
+
+    `usernames/{username}` holds {uid, email, createdAt}; `username_by_uid/{uid}`
+    is a reverse index maintained alongside it so uid lookups are point reads.
+    Both directions are read in batches with get_all and kept in a TTL LRU
+    cache. Only existing mappings are cached: a free username may be taken by
+    another process at any time. Firestore errors propagate to the caller
+    instead of being read as "taken" or "not found".
+    """
 
+    USERNAMES = "usernames"
+    BY_UID = "username_by_uid"
+
+    def __init__(self, cache_size: int = USERNAME_CACHE_SIZE, cache_ttl: float = USERNAME_CACHE_TTL):
+        self._uid_by_username = TTLCache(cache_size, cache_ttl)
+        self._username_by_uid = TTLCache(cache_size, cache_ttl)
+
+    def _remember(self, username: str, uid: str):
+        self._uid_by_username.set(username, uid)
+        self._username_by_uid.set(uid, username)
+
+    def taken_usernames(self, usernames: List[str]) -> set:
+        """Return the usernames that already have a mapping"""
+        usernames = list(dict.fromkeys(usernames))
+        taken = {u for u in usernames if self._uid_by_username.get(u) is not None}
+        missing = [u for u in usernames if u not in taken]
+        if missing:
+            client = get_firestore_client()
+            refs = [client.collection(self.USERNAMES).document(u) for u in missing]
+            with track_stage("firestore_username_check"):
+                snapshots = list(client.get_all(refs))
+            for snapshot in snapshots:
+                if snapshot.exists:
+                    taken.add(snapshot.id)
+                    self._remember(snapshot.id, snapshot.get("uid"))
+        return taken
+
+    def usernames_for_uids(self, uids: List[str]) -> Dict[str, str]:
+        """Map Firebase UIDs to their existing usernames; UIDs without one are left out"""
+        uids = list(dict.fromkeys(uids))
+        found = {}
+        for uid in uids:
+            username = self._username_by_uid.get(uid)
+            if username is not None:
+                found[uid] = username
+        missing = [uid for uid in uids if uid not in found]
+        if not missing:
+            return found
+
+        client = get_firestore_client()
+        refs = [client.collection(self.BY_UID).document(uid) for uid in missing]
+        with track_stage("firestore_uid_lookup"):
+            snapshots = list(client.get_all(refs))
+        for snapshot in snapshots:
+            if snapshot.exists:
+                found[snapshot.id] = snapshot.get("username")
+                self._remember(found[snapshot.id], snapshot.id)
+
+        # Mappings written before the reverse index existed: query them once and backfill
+        legacy = [uid for uid in missing if uid not in found]
+        backfill = []
+        for start in range(0, len(legacy), FIRESTORE_IN_LIMIT):
+            chunk = legacy[start:start + FIRESTORE_IN_LIMIT]
+            with track_stage("firestore_uid_query"):
+                docs = list(client.collection(self.USERNAMES).where("uid", "in", chunk).stream())
+            for doc in docs:
+                uid = doc.get("uid")
+                if uid not in found:
+                    found[uid] = doc.id
+                    backfill.append((doc.id, uid))
+        if backfill:
+            self._write([(client.collection(self.BY_UID).document(uid), {"username": username})
+                         for username, uid in backfill])
+            for username, uid in backfill:
+                self._remember(username, uid)
+        return found
+
+    def save_mappings(self, mappings: List[Tuple[str, str, str]]):
+        """Write (username, uid, email) mappings and their reverse entries with batch writes"""
+        from google.cloud import firestore
+
+        client = get_firestore_client()
+        writes = []
+        for username, uid, email in mappings:
+            writes.append((client.collection(self.USERNAMES).document(username), {
+                "uid": uid,
+                "email": email,
+                "createdAt": firestore.SERVER_TIMESTAMP
+            }))
+            writes.append((client.collection(self.BY_UID).document(uid), {"username": username}))
+        self._write(writes)
+        for username, uid, _ in mappings:
+            self._remember(username, uid)
+
+    def _write(self, writes: List[Tuple[object, Dict]]):
+        client = get_firestore_client()
+        # Keep a mapping and its reverse entry in the same batch
+        limit = FIRESTORE_BATCH_LIMIT - FIRESTORE_BATCH_LIMIT % 2
+        for start in range(0, len(writes), limit):
+            batch = client.batch()
+            for ref, data in writes[start:start + limit]:
+                batch.set(ref, data)
+            with track_stage("firestore_save_mapping"):
+                batch.commit()
+
+
+username_repository = UsernameRepository()
+
+
+def reserve_usernames(usernames: List[str]) -> List[str]:
+    """Replace usernames taken in Firestore, or repeated within the list, with fresh ones"""
+    usernames = list(usernames)
+    for _ in range(USERNAME_ATTEMPTS):
+        taken = username_repository.taken_usernames(usernames)
+        seen = set()
+        clashes = []
+        for index, username in enumerate(usernames):
+            if username in taken or username in seen:
+                clashes.append(index)
+            seen.add(username)
+        if not clashes:
+            return usernames
+        logger.warning(f"{len(clashes)} generated usernames already taken, regenerating")
+        for index in clashes:
+            usernames[index] = generate_credentials()[0]
+    raise RuntimeError("Could not reserve unique usernames")
+
+
+def _get_or_create_auth_user(email: str, password: str, name: str) -> Tuple[str, bool]:
+    """Return (uid, created) for the Firebase user with this email, creating it if needed"""
+    from firebase_admin import auth as firebase_auth
 
-def is_username_taken(username: str) -> bool:
     try:
-        return db.collection("usernames").document(username).get().exists
-    except Exception as e:
-        logger.error(f"Error checking if username is taken: {e}")
-        return True
-# Now initialize Firestore with credentials
-db = firestore.Client(credentials=credentials, project=os.getenv("FIREBASE_PROJECT_ID"))
+        with track_stage("firebase_auth_create_user"):
+            user_record = firebase_auth.create_user(
+                email=email,
+                password=password,
+                display_name=name,
+                email_verified=False
+            )
+        logger.info(f"Created Firebase user: {user_record.uid}")
+        return user_record.uid, True
+    except firebase_auth.EmailAlreadyExistsError:
+        # Don't reset password by default – optional
+        logger.warning(f"User with email {email} already exists, reusing it.")
+        with track_stage("firebase_auth_get_user"):
+            return firebase_auth.get_user_by_email(email).uid, False
 
-def save_username_mapping(username: str, uid: str, email: str) -> bool:
-    try:
-        doc_ref = db.collection("usernames").document(username)
-        doc_ref.set({
-            "uid": uid,
-            "email": email,
-            "createdAt": firestore.SERVER_TIMESTAMP
-        })
-        return True
-    except Exception as e:
-        logger.error(f"Failed to save username mapping: {e}")
-        return False
 
-def get_username_by_uid(uid: str) -> Optional[str]:
-    try:
-        query = db.collection("usernames").where("uid", "==", uid).limit(1).stream()
-        for doc in query:
-            return doc.id
-        return None
-    except Exception as e:
-        logger.error(f"Error fetching username for UID {uid}: {e}")
-        return None
+def provision_firebase_users(candidates: List[Dict]) -> List[Optional[Tuple[str, str]]]:
+    """Create or reuse Firebase users and their username mappings for a batch of candidates.
+
+    Each candidate is a dict with email, password, name and username. Returns a
+    (uid, username) tuple or None per candidate, in order. Usernames are checked
+    with one batched read, accounts are created with bounded concurrency (once
+    per distinct email) and new mappings are written with batch writes.
+    """
+    results: List[Optional[Tuple[str, str]]] = [None] * len(candidates)
+    if not candidates:
+        return results
+    if get_firebase_app() is None or get_firestore_client() is None:
+        logger.warning("Firebase not initialized")
+        for _ in candidates:
+            record_fallback("firebase_user")
+        return results
+
+    with track_stage("firebase_provision"):
+        try:
+            usernames = reserve_usernames([c["username"] for c in candidates])
+        except Exception as e:
+            logger.error(f"Error checking usernames: {e}")
+            for _ in candidates:
+                record_fallback("firebase_user")
+            return results
+
+        first_by_email: Dict[str, int] = {}
+        for index, candidate in enumerate(candidates):
+            first_by_email.setdefault(candidate["email"].lower(), index)
+
+        accounts: Dict[str, Tuple[str, bool]] = {}
+        workers = max(1, min(FIREBASE_PROVISION_CONCURRENCY, len(first_by_email)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="firebase-provision") as pool:
+            futures = {
+                email: pool.submit(_get_or_create_auth_user, candidates[index]["email"],
+                                   candidates[index]["password"], candidates[index]["name"])
+                for email, index in first_by_email.items()
+            }
+            for email, future in futures.items():
+                try:
+                    accounts[email] = future.result()
+                except Exception as e:
+                    logger.error(f"Error creating Firebase user for {email}: {e}")
+
+        existing_uids = [uid for uid, created in accounts.values() if not created]
+        try:
+            mapped = username_repository.usernames_for_uids(existing_uids) if existing_uids else {}
+        except Exception as e:
+            # Without the lookup we can't tell whether an existing user already has a
+            # username, so leave those candidates unprovisioned rather than add a second one
+            logger.error(f"Error fetching usernames for existing users: {e}")
+            record_fallback("firestore_uid_lookup")
+            accounts = {email: account for email, account in accounts.items() if account[1]}
+            mapped = {}
+
+        new_mappings = []
+        for email, index in first_by_email.items():
+            if email not in accounts:
+                continue
+            uid, _ = accounts[email]
+            if uid not in mapped:
+                mapped[uid] = usernames[index]
+                new_mappings.append((usernames[index], uid, candidates[index]["email"]))
+        if new_mappings:
+            try:
+                username_repository.save_mappings(new_mappings)
+            except Exception as e:
+                logger.error(f"Failed to save username mappings: {e}")
+                for _, uid, _ in new_mappings:
+                    mapped.pop(uid, None)
+
+        for index, candidate in enumerate(candidates):
+            account = accounts.get(candidate["email"].lower())
+            if account is None or account[0] not in mapped:
+                record_fallback("firebase_user")
+                continue
+            results[index] = account[0], mapped[account[0]]
+    return results
 
 
 def create_firebase_user(email: str, password: str, name: str, username: str) -> Optional[Tuple[str, str]]:
     """Create Firebase user or reuse existing one. Save username mapping in Firestore. Return (UID, username)."""
-    if not firebase_admin:
-        logger.warning("Firebase not initialized")
-        return None
-
-    if is_username_taken(username):
-        logger.warning(f"Username {username} is already taken.")
-        return None
+    return provision_firebase_users([
+        {"email": email, "password": password, "name": name, "username": username}
+    ])[0]
+
+
+def provision_interview_accounts(pending: List[Dict]):
+    """Background stage: provision Firebase accounts and record UIDs on the saved reports"""
+    results = provision_firebase_users(pending)
+    updates = [
+        {"id": candidate["report_id"], "firebase_uid": result[0], "interview_username": result[1]}
+        for candidate, result in zip(pending, results)
+        if result is not None and candidate.get("report_id") is not None
+    ]
+    if not updates:
+        return
 
+    session = get_session()
     try:
-        # Create a new Firebase user
-        user_record = firebase_auth.create_user(
-            email=email,
-            password=password,
-            display_name=name,
-            email_verified=False
+        with track_stage("db_save"):
+            session.execute(update(ResumeReport), updates)
+            session.commit()
+        logger.info(f"Provisioned {len(updates)} interview accounts")
+    except Exception as e:
+        logger.error(f"Error saving provisioned accounts: {e}")
+        session.rollback()
+    finally:
+        session.close()
+
+
+# Persistent cache of chat completions, shared by every worker on the host.
+# Off unless LLM_CACHE_PATH is set; LLM_CACHE_BYPASS lists stages (call sites)
+# that always go to the API.
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "")
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+LLM_CACHE_COMPRESS = os.getenv("LLM_CACHE_COMPRESS", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_BYPASS = {stage.strip() for stage in os.getenv("LLM_CACHE_BYPASS", "").split(",") if stage.strip()}
+
+
+class ResponseCache:
+    """Size-bounded sqlite3 store of API responses by request key, with a TTL.
+
+    Values are optionally zstd-compressed. When the stored bytes exceed
+    `max_bytes`, the least recently used entries are evicted down to 90% of
+    it. Several processes can share one file (WAL mode); the size bound is
+    enforced from each process's running estimate, so it can briefly overshoot.
+    """
+
+    def __init__(self, path: str, ttl: float = LLM_CACHE_TTL, max_bytes: int = LLM_CACHE_MAX_BYTES,
+                 compress: bool = LLM_CACHE_COMPRESS):
+        import sqlite3
+
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._compressor = self._decompressor = None
+        if compress:
+            import zstandard
+
+            self._compressor = zstandard.ZstdCompressor(level=3)
+            self._decompressor = zstandard.ZstdDecompressor()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+            "compressed INTEGER NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
         )
-        logger.info(f"Created Firebase user: {user_record.uid}")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, compressed, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, compressed, created_at = row
+            if now - created_at > self.ttl:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        if compressed:
+            if self._decompressor is None:
+                import zstandard
+
+                self._decompressor = zstandard.ZstdDecompressor()
+            return self._decompressor.decompress(value)
+        return bytes(value)
+
+    def put(self, key: str, value: bytes):
+        compressed = self._compressor is not None
+        stored = self._compressor.compress(value) if compressed else value
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, compressed, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stored, int(compressed), len(stored), now, now),
+            )
+            self._bytes += len(stored)
+            if self._bytes > self.max_bytes:
+                self._evict(now)
+
+    def _evict(self, now: float):
+        """Drop expired entries, then the least recently used ones, down to 90% of max_bytes"""
+        self._db.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        excess = total - int(self.max_bytes * 0.9)
+        if excess > 0:
+            # The least recently used rows whose combined size covers the excess
+            self._db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM (SELECT key, SUM(size) OVER "
+                "(ORDER BY accessed_at, key ROWS UNBOUNDED PRECEDING) - size AS before FROM responses) "
+                "WHERE before < ?)",
+                (excess,),
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        self._bytes = total
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+def _init_llm_cache():
+    return ResponseCache(LLM_CACHE_PATH) if LLM_CACHE_PATH else None
+
+
+def get_llm_cache() -> Optional[ResponseCache]:
+    return _lazy_client("llm_cache", _init_llm_cache)
+
+
+class SingleFlight:
+    """Coalesce concurrent identical calls so only one of them does the work.
+
+    The first caller for a key runs the function; callers arriving while it is
+    still in flight wait on the same future and receive the same result (or
+    exception). Nothing is kept once the call finishes, so this complements
+    caching rather than replacing it.
+    """
 
-        save_username_mapping(username, user_record.uid, email)
-        return user_record.uid, username
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
 
-    except firebase_auth.EmailAlreadyExistsError:
-        logger.warning(f"User with email {email} already exists.")
+    def do(self, key: str, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
 
         try:
-            existing_user = firebase_auth.get_user_by_email(email)
-            uid = existing_user.uid
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                self._calls.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._calls.pop(key, None)
+        future.set_result(result)
+        return result
+
+
+inflight_requests = SingleFlight()
 
-            username_from_db = get_username_by_uid(uid)
-            if not username_from_db:
-                logger.info(f"No existing username mapping found, saving new mapping.")
-                save_username_mapping(username, uid, email)
-                username_from_db = username
 
-            # Don't reset password by default – optional
-            logger.info(f"Using existing user without resetting password for {email}")
-            return uid, username_from_db
+def request_key(kind: str, model: str, payload) -> str:
+    """Stable key for an API request: kind, model and a hash of the inputs."""
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{kind}:{model}:{digest}"
+
+
+def create_chat_completion(model: str, messages: List[Dict[str, str]], stage: str = "chat", **params):
+    """Chat completion call shared by every GPT prompt.
+
+    Identical concurrent requests are coalesced, and responses are served from
+    the LLM response cache when it is enabled for this stage.
+    """
+    from openai.types.chat import ChatCompletion
 
+    key = request_key("chat", model, {"messages": messages, **params})
+    cache = get_llm_cache() if stage not in LLM_CACHE_BYPASS else None
+    if cache is not None:
+        try:
+            cached = cache.get(key)
         except Exception as e:
-            logger.error(f"Failed to fetch/update existing user: {e}")
-            return None
+            logger.warning(f"LLM cache read failed: {e}")
+            cached = None
+        if cached is not None:
+            stage_metrics.increment("cache_hits", stage, model)
+            return ChatCompletion.model_validate_json(cached)
+
+    def fetch():
+        response = get_openai_client().chat.completions.create(model=model, messages=messages, **params)
+        if cache is not None:
+            try:
+                cache.put(key, response.model_dump_json().encode("utf-8"))
+            except Exception as e:
+                logger.warning(f"LLM cache write failed: {e}")
+        return response
 
-    except Exception as e:
-        logger.error(f"Error creating Firebase user: {e}")
-        return None
+    with track_stage(stage, model):
+        return inflight_requests.do(key, fetch)
 
 
-client = OpenAI()  
+def create_embeddings(inputs: List[str], model: str = "text-embedding-3-large", stage: str = "embedding",
+                      dimensions: Optional[int] = None):
+    """Embeddings call; identical concurrent requests are coalesced."""
+    params = {"dimensions": dimensions} if dimensions else {}
+    key = request_key("embeddings", model, {"input": inputs, **params})
+    with track_stage(stage, model):
+        return inflight_requests.do(key, get_openai_client().embeddings.create, input=inputs, model=model, **params)
 
-def send_interview_email(candidate_email: str, candidate_name: str, username: str, password: str, skills: list) -> bool:
-    """Send interview invitation email to candidate"""
-    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
-        logger.warning("Email credentials not configured")
-        return False
 
-    try:
-        # Normalize skills input
-        if isinstance(skills, str):
-            # If skills is a string, split by commas
-            skills = [skill.strip() for skill in skills.split(',') if skill.strip()]
-        elif isinstance(skills, list):
-            # If skills is a list of single-character strings, likely a mistaken split of a string
-            if all(isinstance(s, str) and len(s) == 1 for s in skills):
-                # Join back and split properly
-                skills_str = "".join(skills)
-                skills = [skill.strip() for skill in skills_str.split(',') if skill.strip()]
-            else:
-                # Clean each skill string (trim spaces)
-                skills = [skill.strip() for skill in skills if isinstance(skill, str) and skill.strip()]
+# Many providers drop a session after ~100 messages; reconnect before that
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", "4"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "90"))
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "60"))
+
+
+class SMTPConnectionPool:
+    """Authenticated SMTP sessions reused across messages.
+
+    Opening a connection costs a TCP handshake, STARTTLS and AUTH; a pooled
+    session pays that once and then only MAIL/RCPT/DATA per message. At most
+    `size` sessions are open; idle ones older than `idle_seconds` are dropped.
+    """
+
+    def __init__(self, size: int = SMTP_POOL_SIZE, max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION,
+                 idle_seconds: float = SMTP_IDLE_SECONDS):
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self._idle: List[Tuple[smtplib.SMTP, int, float]] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self) -> smtplib.SMTP:
+        with track_stage("smtp_connect"):
+            server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=30)
+            try:
+                server.starttls()
+                server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+            except Exception:
+                server.close()
+                raise
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    def _checkout(self) -> Tuple[smtplib.SMTP, int]:
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                server, sent, last_used = self._idle.pop()
+                if now - last_used <= self.idle_seconds:
+                    return server, sent
+                self._close(server)
+        return self._connect(), 0
+
+    def _checkin(self, server: smtplib.SMTP, sent: int):
+        if sent >= self.max_messages:
+            self._close(server)
+            return
+        with self._lock:
+            self._idle.append((server, sent, time.monotonic()))
+
+    def send(self, from_addr: str, to_addrs, message: str):
+        """Send one message on a pooled session; raises the smtplib error on failure"""
+        with self._slots:
+            server, sent = self._checkout()
+            try:
+                with track_stage("smtp_send"):
+                    server.sendmail(from_addr, to_addrs, message)
+            except smtplib.SMTPServerDisconnected:
+                server.close()
+                if sent == 0:
+                    raise
+                # The server timed out an idle pooled session; retry once on a fresh one
+                server, sent = self._connect(), 0
+                try:
+                    with track_stage("smtp_send"):
+                        server.sendmail(from_addr, to_addrs, message)
+                except Exception:
+                    server.close()
+                    raise
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # The server answered, so the session is still usable
+                self._checkin(server, sent + 1)
+                raise
+            except Exception:
+                server.close()
+                raise
+            self._checkin(server, sent + 1)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server, _, _ in idle:
+            self._close(server)
+
+
+smtp_pool = SMTPConnectionPool()
+
+
+def build_interview_message(candidate_email: str, candidate_name: str, username: str, password: str, skills: list) -> MIMEMultipart:
+    """Build the interview invitation email"""
+    # Normalize skills input
+    if isinstance(skills, str):
+        # If skills is a string, split by commas
+        skills = [skill.strip() for skill in skills.split(',') if skill.strip()]
+    elif isinstance(skills, list):
+        # If skills is a list of single-character strings, likely a mistaken split of a string
+        if all(isinstance(s, str) and len(s) == 1 for s in skills):
+            # Join back and split properly
+            skills_str = "".join(skills)
+            skills = [skill.strip() for skill in skills_str.split(',') if skill.strip()]
+        else:
+            # Clean each skill string (trim spaces)
+            skills = [skill.strip() for skill in skills if isinstance(skill, str) and skill.strip()]
 
-        skills_text = ", ".join(skills[:10])  # Limit to first 10 skills
+    skills_text = ", ".join(skills[:10])  # Limit to first 10 skills
 
-        msg = MIMEMultipart()
-        msg['From'] = EMAIL_ADDRESS
-        msg['To'] = candidate_email
-        msg['Subject'] = "Interview Invitation - Technical Round"
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_ADDRESS
+    msg['To'] = candidate_email
+    msg['Subject'] = "Interview Invitation - Technical Round"
 
-        body = f"""
+    body = f"""
 Dear {candidate_name or 'Candidate'},
 
 Congratulations! Based on your CV, you have been shortlisted for a round of technical interview.
@@ -457,13 +1326,19 @@ Hiring Team
 ---
 This is an automated message. Please do not reply to this email.
 """
-        msg.attach(MIMEText(body, 'plain'))
+    msg.attach(MIMEText(body, 'plain'))
+    return msg
+
+
+def send_interview_email(candidate_email: str, candidate_name: str, username: str, password: str, skills: list) -> bool:
+    """Send interview invitation email to candidate"""
+    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+        logger.warning("Email credentials not configured")
+        return False
 
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
-        server.sendmail(EMAIL_ADDRESS, candidate_email, msg.as_string())
-        server.quit()
+    try:
+        msg = build_interview_message(candidate_email, candidate_name, username, password, skills)
+        smtp_pool.send(EMAIL_ADDRESS, candidate_email, msg.as_string())
 
         logger.info(f"Interview email sent successfully to {candidate_email}")
         return True
@@ -473,6 +1348,182 @@ This is an automated message. Please do not reply to this email.
         return False
 
 
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_SECONDS = float(os.getenv("OUTBOX_RETRY_SECONDS", "30"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+# A claimed entry whose sender died becomes claimable again after this long
+OUTBOX_LEASE_SECONDS = 600
+
+
+def is_transient_smtp_error(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return isinstance(error, OSError)
+
+
+def claim_outbox_batch(session, limit: int) -> List[Tuple[int, int, int]]:
+    """Lease due outbox entries to this sender; returns (entry id, report id, attempt) tuples"""
+    now = datetime.utcnow()
+    entries = (
+        session.query(InvitationOutbox)
+        .filter(InvitationOutbox.status.in_(("pending", "sending")), InvitationOutbox.next_attempt_at <= now)
+        .order_by(InvitationOutbox.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)  # Concurrent workers take disjoint batches on Postgres
+        .all()
+    )
+    claimed = []
+    for entry in entries:
+        entry.status = "sending"
+        entry.attempts = (entry.attempts or 0) + 1
+        entry.next_attempt_at = now + timedelta(seconds=OUTBOX_LEASE_SECONDS)
+        claimed.append((entry.id, entry.report_id, entry.attempts))
+    session.commit()
+    return claimed
+
+
+def dispatch_pending_invitations(limit: int = OUTBOX_BATCH_SIZE) -> Dict[str, int]:
+    """Send one batch of queued invitations over pooled SMTP sessions and record the results in bulk"""
+    result = {"claimed": 0, "sent": 0, "retrying": 0, "failed": 0}
+    if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+        return result
+
+    session = get_session()
+    try:
+        claimed = claim_outbox_batch(session, limit)
+        if not claimed:
+            return result
+        result["claimed"] = len(claimed)
+
+        report_ids = [report_id for _, report_id, _ in claimed]
+        reports = {r.id: r for r in session.query(ResumeReport).filter(ResumeReport.id.in_(report_ids))}
+
+        # Accounts that background provisioning could not create get one more batched attempt
+        unprovisioned = [r for r in reports.values() if not r.firebase_uid and r.interview_username]
+        if unprovisioned:
+            accounts = provision_firebase_users([
+                {"email": r.candidate_email, "password": r.interview_password,
+                 "name": r.candidate_name or "Candidate", "username": r.interview_username}
+                for r in unprovisioned
+            ])
+            for report, account in zip(unprovisioned, accounts):
+                if account:
+                    report.firebase_uid, report.interview_username = account
+
+        messages = {}
+        for entry_id, report_id, _ in claimed:
+            report = reports.get(report_id)
+            if report is not None and report.candidate_email:
+                msg = build_interview_message(report.candidate_email, report.candidate_name,
+                                              report.interview_username, report.interview_password,
+                                              report.matching_skills or [])
+                messages[entry_id] = (report.candidate_email, msg.as_string())
+        session.commit()
+    finally:
+        session.close()
+
+    def deliver(entry_id: int) -> Tuple[int, Optional[Exception]]:
+        candidate_email, message = messages[entry_id]
+        try:
+            smtp_pool.send(EMAIL_ADDRESS, candidate_email, message)
+            return entry_id, None
+        except Exception as e:
+            return entry_id, e
+
+    errors: Dict[int, Optional[Exception]] = {}
+    if messages:
+        with ThreadPoolExecutor(max_workers=min(smtp_pool.size, len(messages)), thread_name_prefix="smtp-send") as pool:
+            errors = dict(pool.map(deliver, messages))
+
+    now = datetime.utcnow()
+    entry_updates = []
+    sent_reports = []
+    for entry_id, report_id, attempt in claimed:
+        if entry_id not in messages:
+            entry_updates.append({"id": entry_id, "status": "failed", "last_error": "Candidate or email address not found"})
+            result["failed"] += 1
+            continue
+        error = errors.get(entry_id)
+        if error is None:
+            entry_updates.append({"id": entry_id, "status": "sent", "sent_at": now, "last_error": None})
+            sent_reports.append({"id": report_id, "email_sent": True})
+            result["sent"] += 1
+        elif is_transient_smtp_error(error) and attempt < OUTBOX_MAX_ATTEMPTS:
+            retry_at = now + timedelta(seconds=OUTBOX_RETRY_SECONDS * 2 ** (attempt - 1))
+            entry_updates.append({"id": entry_id, "status": "pending", "next_attempt_at": retry_at, "last_error": str(error)})
+            result["retrying"] += 1
+        else:
+            logger.error(f"Giving up on invitation {entry_id} after {attempt} attempts: {error}")
+            entry_updates.append({"id": entry_id, "status": "failed", "last_error": str(error)})
+            result["failed"] += 1
+
+    session = get_session()
+    try:
+        with track_stage("db_save"):
+            session.execute(update(InvitationOutbox), entry_updates)
+            if sent_reports:
+                session.execute(update(ResumeReport), sent_reports)
+            session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+    logger.info(f"Invitation batch: {result}")
+    return result
+
+
+class InvitationDispatcher:
+    """Background thread that drains the invitation outbox"""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                # Each thread gets its own stop flag, so a restart never sees an old one
+                self._stopping = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stopping,),
+                                                name="invitation-dispatcher", daemon=True)
+                self._thread.start()
+
+    def notify(self):
+        self.start()
+        self._wake.set()
+
+    def stop(self, timeout: float = 10):
+        """Finish the current round and exit; claimed invitations are sent first"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping.set()
+            self._wake.set()
+        thread.join(timeout)
+
+    def _run(self, stopping: threading.Event):
+        while not stopping.is_set():
+            try:
+                drained = dispatch_pending_invitations()["claimed"] == 0
+            except Exception as e:
+                logger.error(f"Invitation dispatcher error: {e}")
+                drained = True
+            if drained:
+                self._wake.wait(OUTBOX_POLL_SECONDS)
+                self._wake.clear()
+
+
+invitation_dispatcher = InvitationDispatcher()
+
+
 # Keep all existing functions (normalize_skill, extract_skills_with_gpt, etc.)
 def normalize_skill(skill: str) -> str:
     """Normalize skills using comprehensive taxonomy"""
@@ -490,8 +1541,7 @@ def normalize_skill(skill: str) -> str:
 
     return skill.strip().title()
 
-def extract_skills_with_gpt(text: str, context: str = "resume") -> List[str]:
-    """Extract skills from resume or job description text using GPT-3.5-turbo."""
+def skills_request(text: str, context: str = "resume") -> Dict:
     prompt = f"""
 Extract ALL technical skills, tools, frameworks, programming languages, databases, and technologies from this {context}.
 
@@ -511,103 +1561,302 @@ Example: ["Python", "React", "AWS", "Docker", "MySQL"]
 Text to analyze:
 ```{text[:3000]}```
 """.strip()
+    return {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.1, "max_tokens": 500}
 
-    try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.1,
-            max_tokens=500
-        )
+def parse_skills(content: str) -> List[str]:
+    content = content.strip()
 
-        content = response.choices[0].message.content.strip()
+    if content.startswith('[') and content.endswith(']'):
+        skills = json.loads(content)
+        return [skill.strip() for skill in skills if skill and isinstance(skill, str)]
+    else:
+        lines = content.split('\n')
+        skills = []
+        for line in lines:
+            line = line.strip().strip('"-\' ')
+            if line and not any(prefix in line.lower() for prefix in ["example", "note", "skills"]):
+                skills.append(line)
+        return skills[:30]
 
-        if content.startswith('[') and content.endswith(']'):
-            skills = json.loads(content)
-            return [skill.strip() for skill in skills if skill and isinstance(skill, str)]
-        else:
-            lines = content.split('\n')
-            skills = []
-            for line in lines:
-                line = line.strip().strip('"-\' ')
-                if line and not any(prefix in line.lower() for prefix in ["example", "note", "skills"]):
-                    skills.append(line)
-            return skills[:30]
+def extract_skills_with_gpt(text: str, context: str = "resume") -> List[str]:
+    """Extract skills from resume or job description text using GPT-3.5-turbo."""
+    stage = "extract_jd_skills" if context == "job description" else "extract_skills"
+    try:
+        response = create_chat_completion(stage=stage, **skills_request(text, context))
+        return parse_skills(response.choices[0].message.content)
 
     except Exception as e:
         logger.error(f"Error extracting skills with GPT: {e}")
+        record_fallback(stage, "gpt-3.5-turbo")
         return []
 
 
+# Experience requirements are read from tokens: one linear pass splits the text into runs of
+# ASCII letters, digits, whitespace and other word characters, plus single punctuation
+# characters. The scanners below find what the earlier regular expressions matched, but
+# visit each token a bounded number of times; the regexes backtracked quadratically (or
+# worse) over long postings with few numbers in them.
+_TOKEN_RE = re.compile(r"(?P<alpha>[a-zA-Z]+)|(?P<digits>\d+)|(?P<space>\s+)|(?P<word>[^\W\da-zA-Z]+)|(?P<punct>.)", re.S)
+_GROUP_KINDS = frozenset({"alpha", "digits", "word", "space", ",", "-"})  # [\w\s,-]
+_PHRASE_KINDS = frozenset({"alpha", "space", ".", "-"})  # [a-zA-Z.\-\s]
+_SEPARATOR_KINDS = frozenset({"space", "-", ":"})  # [\s\-:]
+_GAP_KINDS = frozenset({"space", "+", "-"})  # [+\-\s]
+_DASH_SPACE_KINDS = frozenset({"space", "-"})  # [\s\-]
+_UNIT_WORDS = ("years", "year", "yrs", "yr")
+
+
+class _Tokens:
+    """A text split into typed runs; punctuation tokens have the character itself as their kind"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.kinds, self.starts, self.ends = [], [], []
+        for match in _TOKEN_RE.finditer(text):
+            self.kinds.append(match.group() if match.lastgroup == "punct" else match.lastgroup)
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+        self._run_ends = {}
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def word(self, i: int) -> str:
+        return self.text[self.starts[i]:self.ends[i]].lower()
+
+    def position(self, i: int) -> int:
+        return self.starts[i] if i < len(self.kinds) else len(self.text)
+
+    def index_at(self, position: int) -> int:
+        """Index of the token containing `position` (len(self) at the end of the text)"""
+        if position >= len(self.text):
+            return len(self.kinds)
+        return bisect.bisect_right(self.starts, position) - 1
+
+    def run_end(self, i: int, kinds: frozenset) -> int:
+        """Index of the first token at or after `i` whose kind is not in `kinds`"""
+        run_ends = self._run_ends.get(kinds)
+        if run_ends is None:
+            run_ends = [len(self.kinds)] * (len(self.kinds) + 1)
+            for j in range(len(self.kinds) - 1, -1, -1):
+                run_ends[j] = run_ends[j + 1] if self.kinds[j] in kinds else j
+            self._run_ends[kinds] = run_ends
+        return run_ends[i]
+
+    def unit(self, i: int) -> Optional[Tuple[int, int]]:
+        r"""For the number at `i` followed by `[+\-\s]*(?:years?|yrs?)`: the unit's token and end position"""
+        j = self.run_end(i + 1, _GAP_KINDS)
+        if j < len(self.kinds) and self.kinds[j] == "alpha":
+            word = self.word(j)
+            for unit in _UNIT_WORDS:
+                if word.startswith(unit):
+                    return j, self.starts[j] + len(unit)
+        return None
+
+    def whole_unit(self, i: int) -> Optional[int]:
+        """Like `unit`, with whitespace after a whole unit word: the index of the token after it"""
+        found = self.unit(i)
+        if found is None or self.word(found[0]) not in _UNIT_WORDS:
+            return None
+        return self.after_space(found[0] + 1)
+
+    def after_space(self, i: int) -> Optional[int]:
+        return i + 1 if i < len(self.kinds) and self.kinds[i] == "space" else None
+
+    def after_words(self, i: int, words: Tuple[str, ...]) -> Optional[int]:
+        """Index of the token after `words`, each followed by whitespace, if they start at `i`"""
+        for word in words:
+            if i >= len(self.kinds) or self.kinds[i] != "alpha" or self.word(i) != word:
+                return None
+            i = self.after_space(i + 1)
+            if i is None:
+                return None
+        return i
+
+    def lead_start(self, i: int, lead: Tuple[str, ...]) -> Optional[int]:
+        """Where whitespace-separated `lead` words directly before token `i` start; the first may end a longer word"""
+        start = self.starts[i]
+        for n, word in enumerate(reversed(lead)):
+            j = i - 2 * n - 2
+            if j < 0 or self.kinds[j + 1] != "space" or self.kinds[j] != "alpha":
+                return None
+            token = self.word(j)
+            if not (token.endswith(word) if n == len(lead) - 1 else token == word):
+                return None
+            start = self.ends[j] - len(word)
+        return start
+
+
+@lru_cache(maxsize=16)
+def _tokenize(text: str) -> _Tokens:
+    # calculate_experience_score asks about every skill against the same two texts
+    return _Tokens(text)
+
+
+def _grouped_years(tokens: _Tokens):
+    r"""(years, group) for each `([\w\s,-]+?)\s+(\d+)[+\-\s]*(?:years?|yrs?)`, in order"""
+    kinds, starts, ends = tokens.kinds, tokens.starts, tokens.ends
+    start, i = 0, 0
+    while i < len(kinds):
+        if kinds[i] not in _GROUP_KINDS:
+            start = ends[i]
+        elif kinds[i] == "digits" and i > 0 and kinds[i - 1] == "space":
+            unit = tokens.unit(i)
+            group_end = max(starts[i - 1], start + 1)  # The group takes at least one character
+            if unit and group_end < ends[i - 1]:
+                yield int(tokens.text[starts[i]:ends[i]]), tokens.text[start:group_end]
+                i, start = unit
+        i += 1
+
+
+def _years_before_skill(tokens: _Tokens, skill: str):
+    r"""Years of each `(\d+)[+\-\s]*(?:years?|yrs?)\s+(?:experience\s+in\s+|with\s+)?<skill>`"""
+    resume = 0
+    for i, kind in enumerate(tokens.kinds):
+        if kind != "digits" or tokens.ends[i] <= resume:
+            continue
+        j = tokens.whole_unit(i)
+        if j is None:
+            continue
+        for words in (("experience", "in"), ("with",), ()):
+            k = tokens.after_words(j, words)
+            if k is not None and tokens.text.startswith(skill, tokens.position(k)):
+                yield int(tokens.text[max(tokens.starts[i], resume):tokens.ends[i]])
+                resume = tokens.position(k) + len(skill)
+                break
+
+
+def _years_after_skill(tokens: _Tokens, skill: str):
+    r"""Years of each `<skill>[\s\-]*?(\d+)[+\-\s]*(?:years?|yrs?)`"""
+    text = tokens.text
+    resume, skipped_to = 0, -1
+    position = text.find(skill)
+    while position != -1:
+        end = position + len(skill)
+        # Occurrences ending inside the separators already skipped reach the same number
+        if end > skipped_to:
+            i = tokens.index_at(end)
+            number = end
+            if i < len(tokens) and tokens.kinds[i] in _DASH_SPACE_KINDS:
+                i = tokens.run_end(i, _DASH_SPACE_KINDS)
+                number = tokens.position(i)
+            skipped_to = number
+            unit = tokens.unit(i) if i < len(tokens) and tokens.kinds[i] == "digits" else None
+            if unit:
+                yield int(text[number:tokens.ends[i]])
+                resume = unit[1]
+        position = text.find(skill, max(position + 1, resume))
+
+
+def _stated_years(tokens: _Tokens):
+    r"""Years of each `(\d+)\s*\+?\s*(?:years?|yrs?)\s+`, as in "7+ years of experience" """
+    for i, kind in enumerate(tokens.kinds):
+        if kind == "digits" and tokens.whole_unit(i) is not None:
+            gap = [kind for kind in tokens.kinds[i + 1:tokens.unit(i)[0]] if kind != "space"]
+            if gap in ([], ["+"]):
+                yield int(tokens.text[tokens.starts[i]:tokens.ends[i]])
+
+
+def _requirements_after_years(tokens: _Tokens, lead: Tuple[str, ...] = ()):
+    r"""(years, skill, start, end) of `<lead> (\d+)[+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?`
+    followed by `(?:in|with|using)\s+([a-zA-Z.\-\s]+)`"""
+    kinds, starts, ends = tokens.kinds, tokens.starts, tokens.ends
+    last_end = 0
+    for i, kind in enumerate(kinds):
+        if kind != "digits":
+            continue
+        start = tokens.lead_start(i, lead)
+        j = tokens.whole_unit(i) if start is not None and start >= last_end else None
+        if j is None:
+            continue
+        for optional in ("of", "experience"):
+            j = tokens.after_words(j, (optional,)) or j
+        if j >= len(kinds) or kinds[j] != "alpha" or tokens.word(j) not in ("in", "with", "using"):
+            continue
+        k = tokens.after_space(j + 1)
+        if k is None:
+            continue
+        if k < len(kinds) and kinds[k] in _PHRASE_KINDS:
+            end = tokens.position(tokens.run_end(k, _PHRASE_KINDS))
+            skill = tokens.text[starts[k]:end]
+        elif ends[k - 1] - starts[k - 1] > 1:
+            skill, end = "", ends[k - 1]  # The phrase is the last whitespace character
+        else:
+            continue
+        yield int(tokens.text[starts[i]:ends[i]]), skill.strip(), start, end
+        last_end = end
+
+
+def _requirements_before_years(tokens: _Tokens):
+    r"""(years, skill, start, end) of `([a-zA-Z.\-\s]+)[\s\-:]+(\d+)[+\-\s]*(?:years?|yrs?)`"""
+    kinds, starts, ends = tokens.kinds, tokens.starts, tokens.ends
+    resume, i = 0, 0
+    while i < len(kinds):
+        if kinds[i] not in _PHRASE_KINDS:
+            i += 1
+            continue
+        # Every start inside a phrase run ends at the same place, so only the first can match
+        start = max(starts[i], resume)
+        end = tokens.run_end(i, _PHRASE_KINDS)
+        number = None
+        if end < len(kinds) and kinds[end] == "digits":
+            if kinds[end - 1] in _DASH_SPACE_KINDS and starts[end] - 1 > start:
+                number, skill_end = end, starts[end] - 1
+        elif end < len(kinds) and kinds[end] == ":":
+            j = tokens.run_end(end, _SEPARATOR_KINDS)
+            if j < len(kinds) and kinds[j] == "digits":
+                number, skill_end = j, starts[end]
+        unit = tokens.unit(number) if number is not None else None
+        if unit is None:
+            i = end + 1
+            continue
+        yield int(tokens.text[starts[number]:ends[number]]), tokens.text[start:skill_end].strip(), start, unit[1]
+        resume = unit[1]
+        i = unit[0] if resume < ends[unit[0]] else unit[0] + 1
+
+
 def extract_jd_requirements(jd_text: str) -> Dict[str, Dict]:
     """Extract skill requirements from job description with context"""
     requirements = {}
-    
-    # Enhanced patterns for experience requirements
-    patterns = [
-        rf"(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?(?:in\s+|with\s+|using\s+)([a-zA-Z\.\-\s]+)",
-        rf"at\s+least\s+(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?(?:in\s+|with\s+|using\s+)([a-zA-Z\.\-\s]+)",
-        rf"minimum\s+(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?(?:in\s+|with\s+|using\s+)([a-zA-Z\.\-\s]+)",
-        rf"([a-zA-Z\.\-\s]+)[\s\-:]+(\d+)[\+\-\s]*(?:years?|yrs?)",
-        rf"experience[\s\w\-]*?([a-zA-Z\.\-\s]+)[\s\-:]*(\d+)[\+\-\s]*(?:years?|yrs?)"
+    tokens = _Tokens(jd_text)
+
+    # "5+ years of experience in Python", the same after "at least" and "minimum", then "Kubernetes: 2+ years";
+    # a later form wins for the same skill
+    matches = [
+        *_requirements_after_years(tokens),
+        *_requirements_after_years(tokens, ("at", "least")),
+        *_requirements_after_years(tokens, ("minimum",)),
+        *_requirements_before_years(tokens),
     ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, jd_text, re.IGNORECASE)
-        for match in matches:
-            try:
-                if pattern.startswith(r"([a-zA-Z"):  # Skill comes first
-                    skill = match.group(1).strip()
-                    years = int(match.group(2))
-                else:  # Years come first
-                    years = int(match.group(1))
-                    skill = match.group(2).strip()
-                
-                if 0 < years <= 20 and len(skill) > 1:
-                    skill_clean = re.sub(r'[^\w\s\.\-]', '', skill).strip()
-                    if skill_clean:
-                        # Check if it's a minimum requirement
-                        context_start = max(0, match.start() - 50)
-                        context = jd_text[context_start:match.end() + 20].lower()
-                        is_minimum = any(word in context for word in ['at least', 'minimum', 'min', '+'])
-                        
-                        requirements[skill_clean.lower()] = {
-                            'years': years,
-                            'is_minimum': is_minimum,
-                            'context': context.strip()
-                        }
-            except (ValueError, IndexError):
-                continue
-    
+    for years, skill, start, end in matches:
+        if 0 < years <= 20 and len(skill) > 1:
+            skill_clean = re.sub(r'[^\w\s\.\-]', '', skill).strip()
+            if skill_clean:
+                # Check if it's a minimum requirement
+                context_start = max(0, start - 50)
+                context = jd_text[context_start:end + 20].lower()
+                is_minimum = any(word in context for word in ['at least', 'minimum', 'min', '+'])
+
+                requirements[skill_clean.lower()] = {
+                    'years': years,
+                    'is_minimum': is_minimum,
+                    'context': context.strip()
+                }
+
     return requirements
 
 def extract_experience_years(text: str, skill: str) -> int:
-    text = text.lower()
+    tokens = _tokenize(text.lower())
     skill = skill.lower()
-    
+
     # Look for grouped years like: "Spring framework Rest, Boot, MVC, JDBC, Microservice 6 years"
-    grouped_pattern = re.findall(r'([\w\s\,\-]+?)\s+(\d+)[\+\-\s]*(?:years?|yrs?)', text)
-    for skill_group, years in grouped_pattern:
-        if skill in skill_group.lower():
-            return int(years)
-
-    # Fallback to individual patterns
-    patterns = [
-        rf"(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:experience\s+in\s+|with\s+)?{re.escape(skill)}",
-        rf"{re.escape(skill)}[\s\-]*?(\d+)[\+\-\s]*(?:years?|yrs?)"
-    ]
+    for years, skill_group in _grouped_years(tokens):
+        if skill in skill_group:
+            return years
 
-    max_years = 0
-    for pattern in patterns:
-        matches = re.findall(pattern, text)
-        for match in matches:
-            try:
-                years = int(match)
-                if 0 <= years <= 50:
-                    max_years = max(max_years, years)
-            except Exception:
-                continue
-    return max_years
+    # Fallback to individual mentions: "5 years with <skill>", "<skill> - 5 years"
+    mentions = [*_years_before_skill(tokens, skill), *_years_after_skill(tokens, skill)]
+    return max((years for years in mentions if 0 <= years <= 50), default=0)
 
 
 def calculate_experience_score(resume_text: str, jd_text: str, skills: List[str]) -> Tuple[float, Dict[str, Dict[str, float]]]:
@@ -637,8 +1886,7 @@ def calculate_experience_score(resume_text: str, jd_text: str, skills: List[str]
 
         # Fallback for "senior", "7+", etc.
         if candidate_years == 0:
-            years_in_resume = re.findall(r'(\d+)\s*(?:\+)?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience)?', resume_text.lower())
-            max_years = max([int(y) for y in years_in_resume if int(y) < 50], default=0)
+            max_years = max((y for y in _stated_years(_tokenize(resume_text.lower())) if y < 50), default=0)
             score = 70 if max_years >= 7 or "senior" in resume_text.lower() else 40
         elif candidate_years >= required_years:
             score = 100
@@ -661,10 +1909,7 @@ def calculate_experience_score(resume_text: str, jd_text: str, skills: List[str]
 
 
 
-def calculate_skill_match_score(resume_skills: List[str], jd_skills: List[str]) -> Tuple[float, List[str], List[str]]:
-    if not jd_skills:
-        return 85.0, resume_skills, []
-
+def skill_match_request(resume_skills: List[str], jd_skills: List[str]) -> Dict:
     system_prompt = (
         "You are an expert recruiter comparing a candidate's resume skills with a job description. "
         "Give credit for synonyms, closely related skills, and real-world equivalents. "
@@ -687,93 +1932,247 @@ Respond in strict JSON format:
   "missing_skills": [missing_skill1, missing_skill2, ...]
 }}
 """
+    return {
+        "model": "gpt-3.5-turbo",
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": 0.3,
+    }
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.3
-        )
+def parse_skill_match(content: str, resume_skills: List[str]) -> Tuple[float, List[str], List[str]]:
+    result = json.loads(content)
 
-        content = response.choices[0].message.content
-        result = json.loads(content)
+    # Apply bonus if resume shows seniority
+    if result.get("match_score", 0) < 65 and any(s.lower().startswith("senior") or "7+" in s or "8+" in s for s in resume_skills):
+        result["match_score"] = min(result["match_score"] + 15, 100)
 
-        # Apply bonus if resume shows seniority
-        if result.get("match_score", 0) < 65 and any(s.lower().startswith("senior") or "7+" in s or "8+" in s for s in resume_skills):
-            result["match_score"] = min(result["match_score"] + 15, 100)
+    return (
+        float(result.get("match_score", 0)),
+        result.get("matching_skills", []),
+        result.get("missing_skills", [])
+    )
+
+def calculate_skill_match_score(resume_skills: List[str], jd_skills: List[str]) -> Tuple[float, List[str], List[str]]:
+    if not jd_skills:
+        return 85.0, resume_skills, []
+
+    try:
+        response = create_chat_completion(stage="skill_match", **skill_match_request(resume_skills, jd_skills))
+        return parse_skill_match(response.choices[0].message.content, resume_skills)
+    except Exception as e:
+        print("Error parsing response or calling OpenAI:", e)
+        record_fallback("skill_match", "gpt-3.5-turbo")
+        return 0.0, [], jd_skills
+    
+
+
+SKILL_WEIGHT = 0.4
+EXPERIENCE_WEIGHT = 0.25
+RELEVANCE_WEIGHT = 0.35
+
+# Seniority markers found in the resume text, stored as a bitmask so reports
+# can be rescored without the text
+MARKER_SENIOR = 1  # "senior", any case
+MARKER_7_PLUS = 2  # "7+"
+MARKER_8_PLUS = 4  # "8+"
 
-        return (
-            float(result.get("match_score", 0)),
-            result.get("matching_skills", []),
-            result.get("missing_skills", [])
-        )
-    except Exception as e:
-        print("Error parsing response or calling OpenAI:", e)
-        return 0.0, [], jd_skills
-    
 
+def resume_markers(resume_text: str) -> int:
+    markers = 0
+    if "senior" in resume_text.lower():
+        markers |= MARKER_SENIOR
+    if "7+" in resume_text:
+        markers |= MARKER_7_PLUS
+    if "8+" in resume_text:
+        markers |= MARKER_8_PLUS
+    return markers
 
-def calculate_final_score(skill_score: float, experience_score: float, resume_text: str, jd_text: str) -> int:
-    skill_weight = 0.4
-    experience_weight = 0.25
-    relevance_weight = 0.35
 
+def calculate_relevance_score(resume_text: str, jd_text: str, resume_embedding: Optional[np.ndarray] = None,
+                              jd_embedding: Optional[np.ndarray] = None) -> float:
     try:
-        resume_embedding = get_embedding(resume_text)
-        jd_embedding = get_embedding(jd_text)
+        # Callers that already embedded the texts pass the vectors in
+        if resume_embedding is None or len(resume_embedding) == 0:
+            resume_embedding = get_embedding(resume_text)
+        if jd_embedding is None or len(jd_embedding) == 0:
+            jd_embedding = get_embedding(jd_text)
         relevance_score = cosine_similarity(resume_embedding, jd_embedding) * 100
-        relevance_score = min(relevance_score, 95)
+        return float(min(relevance_score, 95))
     except Exception:
-        relevance_score = 75.0
+        record_fallback("relevance_score")
+        return 75.0
+
+
+def combine_scores(skill_score, experience_score, relevance_score, markers) -> np.ndarray:
+    """Final scores from the stored signals; takes scalars or equal-length arrays"""
+    skill_score = np.asarray(skill_score, dtype=np.float64)
+    experience_score = np.asarray(experience_score, dtype=np.float64)
+    relevance_score = np.asarray(relevance_score, dtype=np.float64)
+    markers = np.asarray(markers, dtype=np.int64)
 
     final_score = (
-        skill_score * skill_weight +
-        experience_score * experience_weight +
-        relevance_score * relevance_weight
+        skill_score * SKILL_WEIGHT +
+        experience_score * EXPERIENCE_WEIGHT +
+        relevance_score * RELEVANCE_WEIGHT
     )
 
-    # Relax penalties and reward high semantic match
-    if skill_score < 30 and experience_score < 50:
-        final_score *= 0.92
-    elif skill_score > 80 and experience_score > 70 and relevance_score > 80:
-        final_score = min(final_score * 1.1, 100)
-    elif relevance_score > 85 and ("7+" in resume_text or "senior" in resume_text.lower()):
-        final_score = max(final_score, 78)
+    # Relax penalties and reward high semantic match; the first matching rule applies
+    weak = (skill_score < 30) & (experience_score < 50)
+    strong = ~weak & (skill_score > 80) & (experience_score > 70) & (relevance_score > 80)
+    senior_match = (~weak & ~strong & (relevance_score > 85)
+                    & ((markers & (MARKER_SENIOR | MARKER_7_PLUS)) != 0))
+    final_score = np.where(weak, final_score * 0.92, final_score)
+    final_score = np.where(strong, np.minimum(final_score * 1.1, 100), final_score)
+    final_score = np.where(senior_match, np.maximum(final_score, 78), final_score)
+
+    final_score = final_score + np.where((markers & (MARKER_SENIOR | MARKER_7_PLUS | MARKER_8_PLUS)) != 0, 5, 0)
+
+    return np.clip(np.round(final_score), 0, 100).astype(np.int64)
 
-    if "senior" in resume_text.lower() or "7+" in resume_text or "8+" in resume_text:
-        final_score += 5
 
-    return min(max(int(round(final_score)), 0), 100)
+def calculate_final_score(skill_score: float, experience_score: float, resume_text: str, jd_text: str,
+                          resume_embedding: Optional[np.ndarray] = None, jd_embedding: Optional[np.ndarray] = None) -> int:
+    relevance_score = calculate_relevance_score(resume_text, jd_text, resume_embedding, jd_embedding)
+    return int(combine_scores(skill_score, experience_score, relevance_score, resume_markers(resume_text)))
 
 
 
 def extract_text_from_pdf(pdf_bytes: bytes) -> str:
     """Extract text from PDF with better error handling"""
+    import fitz
+
     try:
-        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = ""
-        for page in doc:
-            text += page.get_text() + "\n"
-        doc.close()
+        with track_stage("pdf_parse"):
+            doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+            text = ""
+            for page in doc:
+                text += page.get_text() + "\n"
+            doc.close()
         return text.strip()
     except Exception as e:
         logger.error(f"Error extracting PDF text: {e}")
         return ""
 
+def embedding_input(text: str) -> str:
+    return text.replace("\n", " ")[:8000]
+
+# Embedding requests from concurrent callers are collected for up to
+# EMBEDDING_BATCH_WAIT_MS and sent as one API call of at most
+# EMBEDDING_BATCH_MAX_SIZE inputs and EMBEDDING_BATCH_MAX_TOKENS (estimated) tokens.
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "true").lower() in ("1", "true", "yes")
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+EMBEDDING_BATCH_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", "4"))
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+class EmbeddingBatcher:
+    """Micro-batch embedding requests from concurrent threads into shared API calls.
+
+    A collector thread takes the first waiting request, gathers whatever else
+    arrives within `wait_seconds` (up to the size and token bounds) and hands
+    the batch to a small pool that makes the call, so collecting continues
+    while calls are in flight. Identical inputs waiting or in flight are sent
+    once. If a batch call fails, its inputs are retried one by one so a
+    single bad input only fails its own caller.
+    """
+
+    def __init__(self, model: str = "text-embedding-3-large", max_size: int = EMBEDDING_BATCH_MAX_SIZE,
+                 max_tokens: int = EMBEDDING_BATCH_MAX_TOKENS, wait_seconds: float = EMBEDDING_BATCH_WAIT_MS / 1000,
+                 concurrency: int = EMBEDDING_BATCH_CONCURRENCY):
+        self.model = model
+        self.max_size = max_size
+        self.max_tokens = max_tokens
+        self.wait_seconds = wait_seconds
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._executor = ThreadPoolExecutor(concurrency, thread_name_prefix="embedding-batch")
+
+    def embed(self, text: str) -> List[float]:
+        """Embedding of one (already prepared) input; blocks until its batch returns"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._thread.start()
+            # Identical inputs already waiting or in flight share their future
+            future = self._pending.get(text)
+            if future is None:
+                future = self._pending[text] = Future()
+                self._queue.put((text, future))
+        return future.result()
+
+    def _run(self):
+        carried = None
+        while True:
+            first = carried or self._queue.get()
+            carried = None
+            batch, tokens = [first], estimate_tokens(first[0])
+            deadline = time.monotonic() + self.wait_seconds
+            while len(batch) < self.max_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                cost = estimate_tokens(item[0])
+                if tokens + cost > self.max_tokens:
+                    carried = item  # Starts the next batch
+                    break
+                batch.append(item)
+                tokens += cost
+            self._executor.submit(self._send, batch)
+
+    def _call(self, texts: List[str]) -> Dict[str, List[float]]:
+        response = create_embeddings(texts, model=self.model)
+        return {texts[item.index]: item.embedding for item in response.data}
+
+    def _send(self, batch: List[Tuple[str, Future]]):
+        texts = [text for text, _ in batch]
+        errors: Dict[str, Exception] = {}
+        try:
+            vectors = self._call(texts)
+        except Exception as e:
+            if len(texts) == 1:
+                vectors, errors = {}, {texts[0]: e}
+            else:
+                logger.warning(f"Embedding batch of {len(texts)} failed ({e}); retrying inputs separately")
+                vectors = {}
+                for text in texts:
+                    try:
+                        vectors.update(self._call([text]))
+                    except Exception as error:
+                        errors[text] = error
+        with self._lock:
+            for text, _ in batch:
+                self._pending.pop(text, None)
+        for text, future in batch:
+            if text in vectors:
+                future.set_result(vectors[text])
+            else:
+                future.set_exception(errors.get(text) or RuntimeError("Missing embedding in response"))
+
+
+embedding_batcher = EmbeddingBatcher()
+
+
 def get_embedding(text: str) -> np.ndarray:
     """Get text embedding using OpenAI"""
     try:
-        text = text.replace("\n", " ")[:8000]
-        response = openai.embeddings.create(
-            input=[text], 
-            model="text-embedding-3-large"
-        )
+        text = embedding_input(text)
+        if EMBEDDING_BATCHING:
+            return np.array(embedding_batcher.embed(text))
+        response = create_embeddings([text], model="text-embedding-3-large")
         return np.array(response.data[0].embedding)
     except Exception as e:
         logger.error(f"Error getting embedding: {e}")
+        record_fallback("embedding", "text-embedding-3-large")
         return np.array([])
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
@@ -785,17 +2184,31 @@ def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     except Exception:
         return 0.0
 
-def search_similar_resumes(job_embedding: np.ndarray, top_k=5):
-    """Search for similar resumes using embeddings"""
+def search_similar_resumes(job_embedding: np.ndarray, top_k=5, categories: Optional[List[str]] = None,
+                           compact: bool = False):
+    """Search for similar resumes using embeddings.
+
+    Without explicit `categories`, the scan is restricted to the job
+    description's CORPUS_AUTO_CATEGORIES most likely categories. Returns the
+    resume texts, or corpus_hit dicts when `compact`.
+    """
     try:
-        scores = [cosine_similarity(job_embedding, emb) for emb in resume_embeddings]
-        top_indices = np.argsort(scores)[::-1][:top_k]
-        return [resume_texts[i] for i in top_indices]
+        if len(job_embedding) == 0:
+            return []
+        corpus.maybe_refresh()
+        if categories is None:
+            categories = corpus.predict_categories(job_embedding, CORPUS_AUTO_CATEGORIES)
+        with track_stage("corpus_search"):
+            if compact:
+                return corpus.hits(job_embedding, top_k, categories=categories)
+            return corpus.search(job_embedding, top_k, categories=categories)
     except Exception:
         return []
 
-def recommend_job_type(resume: str) -> str:
-    """Recommend job type based on resume content"""
+DEFAULT_JOB_ROLE = "Software Developer"
+DEFAULT_RESUME_SUMMARY = "Professional with relevant technical experience."
+
+def job_role_request(resume: str) -> Dict:
     prompt = f"""
     Based on this resume, suggest the most suitable job title in 2-3 words only.
     Focus on the primary skills and experience level.
@@ -804,21 +2217,23 @@ def recommend_job_type(resume: str) -> str:
 
     Respond with just the job title, nothing else.
     """
+    return {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3, "max_tokens": 50}
+
+def parse_job_role(content: str) -> str:
+    return content.strip().split("\n")[0]
 
+def recommend_job_type(resume: str) -> str:
+    """Recommend job type based on resume content"""
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=50
-        )
-        return response.choices[0].message.content.strip().split("\n")[0]
+        response = create_chat_completion(stage="job_role", **job_role_request(resume))
+        return parse_job_role(response.choices[0].message.content)
     except Exception as e:
         logger.error(f"Error recommending job type: {e}")
-        return "Software Developer"
+        record_fallback("job_role", "gpt-3.5-turbo")
+        return DEFAULT_JOB_ROLE
 
-def generate_resume_summary(resume_text: str, job_description: str) -> str:
-    """Generate a professional summary of the resume"""
+def summary_request(resume_text: str, job_description: str) -> Dict:
     prompt = f"""
     Create a 2-3 sentence professional summary of this candidate based on their resume.
     Focus on their key skills, experience level, and relevant background for the given job.
@@ -831,18 +2246,21 @@ def generate_resume_summary(resume_text: str, job_description: str) -> str:
 
     Summary:
     """
+    return {"model": "gpt-3.5-turbo", "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.5, "max_tokens": 200}
+
+def parse_summary(content: str) -> str:
+    return content.strip()
 
+def generate_resume_summary(resume_text: str, job_description: str) -> str:
+    """Generate a professional summary of the resume"""
     try:
-        response = openai.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.5,
-            max_tokens=200
-        )
-        return response.choices[0].message.content.strip()
+        response = create_chat_completion(stage="resume_summary", **summary_request(resume_text, job_description))
+        return parse_summary(response.choices[0].message.content)
     except Exception as e:
         logger.error(f"Error generating summary: {e}")
-        return "Professional with relevant technical experience."
+        record_fallback("resume_summary", "gpt-3.5-turbo")
+        return DEFAULT_RESUME_SUMMARY
 
 
 
@@ -856,213 +2274,1752 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-resume_embeddings = []
-resume_texts = []
+CORPUS_FORMAT_VERSION = 3
+# Evaluated resumes are appended as small immutable segments next to the base artifact
+CORPUS_SEGMENTS_DIR = os.getenv("CORPUS_SEGMENTS_DIR", os.path.splitext(CORPUS_ARTIFACT_DIR)[0] + ".segments")
+CORPUS_INGEST = os.getenv("CORPUS_INGEST", "true").lower() in ("1", "true", "yes")
+CORPUS_FLUSH_SECONDS = float(os.getenv("CORPUS_FLUSH_SECONDS", "2"))
+CORPUS_REFRESH_SECONDS = float(os.getenv("CORPUS_REFRESH_SECONDS", "2"))
+# Compaction merges segments below CORPUS_SMALL_SEGMENT_ROWS once there are CORPUS_COMPACT_MIN of them
+CORPUS_SMALL_SEGMENT_ROWS = int(os.getenv("CORPUS_SMALL_SEGMENT_ROWS", "4096"))
+CORPUS_COMPACT_MIN = int(os.getenv("CORPUS_COMPACT_MIN", "8"))
+# Storage of the scanned matrix: float32, float16 or int8 (per-row scaled), optionally
+# truncated to the first CORPUS_DIMENSIONS dims (text-embedding-3 vectors are
+# Matryoshka-trained, so a renormalized prefix matches the API's `dimensions`).
+# Reduced corpora keep full float32 vectors on disk to re-rank the top
+# CORPUS_RERANK_DEPTH candidates of each segment exactly.
+CORPUS_QUANTIZATION = os.getenv("CORPUS_QUANTIZATION", "float32")
+CORPUS_DIMENSIONS = int(os.getenv("CORPUS_DIMENSIONS", "0"))
+CORPUS_RERANK_DEPTH = int(os.getenv("CORPUS_RERANK_DEPTH", "100"))
+# Restrict corpus search to the JD's N most likely categories (0 scans everything)
+CORPUS_AUTO_CATEGORIES = int(os.getenv("CORPUS_AUTO_CATEGORIES", "3"))
+CORPUS_SCAN_BLOCK_ROWS = 1024  # Small enough for the upcast block to stay in cache
+CORPUS_DIGEST_DTYPE = "S20"  # Raw SHA-1 digests of the resume texts
+
+
+class CorpusTexts:
+    """Read-only sequence of resume texts decoded on access from a memory-mapped UTF-8 blob"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+def normalize_rows(embeddings) -> np.ndarray:
+    embeddings = np.array(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    embeddings /= norms
+    return embeddings
+
+
+def encode_embeddings(embeddings: np.ndarray, quantization: str, dimensions: int = 0) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Reduce unit-normalized float32 rows for scanning; returns (matrix, per-row int8 scales or None)"""
+    if dimensions and dimensions < embeddings.shape[1]:
+        embeddings = normalize_rows(embeddings[:, :dimensions])
+    if quantization == "float32":
+        return embeddings, None
+    if quantization == "float16":
+        return embeddings.astype(np.float16), None
+    if quantization == "int8":
+        scales = np.abs(embeddings).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        quantized = np.rint(embeddings / scales[:, None]).astype(np.int8)
+        return quantized, scales.astype(np.float32)
+    raise ValueError(f"Unknown corpus quantization: {quantization}")
+
+
+def write_corpus_files(directory: str, embeddings: np.ndarray, texts: List[str], meta: Dict,
+                       quantization: str = CORPUS_QUANTIZATION, dimensions: int = CORPUS_DIMENSIONS,
+                       categories: Optional[List[str]] = None) -> str:
+    """Write a corpus directory that can be memory-mapped.
+
+    Layout: embeddings.npy (the scanned matrix, see encode_embeddings) with
+    scales.npy for int8, embeddings_full.npy (float32, L2-normalized rows) when
+    the scanned matrix is reduced, texts.bin (UTF-8) with text_offsets.npy
+    (int64, n + 1), hashes.npy (the rows' SHA-1 digests, sorted) with
+    hash_rows.npy (the row of each digest) and meta.json. With per-row `categories`, rows are grouped
+    by category so each one is a contiguous `partitions` range in meta.json,
+    and centroids.npy holds the normalized mean vector of each category. The
+    files are written to a staging directory and renamed into place, so
+    readers never see a partial corpus. An existing corpus is renamed aside
+    before the swap and deleted after it (ensure_corpus_artifact holds its
+    lock throughout, so other workers wait instead of finding no corpus).
+    """
+    partitions = {}
+    centroids = None
+    if categories is not None:
+        order = np.argsort(np.array(categories, dtype=object), kind="stable")
+        embeddings = embeddings[order]
+        texts = [texts[i] for i in order]
+        ordered = [categories[i] for i in order]
+        start = 0
+        for end in range(1, len(ordered) + 1):
+            if end == len(ordered) or ordered[end] != ordered[start]:
+                partitions[ordered[start]] = [start, end]
+                start = end
+        centroids = normalize_rows(np.stack([embeddings[s:e].mean(axis=0) for s, e in partitions.values()]))
+
+    scan, scales = encode_embeddings(embeddings, quantization, dimensions)
+    encoded = [text.encode("utf-8") for text in texts]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(text) for text in encoded])
+    # Sorted so a corpus id is found with a binary search over the mapped file
+    digests = np.array([hashlib.sha1(text).digest() for text in encoded], dtype=CORPUS_DIGEST_DTYPE)
+    hash_rows = np.argsort(digests, kind="stable").astype(np.int64)
+
+    staging = f"{directory}.tmp-{os.getpid()}"
+    os.makedirs(staging, exist_ok=True)
+    np.save(os.path.join(staging, "embeddings.npy"), scan)
+    if scales is not None:
+        np.save(os.path.join(staging, "scales.npy"), scales)
+    if scan is not embeddings:
+        np.save(os.path.join(staging, "embeddings_full.npy"), embeddings)
+    if centroids is not None:
+        np.save(os.path.join(staging, "centroids.npy"), centroids)
+    np.save(os.path.join(staging, "text_offsets.npy"), offsets)
+    np.save(os.path.join(staging, "hashes.npy"), digests[hash_rows])
+    np.save(os.path.join(staging, "hash_rows.npy"), hash_rows)
+    with open(os.path.join(staging, "texts.bin"), "wb") as f:
+        for text in encoded:
+            f.write(text)
+    with open(os.path.join(staging, "meta.json"), "w") as f:
+        json.dump({
+            "format_version": CORPUS_FORMAT_VERSION,
+            "count": int(embeddings.shape[0]),
+            "dim": int(scan.shape[1]),
+            "full_dim": int(embeddings.shape[1]),
+            "quantization": quantization,
+            "partitions": partitions,
+            **meta,
+        }, f)
+
+    if not os.path.isdir(directory):
+        os.replace(staging, directory)
+        return directory
+    # Processes that already mapped the old files keep their mappings until they reload
+    retired = f"{directory}.old-{os.getpid()}-{time.time_ns()}"
+    os.replace(directory, retired)
+    os.replace(staging, directory)
+    shutil.rmtree(retired, ignore_errors=True)
+    return directory
+
+
+def build_corpus_artifact(pickle_path: str, artifact_dir: str) -> str:
+    """Convert the embeddings pickle into the memory-mapped base corpus"""
+    with open(pickle_path, "rb") as f:
+        data = pickle.load(f)
+
+    embeddings = np.asarray(data["embeddings"], dtype=np.float32)
+    if embeddings.ndim != 2:
+        embeddings = embeddings.reshape(len(data["metadata"]), -1)
+    texts = [str(item.get("clean_resume", "")) for item in data["metadata"]]
+    categories = [str(item.get("Category") or "UNKNOWN") for item in data["metadata"]]
+    stat = os.stat(pickle_path)
+    write_corpus_files(artifact_dir, normalize_rows(embeddings), texts, {
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+    }, categories=categories)
+    logger.info(f"Built corpus artifact {artifact_dir} with {len(texts)} resumes")
+    return artifact_dir
+
+
+def corpus_artifact_is_current(pickle_path: str, artifact_dir: str) -> bool:
+    try:
+        with open(os.path.join(artifact_dir, "meta.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta.get("format_version") != CORPUS_FORMAT_VERSION:
+        return False
+    # Rebuild when the storage settings change
+    if meta.get("quantization", "float32") != CORPUS_QUANTIZATION:
+        return False
+    if meta.get("dim") != min(CORPUS_DIMENSIONS or meta.get("full_dim", 0), meta.get("full_dim", 0)):
+        return False
+    if not os.path.exists(pickle_path):
+        # The artifact can be deployed without the pickle it was built from
+        return True
+    stat = os.stat(pickle_path)
+    return meta.get("source_size") == stat.st_size and meta.get("source_mtime") == stat.st_mtime
 
-@app.on_event("startup")
-async def load_embeddings():
-    global resume_embeddings, resume_texts
+
+def ensure_corpus_artifact(pickle_path: str, artifact_dir: str) -> str:
+    """Build the artifact if it is missing or stale; one process builds while the others wait"""
+    if corpus_artifact_is_current(pickle_path, artifact_dir):
+        return artifact_dir
+
+    import fcntl
+
+    with open(f"{artifact_dir}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            if not corpus_artifact_is_current(pickle_path, artifact_dir):
+                build_corpus_artifact(pickle_path, artifact_dir)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+    return artifact_dir
+
+
+def open_corpus_artifact(artifact_dir: str) -> Tuple[np.ndarray, CorpusTexts]:
+    """Attach to a corpus artifact read-only; every process mapping it shares the same pages"""
+    embeddings = np.load(os.path.join(artifact_dir, "embeddings.npy"), mmap_mode="r")
+    offsets = np.load(os.path.join(artifact_dir, "text_offsets.npy"), mmap_mode="r")
+    if offsets[-1] > 0:
+        blob = np.memmap(os.path.join(artifact_dir, "texts.bin"), dtype=np.uint8, mode="r")
+    else:
+        blob = np.zeros(0, dtype=np.uint8)
+    return embeddings, CorpusTexts(blob, offsets)
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def corpus_digest(corpus_id: str) -> Optional[np.ndarray]:
+    """A text_hash as the fixed-width digest stored in hashes.npy, or None if it isn't one"""
+    try:
+        digest = bytes.fromhex(corpus_id)
+    except ValueError:
+        return None
+    return np.array(digest, dtype=CORPUS_DIGEST_DTYPE) if len(digest) == 20 else None
+
+
+class CorpusSegment:
+    """One memory-mapped corpus directory: the base artifact or an appended segment"""
+
+    def __init__(self, name: str, directory: str, meta: Optional[Dict] = None):
+        self.name = name
+        self.directory = directory
+        if meta is None:
+            with open(os.path.join(directory, "meta.json")) as f:
+                meta = json.load(f)
+        self.meta = meta
+        self.embeddings, self.texts = open_corpus_artifact(directory)
+        # category -> (start, end) row range; empty for corpora written without categories
+        self.partitions: Dict[str, Tuple[int, int]] = {c: tuple(r) for c, r in meta.get("partitions", {}).items()}
+        centroids_path = os.path.join(directory, "centroids.npy")
+        self.centroids = np.load(centroids_path) if os.path.exists(centroids_path) else None
+        hashes_path = os.path.join(directory, "hashes.npy")
+        if os.path.exists(hashes_path):
+            self.hashes = np.load(hashes_path, mmap_mode="r")
+            self.hash_rows = np.load(os.path.join(directory, "hash_rows.npy"), mmap_mode="r")
+        else:
+            # Segments written before the digests were stored; these are small
+            digests = np.array([bytes.fromhex(h) for h in meta.get("hashes") or map(text_hash, self.texts)],
+                               dtype=CORPUS_DIGEST_DTYPE)
+            self.hash_rows = np.argsort(digests, kind="stable").astype(np.int64)
+            self.hashes = digests[self.hash_rows]
+        scales_path = os.path.join(directory, "scales.npy")
+        full_path = os.path.join(directory, "embeddings_full.npy")
+        self.scales = np.load(scales_path, mmap_mode="r") if os.path.exists(scales_path) else None
+        # Only read for re-ranking and compaction, so it stays on disk rather than in memory
+        self.full = np.load(full_path, mmap_mode="r") if os.path.exists(full_path) else self.embeddings
+        self.exact = self.full is self.embeddings
+        self.dim = self.embeddings.shape[1] if self.embeddings.ndim == 2 else 0
+        self.full_dim = self.full.shape[1] if self.full.ndim == 2 else 0
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @staticmethod
+    def _prefix(query: np.ndarray, dim: int) -> np.ndarray:
+        query = query[:dim]
+        length = norm(query)
+        return query / length if length else query
+
+    def category_of(self, row: int) -> Optional[str]:
+        for category, (start, end) in self.partitions.items():
+            if start <= row < end:
+                return category
+        return None
+
+    def row_for_digest(self, digest: np.ndarray) -> Optional[int]:
+        index = int(np.searchsorted(self.hashes, digest))
+        if index < len(self.hashes) and self.hashes[index] == digest:
+            return int(self.hash_rows[index])
+        return None
+
+    def row_for_id(self, corpus_id: str) -> Optional[int]:
+        """Row of the resume whose text_hash is `corpus_id`"""
+        digest = corpus_digest(corpus_id)
+        return None if digest is None else self.row_for_digest(digest)
+
+    def row_categories(self) -> Optional[List[str]]:
+        if not self.partitions:
+            return None
+        categories = [None] * len(self)
+        for category, (start, end) in self.partitions.items():
+            categories[start:end] = [category] * (end - start)
+        return categories
+
+    def row_ranges(self, categories: Optional[List[str]] = None) -> List[Tuple[int, int]]:
+        """Row ranges to scan; segments without partitions are always scanned whole"""
+        if not categories or not self.partitions:
+            return [(0, len(self))]
+        return [self.partitions[c] for c in categories if c in self.partitions]
+
+    def approximate_scores(self, query: np.ndarray, start: int = 0, end: Optional[int] = None) -> np.ndarray:
+        """Cosine scores of rows [start, end) against the scanned (possibly reduced) matrix"""
+        query = self._prefix(query, self.dim)
+        matrix = self.embeddings[start:end]
+        if matrix.dtype == np.float32:
+            scores = matrix @ query
+        else:
+            # Upcast a block at a time so BLAS does the work without a full float32 copy
+            scores = np.empty(len(matrix), dtype=np.float32)
+            for offset in range(0, len(matrix), CORPUS_SCAN_BLOCK_ROWS):
+                block = matrix[offset:offset + CORPUS_SCAN_BLOCK_ROWS]
+                scores[offset:offset + len(block)] = block.astype(np.float32) @ query
+        if self.scales is not None:
+            scores *= self.scales[start:end]
+        return scores
+
+    def exact_scores(self, query: np.ndarray, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self.full[rows], dtype=np.float32) @ self._prefix(query, self.full_dim)
+
+
+CORPUS_SNIPPET_CHARS = 240
+
+
+def corpus_hit(score: float, segment: CorpusSegment, row: int) -> Dict:
+    text = segment.texts[row]
+    snippet = " ".join(text[:CORPUS_SNIPPET_CHARS * 2].split())[:CORPUS_SNIPPET_CHARS]
+    # Ids are content hashes, so they survive segment compaction
+    return {"id": text_hash(text), "score": round(score, 4), "category": segment.category_of(row), "snippet": snippet}
+
+
+class SegmentedCorpus:
+    """Similarity corpus made of the base artifact plus immutable appended segments.
+
+    Segments live in their own directories under `segments_dir`, so any worker
+    can append one and the others pick it up on their next refresh. Compaction
+    writes a merged segment whose meta lists the segments it `replaces`; those
+    are hidden from then on and deleted. Readers work on an immutable tuple of
+    segments that is swapped on refresh, so searches never take a lock.
+    """
+
+    def __init__(self, segments_dir: str = CORPUS_SEGMENTS_DIR, refresh_seconds: float = CORPUS_REFRESH_SECONDS,
+                 rerank_depth: int = CORPUS_RERANK_DEPTH):
+        self.segments_dir = segments_dir
+        self.refresh_seconds = refresh_seconds
+        self.rerank_depth = rerank_depth
+        self.base: Optional[CorpusSegment] = None
+        self.segments: Tuple[CorpusSegment, ...] = ()
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+
+    def __len__(self) -> int:
+        return (len(self.base) if self.base else 0) + sum(len(s) for s in self.segments)
+
+    def set_base(self, directory: Optional[str]):
+        self.base = CorpusSegment("base", directory) if directory else None
+
+    def _segment_names(self) -> List[str]:
+        try:
+            names = os.listdir(self.segments_dir)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if n.startswith("seg-") and ".tmp-" not in n and ".old-" not in n)
+
+    def refresh(self):
+        """Attach segments written by any process since the last refresh and drop compacted ones"""
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            current = {s.name: s for s in self.segments}
+            metas = {name: s.meta for name, s in current.items()}
+            for name in self._segment_names():
+                if name not in metas:
+                    try:
+                        with open(os.path.join(self.segments_dir, name, "meta.json")) as f:
+                            metas[name] = json.load(f)
+                    except (OSError, ValueError):
+                        continue  # Removed by a compaction while we were listing
+            replaced = {old for meta in metas.values() for old in meta.get("replaces", [])}
+            live = []
+            for name in sorted(metas):
+                if name in replaced:
+                    continue
+                segment = current.get(name)
+                if segment is None:
+                    try:
+                        segment = CorpusSegment(name, os.path.join(self.segments_dir, name), metas[name])
+                    except OSError:
+                        continue
+                live.append(segment)
+            self.segments = tuple(live)
+
+    def maybe_refresh(self):
+        if time.monotonic() - self._last_refresh >= self.refresh_seconds:
+            self.refresh()
+
+    def categories(self) -> List[str]:
+        return sorted({c for segment in self._all_segments() for c in segment.partitions})
+
+    def predict_categories(self, query: np.ndarray, n: int) -> List[str]:
+        """The n categories whose base centroids are closest to the query"""
+        base = self.base
+        if base is None or base.centroids is None or n <= 0 or base.full_dim > len(query):
+            return []
+        scores = base.centroids @ base._prefix(np.asarray(query, dtype=np.float32), base.full_dim)
+        names = list(base.partitions)
+        return [names[i] for i in np.argsort(-scores)[:n]]
+
+    def append(self, texts: List[str], embeddings, replaces: Optional[List[str]] = None,
+               categories: Optional[List[str]] = None) -> str:
+        """Write a new immutable segment and make it searchable in this process"""
+        os.makedirs(self.segments_dir, exist_ok=True)
+        name = f"seg-{time.time_ns():020d}-{os.getpid()}"
+        embeddings = normalize_rows(embeddings)
+        if categories is not None:
+            # Rows are reordered by category; keep the hashes aligned with them
+            order = sorted(range(len(texts)), key=lambda i: categories[i])
+            texts = [texts[i] for i in order]
+            categories = [categories[i] for i in order]
+            embeddings = embeddings[order]
+        write_corpus_files(os.path.join(self.segments_dir, name), embeddings, texts, {
+            "replaces": replaces or [],
+        }, categories=categories)
+        self.refresh()
+        return name
+
+    def compact(self, min_segments: int = CORPUS_COMPACT_MIN, small_rows: int = CORPUS_SMALL_SEGMENT_ROWS) -> Optional[str]:
+        """Merge small segments into one; returns the new segment name, or None if nothing to do"""
+        import fcntl
+
+        os.makedirs(self.segments_dir, exist_ok=True)
+        with open(os.path.join(self.segments_dir, ".compact.lock"), "w") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None  # Another worker is compacting
+            try:
+                self.refresh()
+                small = [s for s in self.segments if len(s) < small_rows]
+                if len(small) < min_segments:
+                    return None
+                # Carry over older replacements so a crash before deletion can't resurrect them
+                replaces = sorted({s.name for s in small} | {old for s in small for old in s.meta.get("replaces", [])})
+                # Rows of segments written without categories stay unpartitioned
+                categories = None
+                if all(s.partitions for s in small):
+                    categories = [c for s in small for c in s.row_categories()]
+                with track_stage("corpus_compaction"):
+                    name = self.append(
+                        [text for s in small for text in s.texts],
+                        np.concatenate([np.asarray(s.full, dtype=np.float32) for s in small]),
+                        replaces=replaces,
+                        categories=categories,
+                    )
+                for old in replaces:
+                    shutil.rmtree(os.path.join(self.segments_dir, old), ignore_errors=True)
+                logger.info(f"Compacted {len(small)} corpus segments into {name}")
+                return name
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _all_segments(self) -> Tuple[CorpusSegment, ...]:
+        return ((self.base,) if self.base else ()) + self.segments
+
+    def top_rows(self, query: np.ndarray, top_k: int, rerank_depth: Optional[int] = None,
+                 categories: Optional[List[str]] = None,
+                 partitioned_only: bool = False) -> List[Tuple[float, CorpusSegment, int]]:
+        """(score, segment, row) of the top_k rows by cosine similarity across all segments.
+
+        With `categories`, only those partitions of each segment are scanned
+        (unpartitioned segments are scanned whole unless `partitioned_only`). Reduced segments are
+        scanned approximately and their best `rerank_depth` rows re-scored
+        with the full float32 vectors; rerank_depth=0 returns the approximate
+        ranking.
+        """
+        rerank_depth = self.rerank_depth if rerank_depth is None else rerank_depth
+        query = np.asarray(query, dtype=np.float32)
+        candidates = []
+        for segment in self._all_segments():
+            # A corpus embedded with fewer `dimensions` is searched with the query's prefix
+            if len(segment) == 0 or segment.full_dim > len(query) or (partitioned_only and not segment.partitions):
+                continue
+            for start, end in segment.row_ranges(categories):
+                if end <= start:
+                    continue
+                scores = segment.approximate_scores(query, start, end)
+                rerank = not segment.exact and rerank_depth > 0
+                k = min(max(top_k, rerank_depth) if rerank else top_k, len(scores))
+                rows = np.argpartition(-scores, k - 1)[:k]
+                if rerank:
+                    rows = np.sort(rows)
+                    row_scores = segment.exact_scores(query, rows + start)
+                else:
+                    row_scores = scores[rows]
+                candidates.extend((float(score), segment, int(row) + start) for score, row in zip(row_scores, rows))
+        candidates.sort(key=lambda c: -c[0])
+        return candidates[:top_k]
+
+    def search(self, query: np.ndarray, top_k: int, categories: Optional[List[str]] = None) -> List[str]:
+        """Texts of the top_k most similar resumes"""
+        return [segment.texts[row] for _, segment, row in self.top_rows(query, top_k, categories=categories)]
+
+    def hits(self, query: np.ndarray, top_k: int, categories: Optional[List[str]] = None) -> List[Dict]:
+        """Compact matches: corpus id, score, category and a snippet; full text via lookup()"""
+        return [
+            corpus_hit(score, segment, row) for score, segment, row in self.top_rows(query, top_k, categories=categories)
+        ]
+
+    def contains(self, corpus_id: str) -> bool:
+        """Whether a resume with this text_hash is in the base corpus or any segment"""
+        digest = corpus_digest(corpus_id)
+        return digest is not None and any(s.row_for_digest(digest) is not None for s in self._all_segments())
+
+    def lookup(self, corpus_id: str) -> Optional[Tuple[CorpusSegment, int]]:
+        for segment in self._all_segments():
+            row = segment.row_for_id(corpus_id)
+            if row is not None:
+                return segment, row
+        return None
+
+    def search_by_category(self, query: np.ndarray, top_k: int,
+                           categories: Optional[List[str]] = None) -> Dict[str, List[Dict]]:
+        """Top_k matches within each category (all categories when none are given)"""
+        results = {}
+        for category in categories or self.categories():
+            results[category] = [
+                {"id": text_hash(segment.texts[row]), "category": category, "score": round(score, 4),
+                 "text": segment.texts[row]}
+                for score, segment, row in self.top_rows(query, top_k, categories=[category], partitioned_only=True)
+            ]
+        return results
+
+
+class CorpusIngestor:
+    """Buffer evaluated resumes and flush them into corpus segments every few seconds"""
+
+    def __init__(self, corpus: SegmentedCorpus, flush_seconds: float = CORPUS_FLUSH_SECONDS):
+        self.corpus = corpus
+        self.flush_seconds = flush_seconds
+        self._pending: List[Tuple[str, np.ndarray]] = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = None
+
+    def add(self, resume_text: str, embedding: np.ndarray):
+        if not resume_text or len(embedding) == 0:
+            return
+        with self._lock:
+            self._pending.append((resume_text, np.asarray(embedding, dtype=np.float32)))
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stopping,),
+                                                name="corpus-ingest", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Exit after the current flush; resumes still buffered are left for a final flush()"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping.set()
+        thread.join(timeout)
+
+    def flush(self) -> Optional[str]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return None
+        self.corpus.maybe_refresh()
+        seen = set()
+        texts, embeddings, categories = [], [], []
+        for resume_text, embedding in pending:
+            digest = text_hash(resume_text)
+            if digest in seen or self.corpus.contains(digest):
+                continue
+            if not embeddings or len(embedding) == len(embeddings[0]):
+                seen.add(digest)
+                texts.append(resume_text)
+                embeddings.append(embedding)
+                # New resumes join the partition of their closest base category
+                predicted = self.corpus.predict_categories(embedding, 1)
+                categories.append(predicted[0] if predicted else None)
+        if not texts:
+            return None
+        with track_stage("corpus_ingest"):
+            return self.corpus.append(texts, np.vstack(embeddings),
+                                      categories=categories if None not in categories else None)
+
+    def _run(self, stopping: threading.Event):
+        while not stopping.wait(self.flush_seconds):
+            try:
+                self.flush()
+                self.corpus.compact()
+            except Exception as e:
+                logger.error(f"Error ingesting corpus segment: {e}")
+
+
+corpus = SegmentedCorpus()
+corpus_ingestor = CorpusIngestor(corpus)
+corpus_status = {"status": "not_loaded", "error": None}
+
+# Stored-candidate index: float16 halves memory but scans ~4x slower; ids this far below
+# the newest indexed one are re-read on refresh, in case their transactions committed late
+CANDIDATE_INDEX_DTYPE = os.getenv("CANDIDATE_INDEX_DTYPE", "float32")
+CANDIDATE_INDEX_LOOKBACK = int(os.getenv("CANDIDATE_INDEX_LOOKBACK", "1000"))
+CANDIDATE_INDEX_LOAD_ROWS = 5000
+
+
+def embedding_to_bytes(embedding) -> Optional[bytes]:
+    """Serialize an embedding for ResumeReport.resume_embedding (None if there is none)"""
+    if embedding is None or len(embedding) == 0:
+        return None
+    return normalize_rows(np.asarray(embedding, dtype=np.float32)[None, :])[0].tobytes()
+
+
+class CandidateIndex:
+    """In-process vector index over the embeddings stored with ResumeReport rows.
+
+    refresh() only reads reports newer than the ones already indexed, so the
+    first call loads the pool and later ones cost an indexed range query.
+    Vectors live in one preallocated matrix that grows by doubling.
+    """
+
+    def __init__(self, dtype: str = CANDIDATE_INDEX_DTYPE, lookback: int = CANDIDATE_INDEX_LOOKBACK):
+        self.dtype = np.dtype(dtype)
+        self.lookback = lookback
+        self.ids = np.empty(0, dtype=np.int64)
+        self.matrix: Optional[np.ndarray] = None
+        self.count = 0
+        self.last_id = 0
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _append(self, ids: List[int], vectors: List[np.ndarray]):
+        if self.matrix is None:
+            self.matrix = np.empty((max(len(vectors), 1024), len(vectors[0])), dtype=self.dtype)
+            self.ids = np.empty(len(self.matrix), dtype=np.int64)
+        needed = self.count + len(vectors)
+        if needed > len(self.matrix):
+            capacity = max(needed, 2 * len(self.matrix))
+            matrix = np.empty((capacity, self.matrix.shape[1]), dtype=self.dtype)
+            matrix[:self.count] = self.matrix[:self.count]
+            report_ids = np.empty(capacity, dtype=np.int64)
+            report_ids[:self.count] = self.ids[:self.count]
+            self.matrix, self.ids = matrix, report_ids
+        self.matrix[self.count:needed] = np.stack(vectors)
+        self.ids[self.count:needed] = ids
+        self.count = needed
+
+    def refresh(self, session) -> int:
+        """Index reports stored since the last refresh; returns the number added"""
+        with self._lock:
+            indexed = self.ids[:self.count]
+            known = set(indexed[indexed > self.last_id - self.lookback].tolist())
+            query = session.query(ResumeReport.id, ResumeReport.resume_embedding).filter(
+                ResumeReport.id > self.last_id - self.lookback,
+                ResumeReport.resume_embedding.isnot(None),
+            ).order_by(ResumeReport.id).yield_per(CANDIDATE_INDEX_LOAD_ROWS)
+            added = 0
+            ids, vectors = [], []
+            for report_id, blob in query:
+                if report_id in known:
+                    continue
+                vector = np.frombuffer(blob, dtype=np.float32)
+                dim = self.matrix.shape[1] if self.matrix is not None else len(vectors[0]) if vectors else len(vector)
+                if len(vector) != dim:
+                    continue  # Embedded with another model
+                ids.append(report_id)
+                vectors.append(vector)
+                if len(vectors) >= CANDIDATE_INDEX_LOAD_ROWS:
+                    self._append(ids, vectors)
+                    added += len(ids)
+                    ids, vectors = [], []
+            if vectors:
+                self._append(ids, vectors)
+                added += len(ids)
+            if self.count:
+                self.last_id = max(self.last_id, int(self.ids[self.count - 1]))
+            return added
+
+    def maybe_refresh(self, interval: float) -> bool:
+        """refresh() in its own session unless the index was refreshed within `interval` seconds"""
+        if time.monotonic() - self._refreshed_at < interval:
+            return False
+        self._refreshed_at = time.monotonic()
+        session = get_session()
+        try:
+            self.refresh(session)
+        finally:
+            session.close()
+        return True
+
+    def rank(self, query: np.ndarray, offset: int, limit: int) -> List[Tuple[int, float]]:
+        """(report id, cosine similarity) for ranks offset .. offset + limit"""
+        with self._lock:
+            matrix, report_ids, count = self.matrix, self.ids, self.count
+        if not count or len(query) != matrix.shape[1] or offset >= count:
+            return []
+        query = normalize_rows(np.asarray(query, dtype=np.float32)[None, :])[0]
+        if matrix.dtype == np.float32:
+            scores = matrix[:count] @ query
+        else:
+            scores = np.empty(count, dtype=np.float32)
+            for start in range(0, count, CORPUS_SCAN_BLOCK_ROWS):
+                block = matrix[start:min(start + CORPUS_SCAN_BLOCK_ROWS, count)]
+                scores[start:start + len(block)] = block.astype(np.float32) @ query
+        k = min(offset + limit, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")][offset:]
+        return [(int(report_ids[i]), float(scores[i])) for i in top]
+
+
+candidate_index = CandidateIndex()
+# JD embeddings by text, so paging through a ranking embeds the JD once
+jd_embedding_cache = TTLCache(256, 600)
+
+# Resubmitted resumes (a new phone number, an extra bullet) reuse the stored
+# name, skills, summary and job role of a recent report when both the resume
+# embeddings and the word-shingle MinHash sketches are close enough. Skill
+# match, experience and relevance are always recomputed for the current JD.
+NEAR_DUPLICATE_REUSE = os.getenv("NEAR_DUPLICATE_REUSE", "true").lower() in ("1", "true", "yes")
+NEAR_DUPLICATE_SIMILARITY = float(os.getenv("NEAR_DUPLICATE_SIMILARITY", "0.97"))
+NEAR_DUPLICATE_JACCARD = float(os.getenv("NEAR_DUPLICATE_JACCARD", "0.8"))
+NEAR_DUPLICATE_DAYS = float(os.getenv("NEAR_DUPLICATE_DAYS", "30"))
+NEAR_DUPLICATE_REFRESH_SECONDS = float(os.getenv("NEAR_DUPLICATE_REFRESH_SECONDS", "5"))
+NEAR_DUPLICATE_CANDIDATES = 5
+SKETCH_SHINGLE_WORDS = 5
+SKETCH_PERMUTATIONS = 64
+# Universal hashes ((a * h + b) mod p) standing in for random permutations; the
+# seed is fixed because sketches are compared across processes and restarts.
+_SKETCH_PRIME = 4294967291  # Largest prime below 2**32
+_sketch_rng = np.random.default_rng(0x5EE7C4)
+_SKETCH_A = _sketch_rng.integers(1, _SKETCH_PRIME, SKETCH_PERMUTATIONS, dtype=np.uint64)
+_SKETCH_B = _sketch_rng.integers(0, _SKETCH_PRIME, SKETCH_PERMUTATIONS, dtype=np.uint64)
+
+
+def resume_sketch(text: str) -> np.ndarray:
+    """MinHash signature of the lowercased word shingles; equal slots estimate the Jaccard similarity"""
+    words = re.findall(r"\w+", text.lower())
+    shingles = {" ".join(words[i:i + SKETCH_SHINGLE_WORDS])
+                for i in range(max(len(words) - SKETCH_SHINGLE_WORDS + 1, 1))}
+    hashes = np.fromiter((zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    return ((hashes[:, None] * _SKETCH_A + _SKETCH_B) % _SKETCH_PRIME).min(axis=0).astype(np.uint32)
+
+
+def sketch_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    return float(np.mean(a == b)) if len(a) == len(b) else 0.0
+
+
+def find_near_duplicate(resume_embedding: np.ndarray, sketch: np.ndarray) -> Optional[ResumeReport]:
+    """The most similar recent report of (nearly) the same resume text, if any"""
+    if len(resume_embedding) == 0:
+        return None
+    with track_stage("near_duplicate_lookup"):
+        candidate_index.maybe_refresh(NEAR_DUPLICATE_REFRESH_SECONDS)
+        similar = {
+            report_id: similarity
+            for report_id, similarity in candidate_index.rank(resume_embedding, 0, NEAR_DUPLICATE_CANDIDATES)
+            if similarity >= NEAR_DUPLICATE_SIMILARITY
+        }
+        if not similar:
+            return None
+        session = get_session()
+        try:
+            reports = session.query(ResumeReport).filter(
+                ResumeReport.id.in_(similar),
+                ResumeReport.resume_sketch.isnot(None),
+                ResumeReport.created_at >= datetime.utcnow() - timedelta(days=NEAR_DUPLICATE_DAYS),
+            ).all()
+            session.expunge_all()
+        finally:
+            session.close()
+        matches = [
+            report for report in reports
+            if sketch_similarity(np.frombuffer(report.resume_sketch, dtype=np.uint32), sketch) >= NEAR_DUPLICATE_JACCARD
+        ]
+        return max(matches, key=lambda report: (similar[report.id], report.id), default=None)
+
+
+def load_embeddings():
+    corpus_status.update(status="loading", error=None)
     try:
         url = "https://drive.google.com/uc?id=1oM5yvJy3ugBHZ_RZOhZxlV3cESZwRZKP"
-        output = "resume_embeddings.pkl"
+        output = RESUME_EMBEDDINGS_PATH
+
+        if not os.path.exists(output) and not corpus_artifact_is_current(output, CORPUS_ARTIFACT_DIR):
+            import gdown
 
-        if not os.path.exists(output):
             logger.info("Downloading resume embeddings...")
             gdown.download(url, output, quiet=False)
 
-        with open(output, "rb") as f:
-            data = pickle.load(f)
-            resume_embeddings = data["embeddings"]
-            resume_texts = [item["clean_resume"] for item in data["metadata"]]
+        ensure_corpus_artifact(output, CORPUS_ARTIFACT_DIR)
+        corpus.set_base(CORPUS_ARTIFACT_DIR)
+        corpus.refresh()
 
-        logger.info(f"Loaded {len(resume_embeddings)} resume embeddings")
+        corpus_status["status"] = "loaded"
+        logger.info(f"Mapped {len(corpus)} resume embeddings from {CORPUS_ARTIFACT_DIR} "
+                    f"and {len(corpus.segments)} segments")
     except Exception as e:
         logger.error(f"Error loading embeddings: {e}")
-        resume_embeddings = []
-        resume_texts = []
+        corpus_status.update(status="error", error=str(e))
+        corpus.set_base(None)
 
-@app.post("/evaluate-resumes/")
-async def evaluate_resumes(
-    job_description: str = Form(...), 
-    resume_pdfs: List[UploadFile] = File(...)
-):
-    """Evaluate resumes against job description with comprehensive scoring and interview integration"""
-    session = SessionLocal()
-    reports = []
-    interview_invitations_sent = 0
+@app.on_event("startup")
+async def start_corpus_load():
+    """Load the similarity corpus in the background so the worker starts serving immediately"""
+    threading.Thread(target=load_embeddings, name="corpus-loader", daemon=True).start()
+    if CORPUS_INGEST:
+        corpus_ingestor.start()
+
+def warm_candidate_index():
+    session = get_session()
+    try:
+        added = candidate_index.refresh(session)
+        logger.info(f"Indexed {added} stored candidate embeddings")
+    except Exception as e:
+        logger.error(f"Error indexing stored candidates: {e}")
+    finally:
+        session.close()
+
+@app.on_event("startup")
+async def start_candidate_index_load():
+    """Load the stored-candidate index in the background; ranking refreshes it incrementally"""
+    threading.Thread(target=warm_candidate_index, name="candidate-index-loader", daemon=True).start()
 
+@app.on_event("startup")
+async def start_invitation_dispatcher():
+    """Resume draining invitations left in the outbox by a previous process"""
+    if EMAIL_ADDRESS and EMAIL_PASSWORD:
+        invitation_dispatcher.start()
+
+@app.on_event("startup")
+async def start_batch_evaluation_poller():
+    """Keep polling batch evaluations submitted before a restart"""
+    if DATABASE_URL:
+        batch_evaluation_poller.start()
+
+@app.on_event("shutdown")
+def flush_corpus_ingestor():
+    """Write out the evaluated resumes still buffered for the corpus"""
+    corpus_ingestor.stop()
     try:
-        jd_skills = extract_skills_with_gpt(job_description, "job description")
-        logger.info(f"Extracted {len(jd_skills)} skills from job description: {jd_skills}")
+        corpus_ingestor.flush()
+    except Exception as e:
+        logger.error(f"Error ingesting corpus segment: {e}")
 
-        job_embedding = get_embedding(job_description)
+@app.on_event("shutdown")
+def stop_invitation_dispatcher():
+    invitation_dispatcher.stop()
 
-        for resume_pdf in resume_pdfs:
-            try:
-                logger.info(f"Processing resume: {resume_pdf.filename}")
+@app.on_event("shutdown")
+def stop_batch_evaluation_poller():
+    batch_evaluation_poller.stop()
 
-                pdf_bytes = await resume_pdf.read()
-                resume_text = extract_text_from_pdf(pdf_bytes)
+@app.on_event("shutdown")
+def close_smtp_pool():
+    smtp_pool.close()
 
-                if not resume_text.strip():
-                    reports.append({
-                        "filename": resume_pdf.filename,
-                        "error": "Could not extract text from PDF"
-                    })
-                    continue
+# (minimum score, status), best first; anything below the last band is a "Poor Match"
+STATUS_BANDS = [(75, "Excellent Match"), (60, "Good Match"), (40, "Needs Improvement")]
 
-                # Extract candidate information
-                candidate_email = extract_email_from_resume(resume_text)
-                candidate_name = extract_name_from_resume(resume_text)
 
-                resume_skills = extract_skills_with_gpt(resume_text, "resume")
-                logger.info(f"Extracted {len(resume_skills)} skills from resume: {resume_skills}")
+def score_status(final_score: float) -> str:
+    for minimum, status in STATUS_BANDS:
+        if final_score >= minimum:
+            return status
+    return "Poor Match"
 
-                normalized_resume_skills = [normalize_skill(skill) for skill in resume_skills]
-                normalized_jd_skills = [normalize_skill(skill) for skill in jd_skills]
 
-                skill_score, matching_skills, missing_skills = calculate_skill_match_score(
-                    normalized_resume_skills, normalized_jd_skills
-                )
+def score_statuses(final_scores: np.ndarray) -> np.ndarray:
+    """score_status over an array of scores"""
+    return np.select([final_scores >= minimum for minimum, _ in STATUS_BANDS],
+                     [status for _, status in STATUS_BANDS], default="Poor Match")
 
-                experience_score, exp_details = calculate_experience_score(
-                    resume_text, job_description, normalized_jd_skills
-                )
 
-                final_score = calculate_final_score(
-                    skill_score, experience_score, resume_text, job_description
+RESCORE_BATCH_ROWS = int(os.getenv("RESCORE_BATCH_ROWS", "20000"))
+
+
+def rescore_reports(batch_size: int = RESCORE_BATCH_ROWS) -> Dict[str, int]:
+    """Recompute stored reports' final scores and statuses from their persisted signals.
+
+    Reads the signal columns in id-ordered batches, scores each batch with
+    combine_scores and bulk-updates only the rows that changed. No API calls;
+    reports stored before the signals were persisted are skipped.
+    """
+    from sqlalchemy import func
+    from types import SimpleNamespace
+
+    session = get_session()
+    counts = {"rescored": 0, "updated": 0, "skipped": 0}
+    last_id = 0
+    try:
+        counts["skipped"] = session.query(func.count(ResumeReport.id)).filter(
+            ResumeReport.relevance_score.is_(None)
+        ).scalar()
+        while True:
+            rows = session.query(
+                ResumeReport.id, ResumeReport.skill_match_score, ResumeReport.experience_score,
+                ResumeReport.relevance_score, ResumeReport.resume_markers,
+                ResumeReport.score_out_of_100, ResumeReport.status, ResumeReport.created_at,
+            ).filter(
+                ResumeReport.id > last_id, ResumeReport.relevance_score.isnot(None)
+            ).order_by(ResumeReport.id).limit(batch_size).all()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            ids, skill, experience, relevance, markers, old_scores, old_statuses, created = zip(*rows)
+            with track_stage("rescore_batch"):
+                scores = combine_scores(
+                    np.nan_to_num(np.array(skill, dtype=np.float64)), np.nan_to_num(np.array(experience, dtype=np.float64)),
+                    np.array(relevance, dtype=np.float64), np.array([m or 0 for m in markers], dtype=np.int64),
+                )
+                statuses = score_statuses(scores)
+                changed = np.flatnonzero(
+                    (scores != np.array(old_scores, dtype=np.float64))
+                    | (statuses != np.array(old_statuses, dtype=object))
                 )
+            if len(changed):
+                new_rows = [
+                    {"id": ids[i], "score_out_of_100": int(scores[i]), "status": str(statuses[i])} for i in changed
+                ]
+                session.execute(update(ResumeReport), new_rows)
+                # Move the changed reports between score buckets and status counts
+                deltas = report_aggregate_deltas(
+                    [SimpleNamespace(score_out_of_100=old_scores[i], status=old_statuses[i], created_at=created[i],
+                                     matching_skills=None, missing_skills=None) for i in changed], sign=-1
+                )
+                for model, added in report_aggregate_deltas(
+                    [SimpleNamespace(created_at=created[i], matching_skills=None, missing_skills=None, **row)
+                     for i, row in zip(changed, new_rows)]
+                ).items():
+                    deltas[model].update(added)
+                apply_aggregate_deltas(session.connection(), deltas)
+                session.commit()
+            counts["rescored"] += len(rows)
+            counts["updated"] += len(changed)
+        return counts
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
 
-                if final_score >= 75:
-                    status = "Excellent Match"
-                elif final_score >= 60:
-                    status = "Good Match"
-                elif final_score >= 40:
-                    status = "Needs Improvement"
-                else:
-                    status = "Poor Match"
 
-                resume_summary = generate_resume_summary(resume_text, job_description)
-                suggested_job_role = recommend_job_type(resume_text)
+def analyze_job_description(job_description: str) -> Tuple[List[str], np.ndarray]:
+    """Extract the JD skills and embedding once per evaluation request."""
+    jd_skills = extract_skills_with_gpt(job_description, "job description")
+    logger.info(f"Extracted {len(jd_skills)} skills from job description: {jd_skills}")
+    return jd_skills, get_embedding(job_description)
 
-                # Only prepare credentials for eligible candidates, but don't send email yet
-                interview_username = None
-                interview_password = None
-                firebase_uid = None
 
-                if final_score >= SUITABILITY_THRESHOLD and candidate_email:
-                    try:
-                        # Generate credentials but don't send email
-                        interview_username, interview_password = generate_credentials()
-                        
-                        # Create Firebase user but don't send email
-                        firebase_uid = create_firebase_user(
-                            candidate_email, 
-                            interview_password, 
-                            candidate_name or "Candidate",
-                            interview_username
-                        )
-                        
-                        if firebase_uid:
-                            logger.info(f"Firebase user created for {candidate_email} - ready for interview invitation")
-                        else:
-                            logger.warning(f"Failed to create Firebase user for {candidate_email}")
-                            
-                    except Exception as e:
-                        logger.error(f"Error creating Firebase user for {candidate_email}: {e}")
-
-                similar_resumes = search_similar_resumes(job_embedding, top_k=3)
-
-                # Create database record
-                report_id = None
-                try:
-                    report = ResumeReport(
-                        filename=resume_pdf.filename,
-                        candidate_email=candidate_email,
-                        candidate_name=candidate_name,
-                        suggested_job_role=suggested_job_role,
-                        resume_summary=resume_summary,
-                        skills_present=resume_skills,
-                        skills_missing=missing_skills,
-                        normalized_skills=normalized_resume_skills,
-                        matching_skills=matching_skills,
-                        missing_skills=missing_skills,
-                        score_out_of_100=final_score,
-                        experience_score=experience_score,
-                        skill_match_score=skill_score,
-                        status=status,
-                        email_sent=False,  # Email not sent automatically
-                        interview_username=interview_username,
-                        interview_password=interview_password,
-                        firebase_uid=firebase_uid
-                    )
+def analyze_resume(resume_text: str, job_description: str, jd_skills: List[str],
+                   job_embedding: Optional[np.ndarray] = None) -> Dict:
+    """Run the extraction and scoring pipeline for one resume (blocking; call from a worker thread)."""
+    resume_embedding = get_embedding(resume_text)
+    sketch = resume_sketch(resume_text)
+    prior = None
+    if NEAR_DUPLICATE_REUSE:
+        try:
+            prior = find_near_duplicate(resume_embedding, sketch)
+        except Exception as e:
+            logger.error(f"Near-duplicate lookup failed: {e}")
+
+    if prior is not None:
+        logger.info(f"Reusing the analysis of near-duplicate report {prior.id}")
+        stage_metrics.increment("cache_hits", "near_duplicate")
+        candidate_name, resume_skills = prior.candidate_name, list(prior.skills_present or [])
+        resume_summary, suggested_job_role = prior.resume_summary, prior.suggested_job_role
+    else:
+        candidate_name = extract_name_from_resume(resume_text)
+        resume_skills = extract_skills_with_gpt(resume_text, "resume")
+        resume_summary = generate_resume_summary(resume_text, job_description)
+        suggested_job_role = recommend_job_type(resume_text)
+    logger.info(f"Extracted {len(resume_skills)} skills from resume: {resume_skills}")
+
+    skill_match = calculate_skill_match_score(
+        [normalize_skill(skill) for skill in resume_skills], [normalize_skill(skill) for skill in jd_skills]
+    )
+    analysis = score_resume(
+        resume_text, job_description, jd_skills, job_embedding,
+        candidate_name=candidate_name,
+        resume_skills=resume_skills,
+        skill_match=skill_match,
+        resume_embedding=resume_embedding,
+        resume_summary=resume_summary,
+        suggested_job_role=suggested_job_role,
+        sketch=sketch,
+    )
+    analysis["near_duplicate_of"] = prior.id if prior is not None else None
+    return analysis
+
+
+def score_resume(resume_text: str, job_description: str, jd_skills: List[str], job_embedding: Optional[np.ndarray],
+                 candidate_name: Optional[str], resume_skills: List[str],
+                 skill_match: Tuple[float, List[str], List[str]], resume_embedding: np.ndarray,
+                 resume_summary: str, suggested_job_role: str, sketch: Optional[np.ndarray] = None) -> Dict:
+    """Combine the model outputs for one resume with the local signals into its analysis.
+
+    Shared by the interactive pipeline and batch evaluations, which get the
+    model outputs from the Batch API instead.
+    """
+    normalized_resume_skills = [normalize_skill(skill) for skill in resume_skills]
+    normalized_jd_skills = [normalize_skill(skill) for skill in jd_skills]
+    skill_score, matching_skills, missing_skills = skill_match
+
+    with track_stage("experience_score"):
+        experience_score, exp_details = calculate_experience_score(
+            resume_text, job_description, normalized_jd_skills
+        )
+
+    with track_stage("final_score"):
+        # The signals are stored with the report so it can be rescored without the LLM
+        relevance_score = calculate_relevance_score(
+            resume_text, job_description, resume_embedding=resume_embedding, jd_embedding=job_embedding
+        )
+        markers = resume_markers(resume_text)
+        final_score = int(combine_scores(skill_score, experience_score, relevance_score, markers))
+
+    return {
+        "candidate_email": extract_email_from_resume(resume_text),
+        "candidate_name": candidate_name,
+        "resume_skills": resume_skills,
+        "normalized_resume_skills": normalized_resume_skills,
+        "skill_score": skill_score,
+        "matching_skills": matching_skills,
+        "missing_skills": missing_skills,
+        "experience_score": experience_score,
+        "experience_details": exp_details,
+        "relevance_score": relevance_score,
+        "resume_markers": markers,
+        "final_score": final_score,
+        "status": score_status(final_score),
+        "resume_summary": resume_summary,
+        "suggested_job_role": suggested_job_role,
+        "resume_embedding": resume_embedding,
+        "resume_sketch": sketch if sketch is not None else resume_sketch(resume_text),
+    }
+
+
+def save_report(filename: str, analysis: Dict, pending_accounts: List[Dict]) -> Tuple[Optional[int], Optional[str], Optional[str]]:
+    """Store the report for one analyzed resume; returns (report id, interview username, password).
+
+    Eligible candidates get credentials and are appended to `pending_accounts`
+    for the batched Firebase provisioning; no email is sent.
+    """
+    candidate_email = analysis["candidate_email"]
+    candidate_name = analysis["candidate_name"]
+    final_score = analysis["final_score"]
+
+    # Only prepare credentials for eligible candidates, but don't send email yet.
+    # Firebase accounts are provisioned in one batch after the response is sent.
+    interview_username = None
+    interview_password = None
+
+    if final_score >= SUITABILITY_THRESHOLD and candidate_email:
+        interview_username, interview_password = generate_credentials()
+
+    # Create database record
+    report_id = None
+    session = get_session()
+    try:
+        report = ResumeReport(
+            filename=filename,
+            candidate_email=candidate_email,
+            candidate_name=candidate_name,
+            suggested_job_role=analysis["suggested_job_role"],
+            resume_summary=analysis["resume_summary"],
+            skills_present=analysis["resume_skills"],
+            skills_missing=analysis["missing_skills"],
+            normalized_skills=analysis["normalized_resume_skills"],
+            matching_skills=analysis["matching_skills"],
+            missing_skills=analysis["missing_skills"],
+            score_out_of_100=final_score,
+            experience_score=analysis["experience_score"],
+            skill_match_score=analysis["skill_score"],
+            relevance_score=analysis["relevance_score"],
+            resume_markers=analysis["resume_markers"],
+            status=analysis["status"],
+            email_sent=False,  # Email not sent automatically
+            interview_username=interview_username,
+            interview_password=interview_password,
+            firebase_uid=None,  # Filled in by provision_interview_accounts
+            resume_embedding=embedding_to_bytes(analysis["resume_embedding"]),
+            resume_sketch=analysis["resume_sketch"].tobytes()
+        )
+
+        with track_stage("db_save"):
+            session.add(report)
+            session.commit()
+            session.refresh(report)  # This ensures we get the generated ID
+        report_id = report.id  # Capture the database ID
+        logger.info(f"Successfully saved report for {filename} with ID: {report_id}")
+
+    except Exception as db_error:
+        logger.error(f"Database save error for {filename}: {db_error}")
+        session.rollback()
+    finally:
+        session.close()
+
+    if interview_username:
+        pending_accounts.append({
+            "report_id": report_id,
+            "email": candidate_email,
+            "password": interview_password,
+            "name": candidate_name or "Candidate",
+            "username": interview_username,
+        })
+    return report_id, interview_username, interview_password
+
+
+# Offline evaluations through the OpenAI Batch API: half the price of the
+# synchronous calls and a separate rate limit, at up to BATCH_COMPLETION_WINDOW
+# latency. The per-resume prompts run in two rounds, since the skill match
+# prompt needs the extracted skills.
+BATCH_COMPLETION_WINDOW = os.getenv("BATCH_COMPLETION_WINDOW", "24h")
+BATCH_POLL_SECONDS = float(os.getenv("BATCH_POLL_SECONDS", "60"))
+# Claimed evaluations are skipped by other workers until the lease runs out
+BATCH_LEASE_SECONDS = 600
+BATCH_TERMINAL_STATES = ("completed", "failed", "expired", "cancelled")  # Of an OpenAI batch
+BATCH_OPEN_STATES = ("extracting", "matching")  # Of a BatchEvaluation
+
+# Round one prompts: kind -> (request builder, stage). Round two is skill_match.
+BATCH_PROMPTS = {
+    "name": (name_request, "extract_name"),
+    "skills": (lambda text: skills_request(text, "resume"), "extract_skills"),
+    "job_role": (job_role_request, "job_role"),
+}
+
+
+def batch_line(custom_id: str, url: str, body: Dict) -> bytes:
+    return json.dumps({"custom_id": custom_id, "method": "POST", "url": url, "body": body}).encode("utf-8") + b"\n"
 
-                    session.add(report)
-                    session.commit()
-                    session.refresh(report)  # This ensures we get the generated ID
-                    report_id = report.id  # Capture the database ID
-                    logger.info(f"Successfully saved report for {resume_pdf.filename} with ID: {report_id}")
-
-                except Exception as db_error:
-                    logger.error(f"Database save error for {resume_pdf.filename}: {db_error}")
-                    session.rollback()
-
-                # Add to response with database ID
-                reports.append({
-                    "id": report_id,  # IMPORTANT: Include the database ID
-                    "filename": resume_pdf.filename,
-                    "candidate_email": candidate_email,
-                    "candidate_name": candidate_name,
-                    "suggested_job_role": suggested_job_role,
-                    "resume_summary": resume_summary,
-                    "skills_present": resume_skills,
-                    "skills_missing": missing_skills,
-                    "normalized_skills": normalized_resume_skills,
-                    "matching_skills": matching_skills,
-                    "missing_skills": missing_skills,
-                    "score_out_of_100": final_score,
-                    "skill_match_score": round(skill_score, 1),
-                    "experience_score": round(experience_score, 1),
-                    "experience_details": exp_details,
-                    "status": status,
-                    "interview_eligible": final_score >= SUITABILITY_THRESHOLD,
-                    "email_sent": False,  # No automatic email sending
-                    "interview_credentials": {
-                        "username": interview_username,
-                        "password": interview_password
-                    } if interview_username else None,
-                    "matched_resumes_preview": similar_resumes[:2]
-                })
-
-                logger.info(f"Successfully processed {resume_pdf.filename} - Score: {final_score}")
 
+def submit_openai_batch(lines: List[bytes], endpoint: str) -> str:
+    """Upload a JSONL request file and start a batch on it; returns the batch id"""
+    client = get_openai_client()
+    with track_stage("batch_submit"):
+        upload = client.files.create(file=("requests.jsonl", b"".join(lines)), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=upload.id, endpoint=endpoint, completion_window=BATCH_COMPLETION_WINDOW
+        )
+    logger.info(f"Submitted batch {batch.id} with {len(lines)} requests to {endpoint}")
+    return batch.id
+
+
+def read_batch_output(batch) -> Dict[str, Dict]:
+    """Response bodies of the successful requests of a finished batch, by custom id"""
+    if not batch.output_file_id:
+        return {}
+    with track_stage("batch_download"):
+        content = get_openai_client().files.content(batch.output_file_id).read()
+    bodies = {}
+    for line in content.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") == 200:
+            bodies[result["custom_id"]] = response["body"]
+    return bodies
+
+
+def batch_content(results: Dict, kind: str, stage: str, parse, fallback):
+    """Parse one stored response like the synchronous call would, falling back the same way"""
+    try:
+        return parse(results[kind])
+    except Exception as e:
+        logger.error(f"No usable {kind} result in batch: {e!r}")
+        record_fallback(stage, "gpt-3.5-turbo")
+        return fallback
+
+
+def create_batch_evaluation(job_description: str, resumes: List[Tuple[str, str]]) -> int:
+    """Store the resumes (filename, text) and submit the first round; returns the evaluation id.
+
+    The job description is analyzed synchronously (two calls per evaluation).
+    """
+    jd_skills, job_embedding = analyze_job_description(job_description)
+    session = get_session()
+    try:
+        evaluation = BatchEvaluation(
+            job_description=job_description, jd_skills=jd_skills, jd_embedding=embedding_to_bytes(job_embedding),
+        )
+        session.add(evaluation)
+        session.flush()
+        items = [
+            BatchEvaluationItem(evaluation_id=evaluation.id, filename=filename, resume_text=text, results={})
+            for filename, text in resumes
+        ]
+        session.add_all(items)
+        session.flush()
+
+        chat_lines = []
+        for item in items:
+            for kind, (build, _) in BATCH_PROMPTS.items():
+                chat_lines.append(batch_line(f"{item.id}:{kind}", "/v1/chat/completions", build(item.resume_text)))
+            chat_lines.append(batch_line(f"{item.id}:summary", "/v1/chat/completions",
+                                         summary_request(item.resume_text, job_description)))
+        embedding_lines = [
+            batch_line(f"{item.id}:embedding", "/v1/embeddings",
+                       {"model": "text-embedding-3-large", "input": [embedding_input(item.resume_text)]})
+            for item in items
+        ]
+        evaluation.batch_ids = [
+            submit_openai_batch(chat_lines, "/v1/chat/completions"),
+            submit_openai_batch(embedding_lines, "/v1/embeddings"),
+        ]
+        session.commit()
+        return evaluation.id
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
+
+
+def advance_batch_evaluation(session, evaluation: BatchEvaluation) -> str:
+    """Move an evaluation on once its batches have finished; returns the new status.
+
+    Requests that failed or expired fall back to the same defaults as failed
+    synchronous calls, so a partly finished batch still produces reports.
+    """
+    client = get_openai_client()
+    batches = [client.batches.retrieve(batch_id) for batch_id in evaluation.batch_ids or []]
+    if any(batch.status not in BATCH_TERMINAL_STATES for batch in batches):
+        return evaluation.status
+    failed = [batch for batch in batches if batch.status == "failed"]
+    if failed:
+        evaluation.status = "failed"
+        evaluation.last_error = f"Batch {failed[0].id} failed: {failed[0].errors}"
+        logger.error(evaluation.last_error)
+        return evaluation.status
+
+    bodies = {}
+    for batch in batches:
+        bodies.update(read_batch_output(batch))
+    items = session.query(BatchEvaluationItem).filter_by(evaluation_id=evaluation.id).order_by(BatchEvaluationItem.id).all()
+    for item in items:
+        results = dict(item.results or {})
+        for custom_id, body in ((key, body) for key, body in bodies.items() if key.startswith(f"{item.id}:")):
+            kind = custom_id.split(":", 1)[1]
+            if kind == "embedding":
+                item.resume_embedding = embedding_to_bytes(body["data"][0]["embedding"])
+            else:
+                results[kind] = body["choices"][0]["message"]["content"]
+        item.results = results
+
+    jd_skills = [normalize_skill(skill) for skill in evaluation.jd_skills or []]
+    if evaluation.status == "extracting" and jd_skills:
+        lines = []
+        for item in items:
+            resume_skills = batch_content(item.results, "skills", "extract_skills", parse_skills, [])
+            lines.append(batch_line(f"{item.id}:skill_match", "/v1/chat/completions", skill_match_request(
+                [normalize_skill(skill) for skill in resume_skills], jd_skills
+            )))
+        evaluation.batch_ids = [submit_openai_batch(lines, "/v1/chat/completions")]
+        evaluation.status = "matching"
+        return evaluation.status
+
+    # Results are saved with the items first, so a crash while assembling is resumed, not resubmitted
+    session.commit()
+    pending_accounts = []
+    job_embedding = np.frombuffer(evaluation.jd_embedding, dtype=np.float32) if evaluation.jd_embedding else None
+    for item in items:
+        if item.report_id is not None:
+            continue
+        resume_skills = batch_content(item.results, "skills", "extract_skills", parse_skills, [])
+        if jd_skills:
+            skill_match = batch_content(
+                item.results, "skill_match", "skill_match",
+                lambda content: parse_skill_match(content, [normalize_skill(skill) for skill in resume_skills]),
+                (0.0, [], jd_skills),
+            )
+        else:
+            skill_match = (85.0, [normalize_skill(skill) for skill in resume_skills], [])
+        analysis = score_resume(
+            item.resume_text, evaluation.job_description, evaluation.jd_skills or [], job_embedding,
+            candidate_name=batch_content(item.results, "name", "extract_name", parse_name, None),
+            resume_skills=resume_skills,
+            skill_match=skill_match,
+            resume_embedding=(np.frombuffer(item.resume_embedding, dtype=np.float32)
+                              if item.resume_embedding else np.array([])),
+            resume_summary=batch_content(item.results, "summary", "resume_summary", parse_summary,
+                                         DEFAULT_RESUME_SUMMARY),
+            suggested_job_role=batch_content(item.results, "job_role", "job_role", parse_job_role, DEFAULT_JOB_ROLE),
+        )
+        if CORPUS_INGEST:
+            corpus_ingestor.add(item.resume_text, analysis["resume_embedding"])
+        item.report_id = save_report(item.filename, analysis, pending_accounts)[0]
+        session.commit()
+
+    if pending_accounts:
+        provision_interview_accounts(pending_accounts)
+    evaluation.status = "completed"
+    evaluation.completed_at = datetime.utcnow()
+    return evaluation.status
+
+
+def poll_batch_evaluations() -> Dict[int, str]:
+    """Advance every due evaluation once; returns their statuses by id"""
+    now = datetime.utcnow()
+    session = get_session()
+    try:
+        evaluations = (
+            session.query(BatchEvaluation)
+            .filter(BatchEvaluation.status.in_(BATCH_OPEN_STATES), BatchEvaluation.next_poll_at <= now)
+            .order_by(BatchEvaluation.id)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        claimed = [evaluation.id for evaluation in evaluations]
+        for evaluation in evaluations:
+            evaluation.next_poll_at = now + timedelta(seconds=BATCH_LEASE_SECONDS)
+        session.commit()
+
+        statuses = {}
+        for evaluation_id in claimed:
+            evaluation = session.get(BatchEvaluation, evaluation_id)
+            try:
+                statuses[evaluation_id] = advance_batch_evaluation(session, evaluation)
+                evaluation.next_poll_at = datetime.utcnow() + timedelta(seconds=BATCH_POLL_SECONDS)
+                session.commit()
+            except Exception as e:
+                # Left to the lease; the next poll after it runs out retries
+                logger.error(f"Error advancing batch evaluation {evaluation_id}: {e}")
+                session.rollback()
+                statuses[evaluation_id] = "error"
+        return statuses
+    finally:
+        session.close()
+
+
+def open_batch_evaluations() -> int:
+    session = get_session()
+    try:
+        return session.query(BatchEvaluation).filter(BatchEvaluation.status.in_(BATCH_OPEN_STATES)).count()
+    finally:
+        session.close()
+
+
+class BatchEvaluationPoller:
+    """Background thread that polls the open batch evaluations; it stops once none are left"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(self._stopping,),
+                                                name="batch-evaluation-poller", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Exit after the current poll; open evaluations are picked up again by the next start()"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stopping.set()
+        thread.join(timeout)
+
+    def _run(self, stopping: threading.Event):
+        while True:
+            # Batches take minutes at best, so there is nothing to collect right away
+            if stopping.wait(BATCH_POLL_SECONDS):
+                return
+            try:
+                poll_batch_evaluations()
+                # Checked under the lock so an evaluation created meanwhile restarts the thread
+                with self._lock:
+                    if stopping.is_set() or not open_batch_evaluations():
+                        # After a stop() the slot may already belong to a restarted thread
+                        if not stopping.is_set():
+                            self._thread = None
+                        return
             except Exception as e:
-                logger.error(f"Error processing {resume_pdf.filename}: {e}")
-                reports.append({
-                    "filename": resume_pdf.filename,
-                    "error": f"Processing error: {str(e)}"
-                })
+                logger.error(f"Batch evaluation poller error: {e}")
+
+
+batch_evaluation_poller = BatchEvaluationPoller()
+
+
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "1000"))
+ARCHIVE_MAX_TOTAL_BYTES = int(os.getenv("ARCHIVE_MAX_TOTAL_BYTES", str(500 * 1024 * 1024)))
+ARCHIVE_MAX_MEMBER_BYTES = int(os.getenv("ARCHIVE_MAX_MEMBER_BYTES", str(20 * 1024 * 1024)))
+ARCHIVE_MAX_RATIO = float(os.getenv("ARCHIVE_MAX_RATIO", "100"))
+# Resumes from one archive evaluated at once; also bounds the PDFs held in memory
+ARCHIVE_CONCURRENCY = int(os.getenv("ARCHIVE_CONCURRENCY", "4"))
+
+
+class ArchiveError(ValueError):
+    """The archive can't be read or exceeds a configured limit; reading stops"""
+
+
+def _read_limited(stream, limit: int, name: str) -> bytes:
+    data = stream.read(limit + 1)
+    if len(data) > limit:
+        raise ArchiveError(f"{name} is larger than {limit} bytes")
+    return data
+
+
+def iter_archive_pdfs(fileobj, skipped: List[Dict], max_members: int = ARCHIVE_MAX_MEMBERS,
+                      max_total_bytes: int = ARCHIVE_MAX_TOTAL_BYTES, max_member_bytes: int = ARCHIVE_MAX_MEMBER_BYTES,
+                      max_ratio: float = ARCHIVE_MAX_RATIO):
+    """Yield (name, bytes) for each PDF in a ZIP or (optionally compressed) TAR archive.
+
+    Members are decompressed one at a time as the caller asks for them. Sizes
+    are counted from the bytes actually read rather than trusted from headers,
+    and reading stops with ArchiveError once the member count, total
+    uncompressed size or compression ratio limit is crossed. Members that
+    aren't PDFs are recorded in `skipped`.
+    """
+    fileobj.seek(0, os.SEEK_END)
+    compressed_size = max(fileobj.tell(), 1)
+    fileobj.seek(0)
+    total = 0
+    members = 0
+
+    def accept(name: str, is_file: bool) -> bool:
+        nonlocal members
+        members += 1
+        if members > max_members:
+            raise ArchiveError(f"Archive has more than {max_members} members")
+        base = os.path.basename(name)
+        if not is_file or name.startswith("__MACOSX/") or base.startswith("."):
+            return False
+        if not base.lower().endswith(".pdf"):
+            skipped.append({"filename": name, "reason": "Not a PDF"})
+            return False
+        return True
+
+    def count(name: str, data: bytes, packed_size: int) -> bytes:
+        nonlocal total
+        total += len(data)
+        if total > max_total_bytes:
+            raise ArchiveError(f"Archive expands to more than {max_total_bytes} bytes")
+        if packed_size and len(data) / packed_size > max_ratio:
+            raise ArchiveError(f"{name} is compressed more than {max_ratio:g}x")
+        return data
+
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        with zipfile.ZipFile(fileobj) as archive:
+            for info in archive.infolist():
+                if not accept(info.filename, not info.is_dir()):
+                    continue
+                if info.file_size > max_member_bytes:
+                    raise ArchiveError(f"{info.filename} is larger than {max_member_bytes} bytes")
+                with archive.open(info) as member:
+                    data = _read_limited(member, max_member_bytes, info.filename)
+                yield info.filename, count(info.filename, data, info.compress_size)
+        return
+
+    fileobj.seek(0)
+    try:
+        # Streaming mode reads the (possibly gzip/bz2/xz) tarball strictly front to back
+        archive = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.TarError:
+        raise ArchiveError("Not a ZIP or TAR archive") from None
+    with archive:
+        for info in archive:
+            if not accept(info.name, info.isfile()):
+                continue
+            if info.size > max_member_bytes:
+                raise ArchiveError(f"{info.name} is larger than {max_member_bytes} bytes")
+            data = count(info.name, _read_limited(archive.extractfile(info), max_member_bytes, info.name), 0)
+            # Per-member compressed sizes are unknown in a compressed tarball; check the whole stream
+            if total / compressed_size > max_ratio:
+                raise ArchiveError(f"Archive is compressed more than {max_ratio:g}x")
+            yield info.name, data
+
+
+async def evaluate_resume_pdf(filename: str, pdf_bytes: bytes, job_description: str, jd_skills: List[str],
+                              job_embedding: np.ndarray, similar_resumes: List, compact: bool,
+                              pending_accounts: List[Dict]) -> Dict:
+    """Extract, score and save one resume; returns its report (or an error entry).
+
+    Eligible candidates are appended to `pending_accounts` for the batched
+    Firebase provisioning that runs after the response is sent.
+    """
+    try:
+        logger.info(f"Processing resume: {filename}")
+
+        resume_text = await run_in_threadpool(extract_text_from_pdf, pdf_bytes)
+
+        if not resume_text.strip():
+            return {
+                "filename": filename,
+                "error": "Could not extract text from PDF"
+            }
+
+        with track_stage("analyze_resume"):
+            analysis = await run_in_threadpool(analyze_resume, resume_text, job_description, jd_skills, job_embedding)
+        if CORPUS_INGEST:
+            # Becomes searchable (by every worker) after the next flush
+            corpus_ingestor.add(resume_text, analysis["resume_embedding"])
+        report_id, interview_username, interview_password = await run_in_threadpool(
+            save_report, filename, analysis, pending_accounts
+        )
+        candidate_email = analysis["candidate_email"]
+        candidate_name = analysis["candidate_name"]
+        final_score = analysis["final_score"]
+
+        # Add to response with database ID
+        report_response = {
+            "id": report_id,  # IMPORTANT: Include the database ID
+            "filename": filename,
+            "candidate_email": candidate_email,
+            "candidate_name": candidate_name,
+            "suggested_job_role": analysis["suggested_job_role"],
+            "resume_summary": analysis["resume_summary"],
+            "skills_present": analysis["resume_skills"],
+            "skills_missing": analysis["missing_skills"],
+            "normalized_skills": analysis["normalized_resume_skills"],
+            "matching_skills": analysis["matching_skills"],
+            "missing_skills": analysis["missing_skills"],
+            "score_out_of_100": final_score,
+            "skill_match_score": round(analysis["skill_score"], 1),
+            "experience_score": round(analysis["experience_score"], 1),
+            "experience_details": analysis["experience_details"],
+            "status": analysis["status"],
+            "interview_eligible": final_score >= SUITABILITY_THRESHOLD,
+            "email_sent": False,  # No automatic email sending
+            "interview_credentials": {
+                "username": interview_username,
+                "password": interview_password
+            } if interview_username else None,
+            "account_provisioning": "pending" if interview_username else None,
+            "near_duplicate_of": analysis.get("near_duplicate_of"),
+            "matched_resumes_preview": similar_resumes
+        }
+        if compact:
+            del report_response["skills_missing"], report_response["matched_resumes_preview"]
+        logger.info(f"Successfully processed {filename} - Score: {final_score}")
+        return report_response
+
+    except Exception as e:
+        logger.error(f"Error processing {filename}: {e}")
+        stage_metrics.increment("errors", "evaluate_resume")
+        return {
+            "filename": filename,
+            "error": f"Processing error: {str(e)}"
+        }
+
+
+@app.post("/evaluate-resumes/")
+async def evaluate_resumes(
+    background_tasks: BackgroundTasks,
+    job_description: str = Form(...), 
+    resume_pdfs: List[UploadFile] = File(...),
+    compact: bool = Form(False)
+):
+    """Evaluate resumes against job description with comprehensive scoring and interview integration.
+
+    `compact` returns corpus matches once per request as ids and snippets
+    (full text from GET /corpus-resumes/{id}), drops the duplicated
+    `skills_missing` field and serializes with orjson.
+    """
+    request_started = time.perf_counter()
+    reports = []
+    pending_accounts = []
+    interview_invitations_sent = 0
+
+    try:
+        # The OpenAI client is blocking; run it in the threadpool so concurrent
+        # requests overlap and identical in-flight calls can be coalesced.
+        jd_skills, job_embedding = await run_in_threadpool(analyze_job_description, job_description)
+        # The corpus is searched with the JD embedding, so the matches are the same for every resume
+        similar_resumes = search_similar_resumes(job_embedding, top_k=2, compact=compact)
+
+        for resume_pdf in resume_pdfs:
+            pdf_bytes = await resume_pdf.read()
+            reports.append(await evaluate_resume_pdf(
+                resume_pdf.filename, pdf_bytes, job_description, jd_skills, job_embedding,
+                similar_resumes, compact, pending_accounts
+            ))
 
     except Exception as e:
         logger.error(f"Error in evaluation process: {e}")
         return {"error": f"Evaluation failed: {str(e)}"}
 
     finally:
-        session.close()
+        if pending_accounts:
+            background_tasks.add_task(provision_interview_accounts, pending_accounts)
+        stage_metrics.observe("evaluate_request", "", time.perf_counter() - request_started)
 
-    return {
+    result = {
         "message": f"Analysis complete for {len(reports)} resumes",
         "job_skills_extracted": jd_skills,
         "suitability_threshold": SUITABILITY_THRESHOLD,
         "interview_invitations_sent": 0,  # No automatic emails sent
         "reports": reports
     }
+    if compact:
+        result["matched_resumes"] = similar_resumes
+        return ORJSONResponse(result)
+    return result
+
+
+@app.post("/evaluate-resume-archive/")
+async def evaluate_resume_archive(
+    background_tasks: BackgroundTasks,
+    job_description: str = Form(...),
+    archive: UploadFile = File(...),
+    compact: bool = Form(False)
+):
+    """Evaluate every PDF in a ZIP or TAR archive.
+
+    Members are read one at a time and each PDF starts through the pipeline as
+    soon as it is read, with at most ARCHIVE_CONCURRENCY in flight. If a limit
+    is hit, reading stops and the reports evaluated so far are returned with
+    `archive_error`.
+    """
+    request_started = time.perf_counter()
+    pending_accounts = []
+    skipped = []
+    tasks = []
+    archive_error = None
+    slots = asyncio.Semaphore(ARCHIVE_CONCURRENCY)
+
+    async def evaluate(name: str, pdf_bytes: bytes, jd_skills, job_embedding, similar_resumes):
+        try:
+            return await evaluate_resume_pdf(name, pdf_bytes, job_description, jd_skills, job_embedding,
+                                             similar_resumes, compact, pending_accounts)
+        finally:
+            slots.release()
+
+    try:
+        jd_skills, job_embedding = await run_in_threadpool(analyze_job_description, job_description)
+        similar_resumes = search_similar_resumes(job_embedding, top_k=2, compact=compact)
+
+        members = iter_archive_pdfs(archive.file, skipped, ARCHIVE_MAX_MEMBERS, ARCHIVE_MAX_TOTAL_BYTES,
+                                    ARCHIVE_MAX_MEMBER_BYTES, ARCHIVE_MAX_RATIO)
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    member = await run_in_threadpool(next, members, None)
+                except Exception:
+                    slots.release()
+                    raise
+                if member is None:
+                    slots.release()
+                    break
+                name, pdf_bytes = member
+                tasks.append(asyncio.create_task(
+                    evaluate(name, pdf_bytes, jd_skills, job_embedding, similar_resumes)
+                ))
+        except (ArchiveError, zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+            logger.warning(f"Stopped reading archive {archive.filename}: {e}")
+            archive_error = str(e)
+        reports = list(await asyncio.gather(*tasks))
+
+    except Exception as e:
+        logger.error(f"Error in archive evaluation: {e}")
+        for task in tasks:
+            task.cancel()
+        return {"error": f"Evaluation failed: {str(e)}"}
+
+    finally:
+        if pending_accounts:
+            background_tasks.add_task(provision_interview_accounts, pending_accounts)
+        stage_metrics.observe("evaluate_request", "", time.perf_counter() - request_started)
+
+    result = {
+        "message": f"Analysis complete for {len(reports)} resumes",
+        "job_skills_extracted": jd_skills,
+        "suitability_threshold": SUITABILITY_THRESHOLD,
+        "reports": reports,
+        "skipped": skipped,
+        "archive_error": archive_error,
+    }
+    if compact:
+        result["matched_resumes"] = similar_resumes
+        return ORJSONResponse(result)
+    return result
+
+
+@app.post("/batch-evaluations/")
+async def create_batch_evaluation_endpoint(
+    job_description: str = Form(...),
+    resume_pdfs: List[UploadFile] = File(...)
+):
+    """Evaluate resumes through the OpenAI Batch API instead of synchronous calls.
+
+    Returns immediately with the evaluation id; reports are saved once the
+    batches finish (within BATCH_COMPLETION_WINDOW). Poll
+    GET /batch-evaluations/{id} for the status and report ids.
+    """
+    resumes = []
+    skipped = []
+    for resume_pdf in resume_pdfs:
+        resume_text = await run_in_threadpool(extract_text_from_pdf, await resume_pdf.read())
+        if resume_text.strip():
+            resumes.append((resume_pdf.filename, resume_text))
+        else:
+            skipped.append({"filename": resume_pdf.filename, "error": "Could not extract text from PDF"})
+    if not resumes:
+        return {"error": "No readable resumes", "skipped": skipped}
+
+    try:
+        evaluation_id = await run_in_threadpool(create_batch_evaluation, job_description, resumes)
+    except Exception as e:
+        logger.error(f"Error submitting batch evaluation: {e}")
+        return {"error": f"Batch submission failed: {str(e)}"}
+    batch_evaluation_poller.start()
+    return {"id": evaluation_id, "status": "extracting", "resumes": len(resumes), "skipped": skipped}
+
+
+@app.get("/batch-evaluations/{evaluation_id}")
+def get_batch_evaluation(evaluation_id: int):
+    session = get_session()
+    try:
+        evaluation = session.get(BatchEvaluation, evaluation_id)
+        if evaluation is None:
+            return JSONResponse(status_code=404, content={"error": "Batch evaluation not found"})
+        report_ids = [
+            report_id for (report_id,) in session.query(BatchEvaluationItem.report_id)
+            .filter_by(evaluation_id=evaluation_id).order_by(BatchEvaluationItem.id)
+        ]
+        return {
+            "id": evaluation.id,
+            "status": evaluation.status,
+            "resumes": len(report_ids),
+            "report_ids": [report_id for report_id in report_ids if report_id is not None],
+            "error": evaluation.last_error,
+            "created_at": evaluation.created_at.isoformat() if evaluation.created_at else None,
+            "completed_at": evaluation.completed_at.isoformat() if evaluation.completed_at else None,
+        }
+    finally:
+        session.close()
 
 
 @app.post("/resend-interview-invitation/{candidate_id}")
 def resend_interview_invitation(candidate_id: int):
     """Send interview invitation to a candidate (only when button is clicked)"""
-    session = SessionLocal()
+    session = get_session()
     try:
         candidate = session.query(ResumeReport).filter(ResumeReport.id == candidate_id).first()
         if not candidate:
@@ -1079,50 +4036,229 @@ def resend_interview_invitation(candidate_id: int):
             username, password = generate_credentials()
             candidate.interview_username = username
             candidate.interview_password = password
-            
-            # Create Firebase user if not exists
-            if not candidate.firebase_uid:
-                firebase_uid = create_firebase_user(
-                    candidate.candidate_email,
-                    password,
-                    candidate.candidate_name or "Candidate",
-                    username
-                )
-                candidate.firebase_uid = firebase_uid
-        
+            session.commit()
+
+        candidate_email = candidate.candidate_email
+        candidate_name = candidate.candidate_name
+        username = candidate.interview_username
+        password = candidate.interview_password
+        firebase_uid = candidate.firebase_uid
+        skills = candidate.matching_skills or []
+    except Exception as e:
+        logger.error(f"Error sending invitation: {e}")
+        session.rollback()
+        return {"error": str(e)}
+    finally:
+        # Don't hold a connection while Firebase and SMTP are working
+        session.close()
+
+    try:
+        # Create Firebase user if background provisioning hasn't (yet) done so
+        if not firebase_uid:
+            firebase_user = create_firebase_user(candidate_email, password, candidate_name or "Candidate", username)
+            if firebase_user:
+                firebase_uid, username = firebase_user
+
         # Send email only when this endpoint is called (button click)
-        email_sent = send_interview_email(
-            candidate.candidate_email,
-            candidate.candidate_name,
-            candidate.interview_username,
-            candidate.interview_password,
-            candidate.matching_skills or []
-        )
-        
-        candidate.email_sent = email_sent
-        session.commit()
+        email_sent = send_interview_email(candidate_email, candidate_name, username, password, skills)
+
+        session = get_session()
+        try:
+            session.execute(update(ResumeReport), [{
+                "id": candidate_id,
+                "firebase_uid": firebase_uid,
+                "interview_username": username,
+                "email_sent": email_sent,
+            }])
+            session.commit()
+        finally:
+            session.close()
         
         if email_sent:
-            logger.info(f"Interview invitation sent to {candidate.candidate_email} via button click")
+            logger.info(f"Interview invitation sent to {candidate_email} via button click")
         
         return {
             "message": "Interview invitation sent successfully" if email_sent else "Failed to send invitation",
             "email_sent": email_sent,
-            "candidate_email": candidate.candidate_email
+            "candidate_email": candidate_email
         }
         
     except Exception as e:
         logger.error(f"Error sending invitation: {e}")
+        return {"error": str(e)}
+
+
+@app.post("/bulk-interview-invitations/")
+def bulk_interview_invitations(candidate_ids: List[int] = Body(..., embed=True)):
+    """Queue interview invitations for many candidates; the outbox dispatcher sends them"""
+    session = get_session()
+    try:
+        candidate_ids = list(dict.fromkeys(candidate_ids))
+        candidates = {
+            c.id: c for c in session.query(ResumeReport).filter(ResumeReport.id.in_(candidate_ids))
+        }
+        already_queued = {
+            report_id for (report_id,) in session.query(InvitationOutbox.report_id).filter(
+                InvitationOutbox.report_id.in_(candidate_ids),
+                InvitationOutbox.status.in_(("pending", "sending"))
+            )
+        }
+
+        queued = []
+        skipped = []
+        for candidate_id in candidate_ids:
+            candidate = candidates.get(candidate_id)
+            if candidate is None:
+                reason = "Candidate not found"
+            elif not candidate.candidate_email:
+                reason = "No email address found for candidate"
+            elif candidate.score_out_of_100 < SUITABILITY_THRESHOLD:
+                reason = f"Candidate score ({candidate.score_out_of_100}) below threshold ({SUITABILITY_THRESHOLD})"
+            elif candidate_id in already_queued:
+                reason = "Invitation already queued"
+            else:
+                reason = None
+            if reason:
+                skipped.append({"id": candidate_id, "reason": reason})
+                continue
+
+            if not candidate.interview_username or not candidate.interview_password:
+                candidate.interview_username, candidate.interview_password = generate_credentials()
+            queued.append(candidate_id)
+
+        session.add_all([InvitationOutbox(report_id=candidate_id) for candidate_id in queued])
+        session.commit()
+    except Exception as e:
+        logger.error(f"Error queueing invitations: {e}")
         session.rollback()
         return {"error": str(e)}
     finally:
         session.close()
 
+    if queued:
+        invitation_dispatcher.notify()
+    return {
+        "message": f"Queued {len(queued)} interview invitations",
+        "queued": queued,
+        "skipped": skipped
+    }
+
+
+@app.get("/bulk-interview-invitations/status")
+def bulk_invitation_status():
+    """Count outbox entries by delivery status"""
+    from sqlalchemy import func
+
+    session = get_session()
+    try:
+        counts = dict(
+            session.query(InvitationOutbox.status, func.count(InvitationOutbox.id)).group_by(InvitationOutbox.status).all()
+        )
+        return {status: counts.get(status, 0) for status in ("pending", "sending", "sent", "failed")}
+    finally:
+        session.close()
+
+
+@app.get("/corpus-resumes/{corpus_id}")
+def get_corpus_resume(corpus_id: str):
+    """Full text of a corpus resume returned by a compact search"""
+    corpus.maybe_refresh()
+    found = corpus.lookup(corpus_id)
+    if found is None:
+        return JSONResponse(status_code=404, content={"error": "Corpus resume not found"})
+    segment, row = found
+    return {"id": corpus_id, "category": segment.category_of(row), "text": segment.texts[row]}
+
+
+@app.post("/search-similar-resumes/")
+def search_similar_resumes_endpoint(
+    job_description: str = Form(...),
+    categories: Optional[str] = Form(None),
+    top_k: int = Form(5),
+    per_category: bool = Form(False)
+):
+    """Search the resume corpus, optionally within comma-separated categories or top-k per category"""
+    if not 1 <= top_k <= 100:
+        return {"error": "top_k must be between 1 and 100"}
+    job_embedding = get_embedding(job_description)
+    if len(job_embedding) == 0:
+        return {"error": "Could not embed job description"}
+
+    corpus.maybe_refresh()
+    requested = [c.strip() for c in categories.split(",") if c.strip()] if categories else None
+    predicted = corpus.predict_categories(job_embedding, CORPUS_AUTO_CATEGORIES)
+    with track_stage("corpus_search"):
+        if per_category:
+            results = corpus.search_by_category(job_embedding, top_k, requested or predicted or None)
+        else:
+            results = [
+                {"id": text_hash(segment.texts[row]), "category": segment.category_of(row),
+                 "score": round(score, 4), "text": segment.texts[row]}
+                for score, segment, row in corpus.top_rows(job_embedding, top_k, categories=requested or predicted)
+            ]
+    return {
+        "categories": requested or predicted,
+        "predicted_categories": predicted,
+        "results": results,
+    }
+
+
+@app.post("/rank-candidates/")
+def rank_candidates(
+    job_description: str = Form(...),
+    page: int = Form(1),
+    page_size: int = Form(20)
+):
+    """Rank every stored candidate against a job description by resume embedding similarity"""
+    if page < 1 or not 1 <= page_size <= 100:
+        return {"error": "page must be >= 1 and page_size between 1 and 100"}
+    key = hashlib.sha256(job_description.encode("utf-8")).hexdigest()
+    job_embedding = jd_embedding_cache.get(key)
+    if job_embedding is None:
+        job_embedding = get_embedding(job_description)
+        if len(job_embedding) == 0:
+            return {"error": "Could not embed job description"}
+        jd_embedding_cache.set(key, job_embedding)
+
+    session = get_session()
+    try:
+        with track_stage("candidate_index_refresh"):
+            candidate_index.refresh(session)
+        with track_stage("candidate_rank"):
+            ranked = candidate_index.rank(job_embedding, (page - 1) * page_size, page_size)
+        reports = {
+            r.id: r for r in session.query(ResumeReport).filter(ResumeReport.id.in_([i for i, _ in ranked]))
+        }
+        results = [
+            {
+                "id": report_id,
+                "similarity": round(similarity, 4),
+                "candidate_name": reports[report_id].candidate_name,
+                "candidate_email": reports[report_id].candidate_email,
+                "score_out_of_100": reports[report_id].score_out_of_100,
+                "status": reports[report_id].status,
+                "suggested_job_role": reports[report_id].suggested_job_role,
+                "created_at": reports[report_id].created_at.isoformat() if reports[report_id].created_at else None,
+            }
+            for report_id, similarity in ranked if report_id in reports
+        ]
+        return {
+            "total_candidates": len(candidate_index),
+            "page": page,
+            "page_size": page_size,
+            "results": results,
+        }
+    except Exception as e:
+        logger.error(f"Error ranking candidates: {e}")
+        return {"error": str(e)}
+    finally:
+        session.close()
+
 
 @app.get("/interview-candidates/")
 def get_interview_candidates():
     """Get candidates who received interview invitations"""
-    session = SessionLocal()
+    session = get_session()
     try:
         candidates = session.query(ResumeReport).filter(
             ResumeReport.score_out_of_100 >= SUITABILITY_THRESHOLD,
@@ -1154,6 +4290,49 @@ def get_interview_candidates():
     finally:
         session.close()
 
+@app.get("/analytics/")
+def analytics(days: int = 30, top_skills: int = 20):
+    """Score distribution, daily status counts and most common matching/missing skills"""
+    from sqlalchemy import func
+
+    session = get_session()
+    try:
+        buckets = dict(session.query(ScoreBucketCount.bucket, ScoreBucketCount.count).all())
+        since = datetime.utcnow().date() - timedelta(days=days - 1)
+        daily = session.query(StatusDailyCount).filter(StatusDailyCount.day >= since).order_by(StatusDailyCount.day)
+        status_totals = dict(
+            session.query(StatusDailyCount.status, func.sum(StatusDailyCount.count)).group_by(StatusDailyCount.status)
+        )
+
+        def top(kind):
+            rows = session.query(SkillCount.skill, SkillCount.count).filter(
+                SkillCount.kind == kind, SkillCount.count > 0
+            ).order_by(SkillCount.count.desc(), SkillCount.skill).limit(top_skills)
+            return [{"skill": skill, "count": count} for skill, count in rows]
+
+        last_bucket = 100 // SCORE_BUCKET_WIDTH - 1
+        return {
+            "score_histogram": [
+                {
+                    "range": f"{b * SCORE_BUCKET_WIDTH}-{100 if b == last_bucket else (b + 1) * SCORE_BUCKET_WIDTH - 1}",
+                    "count": buckets.get(b, 0),
+                }
+                for b in range(last_bucket + 1)
+            ],
+            "total_reports": sum(buckets.values()),
+            "status_totals": {status: int(count) for status, count in status_totals.items() if count},
+            "status_by_day": [
+                {"day": row.day.isoformat(), "status": row.status, "count": row.count} for row in daily if row.count
+            ],
+            "top_matching_skills": top("matching"),
+            "top_missing_skills": top("missing"),
+        }
+    except Exception as e:
+        logger.error(f"Error fetching analytics: {e}")
+        return {"error": str(e)}
+    finally:
+        session.close()
+
 @app.put("/update-threshold/")
 def update_threshold(new_threshold: float):
     """Update the suitability threshold"""
@@ -1164,17 +4343,85 @@ def update_threshold(new_threshold: float):
     else:
         return {"error": "Threshold must be between 0 and 100"}
 
+@app.post("/rescore-reports/")
+def rescore_reports_endpoint():
+    """Rescore every stored report with the current weights, bonus rules and status bands"""
+    started = time.perf_counter()
+    try:
+        counts = rescore_reports()
+    except Exception as e:
+        logger.error(f"Error rescoring reports: {e}")
+        return {"error": str(e)}
+    return {**counts, "elapsed_seconds": round(time.perf_counter() - started, 3)}
+
+@app.get("/ready")
+def readiness():
+    """Readiness probe: initializes each dependency if needed and reports its status"""
+    def check(probe):
+        try:
+            probe()
+            return {"status": "ok"}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+    def check_database():
+        with get_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    def check_client(name, getter):
+        def probe():
+            if getter() is None:
+                raise RuntimeError(_client_errors.get(name, "not configured"))
+        return probe
+
+    def check_smtp():
+        if not EMAIL_ADDRESS or not EMAIL_PASSWORD:
+            raise RuntimeError("Email credentials not configured")
+
+    dependencies = {
+        "database": check(check_database),
+        "openai": check(check_client("openai", get_openai_client)),
+        "firebase": check(check_client("firebase", get_firebase_app)),
+        "firestore": check(check_client("firestore", get_firestore_client)),
+        "smtp": check(check_smtp),
+        "corpus": {"status": "ok" if corpus_status["status"] == "loaded" else corpus_status["status"],
+                   "size": len(corpus), "segments": len(corpus.segments), "error": corpus_status["error"]},
+    }
+    # Firebase, Firestore, SMTP and the corpus degrade features but don't block evaluations
+    ready = all(dependencies[name]["status"] == "ok" for name in ("database", "openai"))
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "dependencies": dependencies},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus metrics: per-stage latency histograms and call/error/fallback counters"""
+    return PlainTextResponse(stage_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def root():
     return {
         "message": "Advanced CV Evaluator API v3.0 with Interview Integration",
         "endpoints": {
             "evaluate": "POST /evaluate-resumes/",
+            "evaluate_archive": "POST /evaluate-resume-archive/",
             "candidates": "GET /candidates/",
             "candidate_details": "GET /candidates/{id}",
             "interview_candidates": "GET /interview-candidates/",
             "resend_invitation": "POST /resend-interview-invitation/{id}",
+            "bulk_invitations": "POST /bulk-interview-invitations/",
+            "bulk_invitation_status": "GET /bulk-interview-invitations/status",
+            "search_similar_resumes": "POST /search-similar-resumes/",
+            "corpus_resume": "GET /corpus-resumes/{id}",
+            "rank_candidates": "POST /rank-candidates/",
             "update_threshold": "PUT /update-threshold/",
+            "rescore_reports": "POST /rescore-reports/",
+            "analytics": "GET /analytics/",
+            "metrics": "GET /metrics",
+            "ready": "GET /ready",
             "health": "GET /"
         },
         "features": [
@@ -1195,8 +4442,8 @@ def root():
 def manual_migrate():
     """Manually trigger database migration"""
     try:
-        migrate_database()
-        return {"message": "Database migration completed successfully"}
+        version = migrate_database()
+        return {"message": "Database migration completed successfully", "schema_version": version}
     except Exception as e:
         return {"error": f"Migration failed: {str(e)}"}
 
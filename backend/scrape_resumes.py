@@ -1,15 +1,30 @@
-import bs4
-from selenium import webdriver
-import pandas as pd
+"""Scrape LiveCareer resume search results into resumes/Resume.csv.
+
+Usage:
+    python scrape_resumes.py [--jobs HR,Teacher] [--pages 12] [--concurrency 8] [--delay 0.25]
+
+Search pages and resumes are fetched concurrently with aiohttp, bounded per
+host and spaced by a politeness delay. Progress is appended to a checkpoint
+file, so an interrupted run resumes where it stopped, and rows are written
+out in shards as they complete. The shards are merged into one CSV at the end.
+"""
+import argparse
+import asyncio
 import hashlib
+import json
 import os
+import random
+import re
 import time
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import aiohttp
+import bs4
+import pandas as pd
 
-service = Service(ChromeDriverManager().install())
-driver = webdriver.Chrome(service=service)
+BASE_URL = "https://www.livecareer.com"
+SEARCH_PATH = "/resume-search/search?jt={job}&bg=85&eg=100&comp=&mod=&pg={page}"
 
 job_list = ['HR', 'designer', 'Information-Technology',
             'Teacher', 'Advocate', 'Business-Development',
@@ -18,52 +33,268 @@ job_list = ['HR', 'designer', 'Information-Technology',
             'Apparel', 'Engineering', 'Accountant', 'Construction',
             'Public-Relations', 'Banking', 'Arts', 'Aviation']
 
-category = []
-link = []
-
-for job in job_list:
-    JOB = job.lower()
-    for i in range(1, 13):  # Pages 1 to 12
-        PAGE = str(i)
-        URL = f"https://www.livecareer.com/resume-search/search?jt={JOB}&bg=85&eg=100&comp=&mod=&pg={PAGE}"
-        driver.get(URL)
-        time.sleep(1)  # Let page load
-        aTagsInLi = driver.find_elements(By.CSS_SELECTOR, 'li a')
-        for a in aTagsInLi:
-            if a.get_attribute('rel') == "ugc":
-                category.append(JOB)
-                link.append(a.get_attribute('href'))
-
-df = pd.DataFrame()
-df["Category"] = category
-df["link"] = link
+COLUMNS = ["Category", "link", "id", "Resume", "Raw_html"]
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 
 def generate_id(x):
     return int(hashlib.md5(x.encode('utf-8')).hexdigest(), 16)
 
-df["id"] = df["link"].apply(generate_id)
 
-df["Resume"] = ""
-df["Raw_html"] = ""
+class HostLimiter:
+    """Bound concurrent requests per host and space their start times by `delay` seconds"""
+
+    def __init__(self, concurrency: int, delay: float):
+        self.concurrency = concurrency
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._next_start: Dict[str, float] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, host: str):
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.concurrency))
+        await semaphore.acquire()
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def release(self, host: str):
+        self._semaphores[host].release()
+
 
-for i in range(df.shape[0]):
-    url = df.link[i]
-    driver.get(url)
-    time.sleep(1)  # Let page load
-    page_source = driver.page_source.replace(">", "> ")
-    soup = bs4.BeautifulSoup(page_source, 'html.parser')
+async def fetch(session: aiohttp.ClientSession, limiter: HostLimiter, url: str, retries: int = 3) -> Optional[str]:
+    """GET a page; retries throttling, server errors and connection failures with backoff"""
+    host = urlsplit(url).netloc
+    for attempt in range(retries + 1):
+        await limiter.acquire(host)
+        try:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return await response.text(errors="replace")
+                if response.status not in RETRY_STATUSES:
+                    print(f"Skipping {url}: HTTP {response.status}")
+                    return None
+                retry_after = response.headers.get("Retry-After", "")
+                wait = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error fetching {url}: {e}")
+            wait = 2 ** attempt
+        finally:
+            limiter.release(host)
+        if attempt < retries:
+            await asyncio.sleep(wait + random.random())
+    print(f"Giving up on {url}")
+    return None
+
+
+def parse_search_links(html: str, base_url: str) -> List[str]:
+    """Resume links on a search results page (`li a[rel=ugc]`)"""
+    strainer = bs4.SoupStrainer("a", rel="ugc")
+    soup = bs4.BeautifulSoup(html, "html.parser", parse_only=strainer)
+    links = [urljoin(base_url, a["href"]) for a in soup.find_all("a", href=True)]
+    return list(dict.fromkeys(links))
+
+
+_DOCUMENT_START = re.compile(r"<div\b[^>]*\bid\s*=\s*[\"']?document\b[^>]*>", re.IGNORECASE)
+_DIV_TAG = re.compile(r"<(/?)div\b", re.IGNORECASE)
+
+
+def _document_slice(html: str) -> Optional[str]:
+    """Cut `div#document` out of the page by counting div tags, without parsing the rest"""
+    start = _DOCUMENT_START.search(html)
+    if start is None:
+        return None
+    depth = 1
+    for tag in _DIV_TAG.finditer(html, start.end()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            return html[start.start():html.index(">", tag.end()) + 1]
+    return None
+
+
+def extract_document(html: str) -> Tuple[str, str]:
+    """Return (raw html, text) of `div#document`, or empty strings if the page has none"""
+    fragment = _document_slice(html)
+    if fragment is not None:
+        soup = bs4.BeautifulSoup(fragment.replace(">", "> "), "html.parser")
+    else:
+        # Irregular markup: let the parser find the div, building only that subtree
+        strainer = bs4.SoupStrainer("div", id="document")
+        soup = bs4.BeautifulSoup(html.replace(">", "> "), "html.parser", parse_only=strainer)
     div = soup.find("div", {"id": "document"})
-    df.at[i, "Raw_html"] = str(div) if div else ""
-    try:
-        df.at[i, "Resume"] = div.text if div else ""
-    except Exception:
-        pass
+    if div is None:
+        return "", ""
+    return str(div), div.text
+
+
+class Checkpoint:
+    """Append-only JSON lines record of finished search pages and written shards"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.searched: Dict[str, List[str]] = {}
+        self.done_links = set()
+        self.shards: List[str] = []
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut off by an interruption
+                    if event["type"] == "search":
+                        self.searched[event["key"]] = event["links"]
+                    elif event["type"] == "shard":
+                        self.shards.append(event["file"])
+                        self.done_links.update(event["links"])
+
+    def _append(self, event: Dict):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(event) + "\n")
+
+    def record_search(self, key: str, links: List[str]):
+        self.searched[key] = links
+        self._append({"type": "search", "key": key, "links": links})
+
+    def record_shard(self, file: str, links: List[str]):
+        self.shards.append(file)
+        self.done_links.update(links)
+        self._append({"type": "shard", "file": file, "links": links})
+
+
+class ShardWriter:
+    """Buffer scraped rows and write them out every `shard_size` rows"""
+
+    def __init__(self, directory: str, checkpoint: Checkpoint, shard_size: int, fmt: str):
+        self.directory = directory
+        self.checkpoint = checkpoint
+        self.shard_size = shard_size
+        self.fmt = fmt
+        self.rows: List[Dict] = []
+        os.makedirs(directory, exist_ok=True)
+
+    def add(self, row: Dict):
+        self.rows.append(row)
+        if len(self.rows) >= self.shard_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        name = f"part-{len(self.checkpoint.shards):05d}.{self.fmt}"
+        path = os.path.join(self.directory, name)
+        df = pd.DataFrame(self.rows, columns=COLUMNS)
+        # ids are 128-bit; keep them as strings in shards
+        df["id"] = df["id"].astype(str)
+        tmp = path + ".tmp"
+        if self.fmt == "parquet":
+            df.to_parquet(tmp, index=False)
+        else:
+            df.to_csv(tmp, index=False)
+        os.replace(tmp, path)
+        self.checkpoint.record_shard(name, [row["link"] for row in self.rows])
+        self.rows = []
+
+
+def read_shards(directory: str, shards: List[str]) -> pd.DataFrame:
+    frames = []
+    for name in shards:
+        path = os.path.join(directory, name)
+        frames.append(pd.read_parquet(path) if name.endswith(".parquet") else pd.read_csv(path, dtype={"id": str}))
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+async def scrape(jobs: List[str], pages: int, output_dir: str = "resumes", base_url: str = BASE_URL,
+                 concurrency: int = 8, delay: float = 0.25, shard_size: int = 500, fmt: str = "parquet",
+                 timeout: float = 30, limit: Optional[int] = None) -> str:
+    """Scrape every job category and write `output_dir`/Resume.csv; returns its path.
+
+    `limit` stops after that many new resumes, which is mostly useful for
+    testing interrupted runs.
+    """
+    shard_dir = os.path.join(output_dir, "shards")
+    os.makedirs(shard_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(output_dir, "checkpoint.jsonl"))
+    writer = ShardWriter(shard_dir, checkpoint, shard_size, fmt)
+    limiter = HostLimiter(concurrency, delay)
+    connector = aiohttp.TCPConnector(limit_per_host=concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout),
+                                     headers={"User-Agent": "Mozilla/5.0 (resume-corpus-refresh)"}) as session:
+
+        async def search(job: str, page: int):
+            key = f"{job.lower()}:{page}"
+            if key in checkpoint.searched:
+                return
+            html = await fetch(session, limiter, base_url + SEARCH_PATH.format(job=job.lower(), page=page))
+            if html is not None:
+                checkpoint.record_search(key, parse_search_links(html, base_url))
+
+        await asyncio.gather(*(search(job, page) for job in jobs for page in range(1, pages + 1)))
+
+        todo = []
+        seen = set(checkpoint.done_links)
+        for job in jobs:
+            for page in range(1, pages + 1):
+                for url in checkpoint.searched.get(f"{job.lower()}:{page}", []):
+                    if url not in seen:
+                        seen.add(url)
+                        todo.append((job.lower(), url))
+        if limit is not None:
+            todo = todo[:limit]
+        print(f"{len(checkpoint.done_links)} resumes already scraped, {len(todo)} to go")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in todo:
+            queue.put_nowait(item)
+
+        async def worker():
+            while True:
+                try:
+                    category, url = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                html = await fetch(session, limiter, url)
+                if html is None:
+                    continue
+                raw_html, text = extract_document(html)
+                writer.add({"Category": category, "link": url, "id": generate_id(url),
+                            "Resume": text, "Raw_html": raw_html})
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        writer.flush()
+
+    df = read_shards(shard_dir, checkpoint.shards)
+    path = os.path.join(output_dir, "Resume.csv")
+    df.to_csv(path, index=False)
+    return path
+
 
-driver.quit()
+def main():
+    parser = argparse.ArgumentParser(description="Scrape LiveCareer resumes into resumes/Resume.csv")
+    parser.add_argument("--jobs", default=",".join(job_list), help="comma-separated job categories")
+    parser.add_argument("--pages", type=int, default=12, help="search result pages per category")
+    parser.add_argument("--output-dir", default="resumes")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent requests per host")
+    parser.add_argument("--delay", type=float, default=0.25, help="seconds between request starts per host")
+    parser.add_argument("--shard-size", type=int, default=500, help="rows per output shard")
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet", help="shard format")
+    parser.add_argument("--limit", type=int, help="stop after this many new resumes")
+    args = parser.parse_args()
 
-if not os.path.exists("resumes"):
-    os.makedirs("resumes")
+    path = asyncio.run(scrape(
+        [job for job in args.jobs.split(",") if job], args.pages, args.output_dir, args.base_url.rstrip("/"),
+        args.concurrency, args.delay, args.shard_size, args.format, limit=args.limit,
+    ))
+    print(f"Scraping complete! Resumes saved to '{path}'")
 
-df.to_csv("resumes/Resume.csv", index=False)
 
-print("Scraping complete! Resumes saved to 'resumes/Resume.csv'")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import pytest
+
+import backend.main as main
+from backend.benchmarks.fakes import FakeServices
+
+
+@pytest.fixture
+def app_db(tmp_path, monkeypatch):
+    """backend.main on a fresh SQLite database, with its lazy clients and in-process state reset"""
+    monkeypatch.setattr(main, "DATABASE_URL", "sqlite:///" + str(tmp_path / "app.db"))
+    monkeypatch.setattr(main, "CORPUS_INGEST", False)
+    # Clients are created on first use, so each test builds its own from its own environment
+    monkeypatch.setattr(main, "_clients", {})
+    monkeypatch.setattr(main, "_client_errors", {})
+    monkeypatch.setattr(main, "stage_metrics", main.StageMetrics())
+    monkeypatch.setattr(main, "username_repository", main.UsernameRepository())
+    monkeypatch.setattr(main, "smtp_pool", main.SMTPConnectionPool())
+    monkeypatch.setattr(main, "invitation_dispatcher", main.InvitationDispatcher())
+    monkeypatch.setattr(main, "batch_evaluation_poller", main.BatchEvaluationPoller())
+    monkeypatch.setattr(main, "candidate_index", main.CandidateIndex())
+    monkeypatch.setattr(main, "jd_embedding_cache", main.TTLCache(256, 600))
+    yield main
+
+    main.invitation_dispatcher.stop()
+    main.batch_evaluation_poller.stop()
+    main.smtp_pool.close()
+    clients = main._clients
+    if "firestore" in clients:
+        clients["firestore"].close()
+    if "firebase" in clients:
+        import firebase_admin
+
+        # The default app is process-wide; the next test initializes its own
+        firebase_admin.delete_app(clients["firebase"])
+    if "database" in clients:
+        clients["database"].dispose()
+
+
+@pytest.fixture
+def services(app_db, monkeypatch):
+    """FakeServices with the app pointed at them through the environment and SMTP settings"""
+    fakes = FakeServices(embedding_dim=64).start()
+    for name, value in fakes.env().items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(main, "SMTP_SERVER", fakes.smtp.host)
+    monkeypatch.setattr(main, "SMTP_PORT", fakes.smtp.port)
+    monkeypatch.setattr(main, "EMAIL_ADDRESS", "hiring@example.com")
+    monkeypatch.setattr(main, "EMAIL_PASSWORD", "local-fake")
+    yield fakes
+    fakes.stop()
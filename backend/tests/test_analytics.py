@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+
+def test_aggregates_follow_inserts_and_rescoring(app_db):
+    main = app_db
+
+    def report(score, status, matching, missing, **signals):
+        return main.ResumeReport(filename="r.pdf", score_out_of_100=score, status=status,
+                                 matching_skills=matching, missing_skills=missing, **signals)
+
+    session = main.get_session()
+    session.add_all([
+        report(95, "Excellent Match", ["python", "sql"], ["docker"]),
+        report(100, "Excellent Match", ["python"], ["docker", "kubernetes"]),
+        report(42, "Needs Improvement", ["sql"], ["docker"],
+               skill_match_score=20, experience_score=20, relevance_score=20, resume_markers=0),
+    ])
+    session.commit()
+    session.close()
+
+    client = TestClient(main.app)
+    before = client.get("/analytics/").json()
+    histogram = {b["range"]: b["count"] for b in before["score_histogram"]}
+    assert histogram["90-100"] == 2 and histogram["40-49"] == 1 and sum(histogram.values()) == 3
+    assert before["status_totals"] == {"Excellent Match": 2, "Needs Improvement": 1}
+    assert before["top_missing_skills"] == [{"skill": "docker", "count": 3}, {"skill": "kubernetes", "count": 1}]
+    assert before["top_matching_skills"][0] == {"skill": "python", "count": 2}
+
+    main.rescore_reports()  # 20*.4 + 20*.25 + 20*.35 = 20 * .92 -> 18, "Poor Match"
+    after = client.get("/analytics/", params={"top_skills": 1}).json()
+    histogram = {b["range"]: b["count"] for b in after["score_histogram"]}
+    assert histogram["40-49"] == 0 and histogram["10-19"] == 1
+    assert after["status_totals"] == {"Excellent Match": 2, "Poor Match": 1}
+    assert after["top_missing_skills"] == [{"skill": "docker", "count": 3}]
+
+    # The backfill used by the migration recounts the same numbers from scratch
+    with main.get_engine().begin() as connection:
+        main.rebuild_report_aggregates(connection)
+    assert client.get("/analytics/", params={"top_skills": 1}).json() == after
@@ -0,0 +1,87 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.load_test import make_resume_pdf
+from backend.main import ArchiveError, iter_archive_pdfs
+
+
+def make_zip(members, compression=zipfile.ZIP_DEFLATED):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression) as archive:
+        for name, data in members:
+            archive.writestr(name, data)
+    buffer.seek(0)
+    return buffer
+
+
+def make_tar(members, mode="w:gz"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, data in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+
+MEMBERS = [("a.pdf", b"%PDF-a"), ("notes.txt", b"hi"), ("__MACOSX/._a.pdf", b"x"), ("sub/B.PDF", b"%PDF-b")]
+
+
+@pytest.mark.parametrize("archive", [make_zip(MEMBERS), make_tar(MEMBERS), make_tar(MEMBERS, "w")])
+def test_pdfs_are_streamed_from_zip_and_tar(archive):
+    skipped = []
+    assert list(iter_archive_pdfs(archive, skipped)) == [("a.pdf", b"%PDF-a"), ("sub/B.PDF", b"%PDF-b")]
+    assert skipped == [{"filename": "notes.txt", "reason": "Not a PDF"}]
+
+
+def test_limits_stop_reading():
+    members = [(f"{i}.pdf", b"%PDF") for i in range(5)]
+    read = []
+    with pytest.raises(ArchiveError, match="more than 3 members"):
+        for name, _ in iter_archive_pdfs(make_zip(members), [], max_members=3):
+            read.append(name)
+    assert read == ["0.pdf", "1.pdf", "2.pdf"]
+
+    with pytest.raises(ArchiveError, match="expands to more than"):
+        list(iter_archive_pdfs(make_zip(members, zipfile.ZIP_STORED), [], max_total_bytes=10))
+
+    bomb = [("bomb.pdf", b"\0" * 5_000_000)]
+    with pytest.raises(ArchiveError, match="compressed more than"):
+        list(iter_archive_pdfs(make_zip(bomb), [], max_ratio=100))
+    with pytest.raises(ArchiveError, match="compressed more than"):
+        list(iter_archive_pdfs(make_tar(bomb), [], max_ratio=100))
+    with pytest.raises(ArchiveError, match="larger than"):
+        list(iter_archive_pdfs(make_zip(bomb), [], max_member_bytes=1_000_000))
+
+    with pytest.raises(ArchiveError, match="Not a ZIP or TAR"):
+        list(iter_archive_pdfs(io.BytesIO(b"plain text"), []))
+
+
+def test_archive_endpoint_evaluates_members_until_a_limit(app_db, services, monkeypatch):
+    main = app_db
+    monkeypatch.setattr(main, "ARCHIVE_MAX_MEMBERS", 4)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(3):
+            archive.writestr(f"resumes/{i}.pdf", make_resume_pdf(f"Candidate {i} python developer c{i}@example.com"))
+        archive.writestr("resumes/readme.txt", "ignore me")
+        archive.writestr("resumes/extra.pdf", b"%PDF")
+
+    response = TestClient(main.app).post(
+        "/evaluate-resume-archive/", data={"job_description": "Python developer"},
+        files={"archive": ("batch.zip", buffer.getvalue(), "application/zip")},
+    ).json()
+    assert [r["filename"] for r in response["reports"]] == [f"resumes/{i}.pdf" for i in range(3)]
+    assert all("error" not in r for r in response["reports"])
+    assert response["skipped"] == [{"filename": "resumes/readme.txt", "reason": "Not a PDF"}]
+    # The fifth member crosses ARCHIVE_MAX_MEMBERS; what was read before it is still evaluated
+    assert response["archive_error"] == "Archive has more than 4 members"
+
+    session = main.get_session()
+    assert sorted(r.filename for r in session.query(main.ResumeReport)) == [f"resumes/{i}.pdf" for i in range(3)]
+    session.close()
@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.load_test import make_resume_pdf
+
+
+def test_batch_evaluation_matches_the_synchronous_pipeline(app_db, services, monkeypatch):
+    main = app_db
+    monkeypatch.setattr(main, "SUITABILITY_THRESHOLD", 101)
+    jd = "Senior Python developer with FastAPI and PostgreSQL, 5 years of experience"
+    texts = [f"Alex Morgan alex{i}@example.com Senior Python developer, {i + 3} years of experience with FastAPI"
+             for i in range(3)]
+    files = [("resume_pdfs", (f"r{i}.pdf", make_resume_pdf(text), "application/pdf")) for i, text in enumerate(texts)]
+    client = TestClient(main.app)
+
+    sync = client.post("/evaluate-resumes/", data={"job_description": jd}, files=files).json()
+    sync = [[r["candidate_name"], r["score_out_of_100"], r["skills_present"], r["suggested_job_role"]]
+            for r in sync["reports"]]
+    before = services.stats()["openai"]
+
+    # The skills of r1 never come back from the batch
+    services.openai.batch_failures = ("2:skills",)
+    created = client.post("/batch-evaluations/", data={"job_description": jd}, files=files).json()
+    assert created["resumes"] == 3 and created["status"] == "extracting"
+
+    # The background poller is still in its first (default) interval
+    monkeypatch.setattr(main, "BATCH_POLL_SECONDS", 0)
+    # Round one finishes on the first poll and submits the skill match round
+    assert main.poll_batch_evaluations() == {created["id"]: "matching"}
+    assert client.get(f"/batch-evaluations/{created['id']}").json()["status"] == "matching"
+    main.poll_batch_evaluations()
+    done = client.get(f"/batch-evaluations/{created['id']}").json()
+    assert done["status"] == "completed" and len(done["report_ids"]) == 3
+
+    session = main.get_session()
+    reports = {r.id: r for r in session.query(main.ResumeReport).filter(main.ResumeReport.id.in_(done["report_ids"]))}
+    batch = [[reports[i].candidate_name, reports[i].score_out_of_100, reports[i].skills_present,
+              reports[i].suggested_job_role, reports[i].resume_summary, reports[i].resume_embedding is not None]
+             for i in done["report_ids"]]
+    session.close()
+
+    # Same prompts and scoring as the synchronous path
+    assert [row[:4] for row in batch[::2]] == [sync[0], sync[2]]
+    assert all(row[4] and row[5] for row in batch)
+    # The failed request falls back like a failed synchronous call
+    assert batch[1][2] == []
+    assert main.stage_metrics.render().count('fallbacks_total{stage="extract_skills"') == 1
+
+    # Only the JD went through the synchronous API
+    after = services.stats()["openai"]
+    assert after.get("chat", 0) - before.get("chat", 0) == 1
+    assert after.get("embeddings", 0) - before.get("embeddings", 0) == 1
+    assert after.get("batches", 0) == 3 and after.get("batch_requests", 0) == 3 * 4 - 1 + 3 + 3
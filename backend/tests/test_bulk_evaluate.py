@@ -0,0 +1,55 @@
+import json
+import os
+
+import pandas as pd
+
+from backend import bulk_evaluate
+from backend.benchmarks.load_test import make_resume_pdf
+
+
+def test_bulk_cli_evaluates_a_directory_and_resumes(app_db, services, monkeypatch, tmp_path):
+    main = app_db
+    monkeypatch.setattr(main, "SUITABILITY_THRESHOLD", 101)
+    resumes = tmp_path / "resumes"
+    (resumes / "nested").mkdir(parents=True)
+    for i, folder in enumerate(["", "", "nested"]):
+        (resumes / folder / f"r{i}.pdf").write_bytes(
+            make_resume_pdf(f"Alex Morgan alex{i}@example.com Senior Python developer, {i + 3} years")
+        )
+    (resumes / "broken.pdf").write_bytes(b"not a pdf")
+    (resumes / "notes.txt").write_text("ignored")
+
+    output = str(tmp_path / "results.parquet")
+    args = ["--job-description", "Senior Python developer with FastAPI", "--input", str(resumes), "--output", output,
+            "--workers", "2", "--concurrency", "2", "--flush-every", "1", "--db"]
+    first = bulk_evaluate.main(args)
+    assert first["inputs"] == 4 and first["evaluated"] == 3 and first["failed"] == 1
+    chat_calls = services.stats()["openai"]["chat"]
+
+    # The rerun evaluates only the new resume and retries the failed one
+    (resumes / "r3.pdf").write_bytes(make_resume_pdf("Sam Lee sam@example.com Python developer, 2 years"))
+    second = bulk_evaluate.main(args)
+    assert second["already_done"] == 3 and second["evaluated"] == 1 and second["failed"] == 1
+    assert services.stats()["openai"]["chat"] - chat_calls == 1 + 5  # JD skills, then the new resume's five prompts
+
+    rows = pd.read_parquet(output)
+    assert sorted(os.path.relpath(p, resumes) for p in rows["path"]) == [
+        "broken.pdf", "nested/r2.pdf", "r0.pdf", "r1.pdf", "r3.pdf",
+    ]
+    assert rows["error"].notna().sum() == 1
+    assert set(rows["candidate_name"].dropna()) == {"Alex Morgan"}
+    assert "Python" in json.loads(rows["skills_present"].dropna().iloc[0])
+    assert sorted(rows["report_id"].dropna().astype(int)) == [1, 2, 3, 4]
+    session = main.get_session()
+    assert session.query(main.ResumeReport).count() == 4
+    session.close()
+
+    manifest = tmp_path / "manifest.csv"
+    pd.DataFrame({"path": ["resumes/r0.pdf", "resumes/nested/r2.pdf"]}).to_csv(manifest, index=False)
+    csv_output = str(tmp_path / "results.csv")
+    third = bulk_evaluate.main(["--job-description", "Python developer", "--input", str(manifest),
+                                "--output", csv_output, "--workers", "1"])
+    assert third["evaluated"] == 2
+    assert sorted(os.path.relpath(p, tmp_path) for p in pd.read_csv(csv_output)["path"]) == [
+        "resumes/nested/r2.pdf", "resumes/r0.pdf",
+    ]
@@ -0,0 +1,50 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+
+def test_rank_candidates_pages_through_the_stored_pool(app_db, services):
+    main = app_db
+    jd = "Senior Python developer with FastAPI"
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((3000, 64)).astype(np.float32)
+    vectors[1234] = services.openai.embed(jd)
+
+    def store(rows):
+        session = main.get_session()
+        session.add_all([
+            main.ResumeReport(filename=f"{i}.pdf", candidate_name=f"c{i}", score_out_of_100=50,
+                              resume_embedding=main.embedding_to_bytes(v))
+            for i, v in rows
+        ])
+        session.add(main.ResumeReport(filename="legacy.pdf", score_out_of_100=50))  # Never embedded
+        session.commit()
+        session.close()
+
+    store(enumerate(vectors[:2000]))
+    client = TestClient(main.app)
+    first = client.post("/rank-candidates/", data={"job_description": jd, "page_size": 5}).json()
+    second = client.post("/rank-candidates/", data={"job_description": jd, "page": 2, "page_size": 5}).json()
+
+    assert first["total_candidates"] == 2000
+    assert first["results"][0]["candidate_name"] == "c1234"
+    assert first["results"][0]["similarity"] > 0.99
+    results = first["results"] + second["results"]
+    assert len({r["id"] for r in results}) == 10
+    similarities = [r["similarity"] for r in results]
+    assert similarities == sorted(similarities, reverse=True)
+    # Paging reuses the JD embedding
+    assert services.stats()["openai"].get("embeddings", 0) == 1
+
+    # Only the new reports are read on refresh
+    store((i, vectors[i]) for i in range(2000, 3000))
+    session = main.get_session()
+    assert main.candidate_index.refresh(session) == 1000
+    assert main.candidate_index.refresh(session) == 0
+    session.close()
+    assert len(main.candidate_index) == 3000
+
+    query = np.asarray(services.openai.embed(jd), dtype=np.float32)
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    # Report ids: the legacy row after each batch shifts the second batch by one
+    expected = [int(i) + (1 if i < 2000 else 2) for i in np.argsort(-(normalized @ query))[:5]]
+    assert [i for i, _ in main.candidate_index.rank(query, 0, 5)] == expected
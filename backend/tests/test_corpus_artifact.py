@@ -0,0 +1,161 @@
+import os
+import pickle
+
+import numpy as np
+
+import backend.main as main
+from backend.main import (
+    CorpusIngestor, SegmentedCorpus, corpus_artifact_is_current, ensure_corpus_artifact, open_corpus_artifact,
+)
+
+
+def write_pickle(path, embeddings, texts, categories=None):
+    categories = categories or ["TEST"] * len(texts)
+    metadata = [{"ID": i, "Category": c, "clean_resume": t} for i, (t, c) in enumerate(zip(texts, categories))]
+    with open(path, "wb") as f:
+        pickle.dump({"embeddings": np.asarray(embeddings, dtype=np.float32), "metadata": metadata}, f)
+
+
+def test_artifact_round_trip_and_rebuild_on_change(tmp_path):
+    pickle_path = str(tmp_path / "resume_embeddings.pkl")
+    artifact_dir = str(tmp_path / "resume_embeddings.corpus")
+    write_pickle(pickle_path, [[3.0, 4.0], [0.0, 2.0], [1.0, 0.0]], ["python dev", "", "data café"])
+
+    ensure_corpus_artifact(pickle_path, artifact_dir)
+    embeddings, texts = open_corpus_artifact(artifact_dir)
+    assert isinstance(embeddings, np.memmap)
+    np.testing.assert_allclose(embeddings[0], [0.6, 0.8], rtol=1e-6)
+    assert list(texts) == ["python dev", "", "data café"]
+    assert texts[-1] == "data café"
+
+    write_pickle(pickle_path, [[1.0, 1.0]], ["replaced"])
+    os.utime(pickle_path, (1, 1))
+    assert not corpus_artifact_is_current(pickle_path, artifact_dir)
+    ensure_corpus_artifact(pickle_path, artifact_dir)
+    assert list(open_corpus_artifact(artifact_dir)[1]) == ["replaced"]
+    # The previous artifact was swapped out and removed; mappings of it stay readable until dropped
+    assert list(texts) == ["python dev", "", "data café"]
+    assert sorted(os.listdir(tmp_path)) == ["resume_embeddings.corpus", "resume_embeddings.corpus.lock",
+                                            "resume_embeddings.pkl"]
+
+
+def test_search_matches_cosine_ranking(tmp_path):
+    rng = np.random.default_rng(0)
+    raw = rng.normal(size=(50, 8)).astype(np.float32)
+    pickle_path = str(tmp_path / "resume_embeddings.pkl")
+    write_pickle(pickle_path, raw, [f"resume {i}" for i in range(50)])
+    corpus = SegmentedCorpus(str(tmp_path / "segments"))
+    corpus.set_base(ensure_corpus_artifact(pickle_path, str(tmp_path / "resume_embeddings.corpus")))
+
+    query = rng.normal(size=8)
+    expected = np.argsort([-main.cosine_similarity(query, row) for row in raw])[:5]
+    assert corpus.search(query, top_k=5) == [f"resume {i}" for i in expected]
+
+
+def test_ingested_segments_are_searchable_and_compacted(tmp_path):
+    rng = np.random.default_rng(1)
+    segments_dir = str(tmp_path / "segments")
+    writer = SegmentedCorpus(segments_dir)
+    ingestor = CorpusIngestor(writer)
+    vectors = rng.normal(size=(6, 8)).astype(np.float32)
+    for i, vector in enumerate(vectors):
+        ingestor.add(f"new resume {i}", vector)
+        ingestor.add(f"new resume {i}", vector)  # Re-evaluations are ingested once
+        ingestor.flush()
+    ingestor.add("new resume 0", vectors[0])
+    assert ingestor.flush() is None
+
+    # Another worker sees the segments after a refresh
+    reader = SegmentedCorpus(segments_dir)
+    reader.refresh()
+    assert len(reader.segments) == 6 and len(reader) == 6
+    assert reader.search(vectors[3], top_k=1) == ["new resume 3"]
+
+    merged = writer.compact(min_segments=4)
+    assert merged is not None
+    reader.refresh()
+    assert [s.name for s in reader.segments] == [merged]
+    assert sorted(reader.segments[0].texts) == [f"new resume {i}" for i in range(6)]
+    assert reader.search(vectors[5], top_k=1) == ["new resume 5"]
+    assert sorted(os.listdir(segments_dir)) == [".compact.lock", merged]
+
+
+def test_category_partitions_restrict_the_scan(tmp_path):
+    rng = np.random.default_rng(2)
+    names = ["HR", "FINANCE", "ENGINEERING"]
+    centers = rng.normal(size=(3, 16)) * 4
+    labels = rng.integers(3, size=90)
+    raw = (centers[labels] + rng.normal(size=(90, 16))).astype(np.float32)
+    pickle_path = str(tmp_path / "resume_embeddings.pkl")
+    write_pickle(pickle_path, raw, [f"resume {i}" for i in range(90)], [names[c] for c in labels])
+    corpus = SegmentedCorpus(str(tmp_path / "segments"))
+    corpus.set_base(ensure_corpus_artifact(pickle_path, str(tmp_path / "resume_embeddings.corpus")))
+
+    assert corpus.categories() == sorted(names)
+    start, end = corpus.base.partitions["FINANCE"]
+    assert end - start == int((labels == 1).sum())
+    assert corpus.predict_categories(centers[1], 1) == ["FINANCE"]
+
+    # A filtered search only returns (and only scores) rows of that category
+    query = rng.normal(size=16)
+    finance = {f"resume {i}" for i in np.flatnonzero(labels == 1)}
+    expected = sorted(np.flatnonzero(labels == 1), key=lambda i: -main.cosine_similarity(query, raw[i]))[:4]
+    assert corpus.search(query, top_k=4, categories=["FINANCE"]) == [f"resume {i}" for i in expected]
+    by_category = corpus.search_by_category(query, top_k=2)
+    assert sorted(by_category) == sorted(names)
+    assert {r["text"] for r in by_category["FINANCE"]} <= finance
+
+    # Ingested resumes join their closest partition and stay searchable by it
+    ingestor = CorpusIngestor(corpus)
+    ingestor.add("new finance resume", centers[1])
+    ingestor.flush()
+    assert corpus.segments[0].partitions == {"FINANCE": (0, 1)}
+    assert corpus.search(centers[1], top_k=1, categories=["FINANCE"]) == ["new finance resume"]
+    assert "new finance resume" not in corpus.search(centers[1], top_k=5, categories=["HR"])
+
+
+def test_compact_hits_resolve_to_full_text(tmp_path):
+    rng = np.random.default_rng(3)
+    raw = rng.normal(size=(20, 8)).astype(np.float32)
+    texts = [f"resume {i} " + "long experience text " * 100 for i in range(20)]
+    pickle_path = str(tmp_path / "resume_embeddings.pkl")
+    write_pickle(pickle_path, raw, texts)
+    corpus = SegmentedCorpus(str(tmp_path / "segments"))
+    corpus.set_base(ensure_corpus_artifact(pickle_path, str(tmp_path / "resume_embeddings.corpus")))
+    ingestor = CorpusIngestor(corpus)
+    ingestor.add("fresh resume", raw[0] + 0.01)
+    ingestor.add(texts[5], raw[5])  # Already in the base corpus
+    ingestor.flush()
+    assert len(corpus.segments) == 1 and list(corpus.segments[0].texts) == ["fresh resume"]
+    ingestor.add(texts[6], raw[6])
+    assert ingestor.flush() is None
+
+    hits = corpus.hits(raw[0], top_k=3)
+    assert len(hits) == 3 and all(len(h["snippet"]) <= main.CORPUS_SNIPPET_CHARS for h in hits)
+    assert hits[0]["snippet"].startswith("resume 0 long experience") and hits[0]["category"] == "TEST"
+    assert "fresh resume" in [h["snippet"] for h in hits]
+    for hit, text in zip(hits, corpus.search(raw[0], top_k=3)):
+        segment, row = corpus.lookup(hit["id"])
+        assert segment.texts[row] == text
+    assert corpus.lookup("missing") is None
+
+    # Base ids are found in the mapped, sorted digests rather than by hashing every text
+    assert isinstance(corpus.base.hashes, np.memmap)
+    for row in (0, 7, 19):
+        assert corpus.lookup(main.text_hash(texts[row])) == (corpus.base, row)
+    assert corpus.lookup(main.text_hash("fresh resume")) == (corpus.segments[0], 0)
+    assert corpus.lookup(main.text_hash("never ingested")) is None
+
+
+def test_shutdown_flushes_buffered_resumes(tmp_path, monkeypatch):
+    corpus = SegmentedCorpus(str(tmp_path / "segments"))
+    ingestor = CorpusIngestor(corpus, flush_seconds=3600)
+    monkeypatch.setattr(main, "corpus_ingestor", ingestor)
+    ingestor.start()
+    ingestor.add("evaluated just before shutdown", np.ones(8, dtype=np.float32))
+
+    main.flush_corpus_ingestor()
+    assert ingestor._thread is None
+    reader = SegmentedCorpus(str(tmp_path / "segments"))
+    reader.refresh()
+    assert [list(s.texts) for s in reader.segments] == [["evaluated just before shutdown"]]
@@ -0,0 +1,21 @@
+from backend.benchmarks.corpus_recall import main
+
+
+def test_reduced_corpora_report_memory_and_recall(tmp_path):
+    report = main([
+        "--synthetic", "2000", "--dim", "256", "--queries", "20", "--k", "5", "--rerank-depth", "50",
+        "--configs", "float32,float16,int8,int8@64", "--output", str(tmp_path / "recall.json"),
+    ])
+    results = {r["config"]: r for r in report["results"]}
+
+    assert results["float32"]["recall@5_scan"] == 1.0
+    assert "recall@5_rerank" not in results["float32"]
+    assert results["float16"]["compression"] == 2.0
+    assert results["int8"]["compression"] > 3.9
+    assert results["int8@64"]["compression"] > 15
+    assert results["int8@64"]["dimensions"] == 64
+    # Exact re-ranking recovers what the reduced scan loses
+    for spec in ("float16", "int8", "int8@64"):
+        assert results[spec]["recall@5_rerank"] >= 0.95
+    assert results["int8@64"]["recall@5_scan"] < results["int8@64"]["recall@5_rerank"]
+    assert (tmp_path / "recall.json").exists()
@@ -0,0 +1,76 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import backend.main as main
+from backend.main import EmbeddingBatcher
+
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    """Record each embeddings call; an input of "bad" fails the call it is in"""
+    calls = []
+
+    def create_embeddings(inputs, model="text-embedding-3-large", stage="embedding", dimensions=None):
+        calls.append(list(inputs))
+        time.sleep(0.02)
+        if "bad" in inputs:
+            raise ValueError("invalid input")
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(text))])
+                                     for i, text in enumerate(inputs)])
+
+    monkeypatch.setattr(main, "create_embeddings", create_embeddings)
+    return calls
+
+
+def embed_concurrently(batcher, texts):
+    results = {}
+
+    def worker(text):
+        try:
+            results[text] = batcher.embed(text)
+        except Exception as e:
+            results[text] = e
+
+    threads = [threading.Thread(target=worker, args=(text,)) for text in texts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_requests_share_calls(api_calls):
+    batcher = EmbeddingBatcher(max_size=8, wait_seconds=0.02)
+    texts = [f"resume {i}" * (i + 1) for i in range(30)] + ["resume 0"]
+    results = embed_concurrently(batcher, texts)
+
+    assert all(results[text] == [float(len(text))] for text in texts)
+    assert len(api_calls) < 10 and max(len(inputs) for inputs in api_calls) <= 8
+    # Identical inputs in flight are sent once
+    assert sorted(text for inputs in api_calls for text in inputs) == sorted(set(texts))
+
+
+def test_token_bound_splits_batches(api_calls):
+    batcher = EmbeddingBatcher(max_size=64, max_tokens=30, wait_seconds=0.05)
+    results = embed_concurrently(batcher, ["x" * 40 + str(i) for i in range(6)])
+    assert len(results) == 6
+    assert all(sum(main.estimate_tokens(text) for text in inputs) <= 30 for inputs in api_calls if len(inputs) > 1)
+    assert len(api_calls) >= 3
+
+
+def test_a_bad_input_only_fails_its_caller(api_calls):
+    batcher = EmbeddingBatcher(max_size=16, wait_seconds=0.05)
+    results = embed_concurrently(batcher, ["good one", "bad", "good two"])
+    assert isinstance(results["bad"], ValueError)
+    assert results["good one"] == [8.0] and results["good two"] == [8.0]
+
+
+def test_get_embedding_goes_through_the_batcher(api_calls, monkeypatch):
+    monkeypatch.setattr(main, "embedding_batcher", EmbeddingBatcher(wait_seconds=0.01))
+    np.testing.assert_array_equal(main.get_embedding("a\nb"), [3.0])
+    assert api_calls == [["a b"]]
+    assert len(main.get_embedding("bad")) == 0
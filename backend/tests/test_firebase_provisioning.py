@@ -0,0 +1,79 @@
+def test_batched_provisioning_reuses_accounts_and_mappings(app_db, services):
+    main = app_db
+    old_uid, old_username = main.provision_firebase_users([
+        {"email": "old@example.com", "password": "pw-123456", "name": "Old", "username": "candidate_old"},
+    ])[0]
+    before = services.stats()["firestore"]
+
+    session = main.get_session()
+    report = main.ResumeReport(filename="a.pdf", candidate_email="new@example.com", interview_username="candidate_new")
+    session.add(report)
+    session.commit()
+    report_id = report.id
+    session.close()
+
+    pending = [
+        {"report_id": report_id, "email": "new@example.com", "password": "pw-123456", "name": "New",
+         "username": "candidate_new"},
+        {"report_id": None, "email": "NEW@example.com", "password": "pw-123456", "name": "New",
+         "username": "candidate_dup"},
+        {"report_id": None, "email": "old@example.com", "password": "pw-123456", "name": "Old",
+         "username": "candidate_old2"},
+        {"report_id": None, "email": "other@example.com", "password": "pw-123456", "name": "Other",
+         "username": "candidate_old"},
+    ]
+    new, duplicate, reused, other = main.provision_firebase_users(pending)
+    after = services.stats()["firestore"]
+    calls = {k: after.get(k, 0) - before.get(k, 0) for k in after}
+    main.provision_interview_accounts(pending[:1])
+
+    assert old_username == "candidate_old"
+    assert new[1] == "candidate_new" and duplicate == new
+    assert reused == (old_uid, "candidate_old")
+    # The taken username was replaced with a fresh one
+    assert other[1].startswith("candidate_") and other[1] != "candidate_old"
+    assert len(services.auth.users) == 3
+
+    # Batched username reads (the clash costs one retry), no queries and one batch write;
+    # the existing user's mapping is served from the cache
+    assert calls["BatchGetDocuments"] == 2
+    assert calls.get("RunQuery", 0) == 0
+    assert calls["Commit"] == 1
+
+    session = main.get_session()
+    saved = session.get(main.ResumeReport, report_id)
+    assert [saved.firebase_uid, saved.interview_username] == list(new)
+    session.close()
+
+
+def test_reverse_index_is_backfilled_and_cached(app_db, services):
+    main = app_db
+
+    def calls():
+        return dict(services.stats()["firestore"])
+
+    def delta(before):
+        after = calls()
+        return {k: after[k] - before.get(k, 0) for k in after if after[k] != before.get(k, 0)}
+
+    # A mapping written before the reverse index existed
+    main.get_firestore_client().collection("usernames").document("legacy_a").set(
+        {"uid": "uid-a", "email": "a@example.com"}
+    )
+
+    # Legacy mappings cost one query, then the reverse entry is written back
+    before = calls()
+    assert main.UsernameRepository().usernames_for_uids(["uid-a", "uid-b"]) == {"uid-a": "legacy_a"}
+    assert delta(before) == {"BatchGetDocuments": 1, "RunQuery": 1, "Commit": 1}
+
+    # A fresh cache needs only a point read
+    repository = main.UsernameRepository()
+    before = calls()
+    assert repository.usernames_for_uids(["uid-a"]) == {"uid-a": "legacy_a"}
+    assert delta(before) == {"BatchGetDocuments": 1}
+
+    # Cached mappings skip Firestore; unknown usernames are still checked
+    before = calls()
+    repository.usernames_for_uids(["uid-a"])
+    assert sorted(repository.taken_usernames(["legacy_a", "free_name"])) == ["legacy_a"]
+    assert delta(before) == {"BatchGetDocuments": 1}
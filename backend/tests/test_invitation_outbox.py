@@ -0,0 +1,47 @@
+import time
+
+from fastapi.testclient import TestClient
+
+
+def test_bulk_invitations_are_sent_over_pooled_connections(app_db, services, monkeypatch):
+    main = app_db
+    monkeypatch.setattr(main, "smtp_pool", main.SMTPConnectionPool(size=2))
+    monkeypatch.setattr(main, "OUTBOX_RETRY_SECONDS", 0)
+    monkeypatch.setattr(main, "OUTBOX_POLL_SECONDS", 0.05)
+    sink = services.smtp
+    sink.transient_failures = 2
+
+    session = main.get_session()
+    reports = [main.ResumeReport(filename=f"{i}.pdf", candidate_email=f"c{i}@example.com", score_out_of_100=90)
+               for i in range(8)]
+    reports.append(main.ResumeReport(filename="low.pdf", candidate_email="low@example.com", score_out_of_100=10))
+    reports.append(main.ResumeReport(filename="none.pdf", candidate_email=None, score_out_of_100=90))
+    session.add_all(reports)
+    session.commit()
+    ids = [r.id for r in reports]
+    session.close()
+
+    client = TestClient(main.app)
+    queued = client.post("/bulk-interview-invitations/", json={"candidate_ids": ids + [ids[0], 9999]}).json()
+    again = client.post("/bulk-interview-invitations/", json={"candidate_ids": ids[:1]}).json()
+    assert len(queued["queued"]) == 8
+    assert {s["id"] for s in queued["skipped"]} >= {9, 10, 9999}
+    assert again["skipped"][0]["reason"] == "Invitation already queued"
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        status = client.get("/bulk-interview-invitations/status").json()
+        if status["sent"] + status["failed"] >= len(queued["queued"]):
+            break
+        time.sleep(0.05)
+
+    # Transient 451s are retried, every eligible candidate gets exactly one email
+    assert status == {"pending": 0, "sending": 0, "sent": 8, "failed": 0}
+    assert sorted(sink.recipients()) == sorted(f"c{i}@example.com" for i in range(8))
+    session = main.get_session()
+    flags = [r.email_sent for r in session.query(main.ResumeReport).order_by(main.ResumeReport.id)]
+    assert flags == [True] * 8 + [False, False]
+    session.close()
+    assert sink.calls["transient_failures"] == 2
+    # Sessions are reused rather than opened per message
+    assert sink.calls["logins"] <= 2
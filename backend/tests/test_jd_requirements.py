@@ -0,0 +1,135 @@
+import random
+import re
+import sys
+
+import backend.main as main
+from backend.main import extract_experience_years, extract_jd_requirements
+
+
+# The regular expressions the token scanners replaced; the scanners must agree with them
+def legacy_extract_jd_requirements(jd_text):
+    requirements = {}
+    patterns = [
+        r"(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?(?:in\s+|with\s+|using\s+)([a-zA-Z\.\-\s]+)",
+        r"at\s+least\s+(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?(?:in\s+|with\s+|using\s+)([a-zA-Z\.\-\s]+)",
+        r"minimum\s+(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:of\s+)?(?:experience\s+)?(?:in\s+|with\s+|using\s+)([a-zA-Z\.\-\s]+)",
+        r"([a-zA-Z\.\-\s]+)[\s\-:]+(\d+)[\+\-\s]*(?:years?|yrs?)",
+    ]
+    for pattern in patterns:
+        for match in re.finditer(pattern, jd_text, re.IGNORECASE):
+            if pattern.startswith(r"([a-zA-Z"):
+                skill, years = match.group(1).strip(), int(match.group(2))
+            else:
+                years, skill = int(match.group(1)), match.group(2).strip()
+            if 0 < years <= 20 and len(skill) > 1:
+                skill_clean = re.sub(r'[^\w\s\.\-]', '', skill).strip()
+                if skill_clean:
+                    context = jd_text[max(0, match.start() - 50):match.end() + 20].lower()
+                    requirements[skill_clean.lower()] = {
+                        'years': years,
+                        'is_minimum': any(word in context for word in ['at least', 'minimum', 'min', '+']),
+                        'context': context.strip(),
+                    }
+    return requirements
+
+
+def legacy_extract_experience_years(text, skill):
+    text, skill = text.lower(), skill.lower()
+    for skill_group, years in re.findall(r'([\w\s\,\-]+?)\s+(\d+)[\+\-\s]*(?:years?|yrs?)', text):
+        if skill in skill_group.lower():
+            return int(years)
+    patterns = [
+        rf"(\d+)[\+\-\s]*(?:years?|yrs?)\s+(?:experience\s+in\s+|with\s+)?{re.escape(skill)}",
+        rf"{re.escape(skill)}[\s\-]*?(\d+)[\+\-\s]*(?:years?|yrs?)",
+    ]
+    years = [int(match) for pattern in patterns for match in re.findall(pattern, text)]
+    return max([y for y in years if 0 <= y <= 50], default=0)
+
+
+def legacy_stated_years(text):
+    return [int(y) for y in re.findall(r'(\d+)\s*(?:\+)?\s*(?:years?|yrs?)\s+(?:of\s+)?(?:experience)?', text)]
+
+
+WORDS = ["python", "Python", "java", "javascript", "c++", "node.js", ".net", "experience", "Experience",
+         "experienced", "years", "Years", "year", "yrs", "yr", "yearsold", "of", "in", "with", "using", "at",
+         "least", "that", "minimum", "Minimum", "min", "senior", "3", "5", "10", "25", "60", "2023", "0", "5+",
+         "3-5", "kubernetes", "aws", "spring", "rest", "_x", "é", "١٢"]
+SEPARATORS = [" ", " ", " ", "  ", "\n", ", ", ": ", " - ", "-", ".", "+", " (", ") ", "/", ":", ""]
+SKILLS = ["python", "java", "c++", "node.js", "kubernetes", "aws", "experience", "rest", "py", "5", "spring rest"]
+
+
+def random_text(rng, length):
+    return "".join(rng.choice(WORDS) + rng.choice(SEPARATORS) for _ in range(length))
+
+
+def test_matches_the_regular_expressions_it_replaced():
+    rng = random.Random(7)
+    for _ in range(3000):
+        text = random_text(rng, rng.randint(1, 25))
+        assert extract_jd_requirements(text) == legacy_extract_jd_requirements(text), text
+        lowered = text.lower()
+        assert list(main._stated_years(main._Tokens(lowered))) == legacy_stated_years(lowered), text
+        for skill in rng.sample(SKILLS, 3):
+            assert extract_experience_years(text, skill) == legacy_extract_experience_years(text, skill), (text, skill)
+
+
+def test_reads_common_phrasings():
+    jd = "Requirements: 5+ years of experience in Python; at least 3 years with AWS; minimum 2 yrs using Docker; Kubernetes: 4 years"
+    requirements = extract_jd_requirements(jd)
+    # The phrase before a number is whatever letters precede it, as with the old patterns
+    assert {skill: r["years"] for skill, r in requirements.items()} == {
+        "python": 5, "aws": 3, "docker": 2, "kubernetes": 4, "requirements": 5, "at least": 3, "minimum": 2,
+    }
+    assert requirements["aws"]["is_minimum"] and requirements["docker"]["context"].startswith("experience in python")
+
+    resume = "Spring framework Rest, Boot, MVC 6 years. 4 years with Django; react - 2 yrs"
+    assert [extract_experience_years(resume, skill) for skill in ("boot", "django", "React", "go")] == [6, 4, 2, 0]
+
+
+def adversarial_inputs(size):
+    prose = " ".join(random.Random(size).choice(["experience", "with", "team", "at", "least", "product"])
+                     for _ in range(size // 7))
+    return [
+        prose,  # Number-sparse posting
+        "a" * size,
+        " " * size + "5",
+        "-" * size + "x",
+        "experience " * (size // 11),
+        "python " * (size // 7) + ": 5",
+        "at least " * (size // 9) + "5",
+        "1 " * (size // 2),
+        "5 " + "+" * size,
+        "x 1" * (size // 3),
+        ("word, " * (size // 6))[:size],
+    ]
+
+
+def lines_executed(text):
+    """Lines of backend/main.py run to parse `text`: a measure of work that is the same on every machine"""
+    main._tokenize.cache_clear()
+    count = 0
+
+    def tracer(frame, event, arg):
+        nonlocal count
+        if frame.f_code.co_filename != main.__file__:
+            return None
+        if event == "line":
+            count += 1
+        return tracer
+
+    sys.settrace(tracer)
+    try:
+        extract_jd_requirements(text)
+        extract_experience_years(text, "python")
+        extract_experience_years(text, "-")
+        main.calculate_experience_score(text, text, ["python", "experience"])
+    finally:
+        sys.settrace(None)
+    return count
+
+
+def test_adversarial_postings_parse_in_linear_time():
+    # The regular expressions took minutes on some of these. Quadrupling the input may quadruple the
+    # scanners' work, but quadratic scanning would multiply it by 16
+    for small, large in zip(adversarial_inputs(2500), adversarial_inputs(10_000)):
+        assert lines_executed(large) <= 4.5 * lines_executed(small) + 1000, large[:40]
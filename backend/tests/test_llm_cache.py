@@ -0,0 +1,50 @@
+import json
+import time
+
+from backend.main import ResponseCache
+
+
+def test_cache_round_trip_ttl_and_eviction(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResponseCache(path, ttl=60, max_bytes=10_000, compress=True)
+    value = json.dumps({"content": "Python " * 200}).encode()
+    cache.put("a", value)
+    assert cache.get("a") == value
+    assert cache.get("missing") is None
+
+    # Uncompressed writers and compressed readers share the file
+    plain = ResponseCache(path, ttl=60, max_bytes=10_000, compress=False)
+    plain.put("b", b"plain")
+    assert cache.get("b") == b"plain" and plain.get("a") == value
+
+    expiring = ResponseCache(path, ttl=0.05, compress=False)
+    time.sleep(0.1)
+    assert expiring.get("a") is None and len(expiring) == 1
+
+    # Least recently used entries go first once the size bound is exceeded
+    small = ResponseCache(str(tmp_path / "small.sqlite3"), ttl=60, max_bytes=3000, compress=False)
+    for i in range(3):
+        small.put(f"k{i}", bytes(900))
+        time.sleep(0.01)
+    small.get("k0")
+    small.put("k3", bytes(900))
+    assert [small.get(f"k{i}") is not None for i in range(4)] == [True, False, True, True]
+
+
+def test_repeat_prompts_are_served_from_the_cache(app_db, services, monkeypatch, tmp_path):
+    main = app_db
+    monkeypatch.setattr(main, "LLM_CACHE_PATH", str(tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(main, "LLM_CACHE_BYPASS", {"resume_summary"})
+
+    resume = "Alex Morgan, senior Python developer with FastAPI"
+    first = [main.extract_skills_with_gpt(resume), main.extract_name_from_resume(resume),
+             main.generate_resume_summary(resume, "Python developer")]
+    second = [main.extract_skills_with_gpt(resume), main.extract_name_from_resume(resume),
+              main.generate_resume_summary(resume, "Python developer")]
+    assert first == second and "Python" in second[0]
+
+    # Skills and name are answered from the cache; the bypassed summary is not
+    calls = services.stats()["openai"]
+    assert calls["chat:skills"] == 1 and calls["chat:name"] == 1
+    assert calls["chat:summary"] == 2
+    assert main.stage_metrics.render().count("resume_evaluator_stage_cache_hits_total{") == 2
@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_load_benchmark_runs_offline(tmp_path):
+    output = tmp_path / "report.json"
+    subprocess.run(
+        [
+            sys.executable, "-m", "backend.benchmarks.load_test",
+            "--requests", "2", "--batch-size", "2", "--concurrency", "2",
+            "--corpus-size", "50", "--embedding-dim", "256", "--unique-resumes", "3",
+            "--chat-latency", "0", "--embedding-latency", "0",
+            "--workdir", str(tmp_path), "--output", str(output),
+        ],
+        cwd=REPO_ROOT,
+        check=True,
+        timeout=300,
+    )
+
+    report = json.loads(output.read_text())
+    assert report["requests"] == 2
+    assert report["resumes"] == 4
+    assert report["failed_requests"] == 0
+    assert report["resume_errors"] == 0
+    assert report["latency_s"]["p50"] <= report["latency_s"]["p99"]
+    assert report["resumes_per_s"] > 0
+    assert report["upstream_calls"]["openai"]["chat"] > 0
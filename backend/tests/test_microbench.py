@@ -0,0 +1,28 @@
+import json
+
+from backend.benchmarks import microbench
+
+
+def test_quick_run_covers_every_helper_and_gates_regressions(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    report = microbench.main(["--quick", "--save-baseline", str(baseline_path)])
+    helpers = {name.split("/")[0] for name in report["results"]}
+    assert helpers == {
+        "normalize_skill", "extract_experience_years", "calculate_experience_score", "extract_jd_requirements",
+        "extract_email_from_resume", "extract_text_from_pdf", "cosine_similarity", "search_similar_resumes",
+    }
+    assert all(result["seconds"] > 0 and result["relative"] > 0 for result in report["results"].values())
+
+    baseline = json.loads(baseline_path.read_text())
+    assert microbench.compare(report, baseline, tolerance=0.3) == []
+
+    # A baseline twice as fast as this run flags the case
+    name = "cosine_similarity/3072"
+    baseline["results"][name]["relative"] /= 2
+    regressions = microbench.compare(report, baseline, tolerance=0.3)
+    assert [regression["case"] for regression in regressions] == [name]
+    assert regressions[0]["slowdown"] == 2.0
+
+    baseline_path.write_text(json.dumps(baseline))
+    gated = microbench.main(["--quick", "--cases", "cosine", "--baseline", str(baseline_path), "--tolerance", "100"])
+    assert list(gated["results"]) == [name] and gated["regressions"] == []
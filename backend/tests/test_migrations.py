@@ -0,0 +1,29 @@
+from sqlalchemy import create_engine, inspect, text
+
+from backend.main import LATEST_SCHEMA_VERSION, migrate_database, schema_version
+
+
+def test_legacy_schema_is_migrated_once(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE resume_reports (id INTEGER PRIMARY KEY, filename VARCHAR, score_out_of_100 INTEGER)"
+        ))
+
+    assert schema_version(engine) == 0
+    assert migrate_database(engine) == LATEST_SCHEMA_VERSION
+    columns = {c["name"] for c in inspect(engine).get_columns("resume_reports")}
+    assert {"experience_score", "candidate_email", "firebase_uid", "created_at", "resume_embedding", "resume_sketch"} <= columns
+
+    # A second run only reads the version
+    assert migrate_database(engine) == LATEST_SCHEMA_VERSION
+    with engine.connect() as connection:
+        applied = connection.execute(text("SELECT COUNT(*) FROM schema_migrations")).scalar()
+    assert applied == LATEST_SCHEMA_VERSION
+
+
+def test_fresh_database_is_stamped_at_latest_version(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert migrate_database(engine) == LATEST_SCHEMA_VERSION
+    assert schema_version(engine) == LATEST_SCHEMA_VERSION
+    assert inspect(engine).has_table("resume_reports")
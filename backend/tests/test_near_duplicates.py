@@ -0,0 +1,49 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from backend.benchmarks.load_test import make_resume_pdf
+from backend.main import resume_sketch, sketch_similarity
+
+RESUME = " ".join(
+    f"Built service {i} in Python and FastAPI, cut latency by {i * 3} percent for team {i % 7}." for i in range(40)
+)
+
+
+def test_sketch_estimates_shingle_overlap():
+    sketch = resume_sketch(RESUME)
+    assert sketch.dtype == np.uint32 and len(sketch) == 64
+    assert np.array_equal(sketch, resume_sketch(RESUME.upper()))
+
+    edited = RESUME.replace("team 3.", "team 3. Phone +1 555 0100.", 1) + " Led the platform migration."
+    assert sketch_similarity(sketch, resume_sketch(edited)) > 0.85
+    assert sketch_similarity(sketch, resume_sketch("Registered nurse with ten years of ICU experience")) < 0.1
+
+
+def test_resubmitted_resume_reuses_the_stored_analysis(app_db, services, monkeypatch):
+    main = app_db
+    services.openai.embedding_noise = 0.01  # Every text embeds close to every other; the sketch must tell them apart
+    monkeypatch.setattr(main, "NEAR_DUPLICATE_REFRESH_SECONDS", 0)
+    client = TestClient(main.app)
+
+    def evaluate(text):
+        before = dict(services.stats()["openai"])
+        files = [("resume_pdfs", ("r.pdf", make_resume_pdf(text), "application/pdf"))]
+        report = client.post("/evaluate-resumes/", data={"job_description": "Python developer"},
+                             files=files).json()["reports"][0]
+        after = services.stats()["openai"]
+        return report, {k: after.get(k, 0) - before.get(k, 0) for k in after if k.startswith("chat:")}
+
+    original, original_calls = evaluate(RESUME)
+    assert original["near_duplicate_of"] is None
+    assert set(original_calls) == {"chat:name", "chat:skills", "chat:summary", "chat:job_role", "chat:skill_match"}
+
+    # Only the JD-dependent skill match is asked again (the other skills call is the JD's)
+    resubmitted, resubmitted_calls = evaluate(RESUME.replace("team 3.", "team 3. Phone +1 555 0100.", 1))
+    assert resubmitted["near_duplicate_of"] == original["id"]
+    assert {k: v for k, v in resubmitted_calls.items() if v} == {"chat:skills": 1, "chat:skill_match": 1}
+    for field in ("candidate_name", "skills_present", "resume_summary", "suggested_job_role", "score_out_of_100"):
+        assert resubmitted[field] == original[field]
+
+    # Similar embedding but different text: analyzed from scratch
+    other, other_calls = evaluate("Registered nurse with ten years of ICU experience and patient care")
+    assert other["near_duplicate_of"] is None and other_calls["chat:name"] == 1
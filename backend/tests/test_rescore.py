@@ -0,0 +1,63 @@
+import numpy as np
+
+from backend.main import combine_scores, score_status, score_statuses
+
+
+def reference_score(skill_score, experience_score, relevance_score, resume_text):
+    """The per-report scoring rules, as written before they were vectorized"""
+    final_score = skill_score * 0.4 + experience_score * 0.25 + relevance_score * 0.35
+    if skill_score < 30 and experience_score < 50:
+        final_score *= 0.92
+    elif skill_score > 80 and experience_score > 70 and relevance_score > 80:
+        final_score = min(final_score * 1.1, 100)
+    elif relevance_score > 85 and ("7+" in resume_text or "senior" in resume_text.lower()):
+        final_score = max(final_score, 78)
+    if "senior" in resume_text.lower() or "7+" in resume_text or "8+" in resume_text:
+        final_score += 5
+    return min(max(int(round(final_score)), 0), 100)
+
+
+def test_vectorized_scores_match_the_scalar_rules():
+    from backend.main import resume_markers
+
+    rng = np.random.default_rng(0)
+    texts = ["", "Senior engineer", "7+ years", "8+ years", "junior"]
+    skill = rng.uniform(0, 100, 2000)
+    experience = rng.uniform(0, 100, 2000)
+    relevance = rng.uniform(40, 95, 2000)
+    chosen = rng.integers(len(texts), size=2000)
+    markers = np.array([resume_markers(texts[i]) for i in chosen])
+
+    scores = combine_scores(skill, experience, relevance, markers)
+    expected = [reference_score(s, e, r, texts[i]) for s, e, r, i in zip(skill, experience, relevance, chosen)]
+    assert scores.tolist() == expected
+    assert score_statuses(scores).tolist() == [score_status(s) for s in expected]
+
+
+def test_rescore_updates_changed_reports_only(app_db, monkeypatch):
+    main = app_db
+    session = main.get_session()
+    session.add_all([
+        main.ResumeReport(filename="a.pdf", skill_match_score=90, experience_score=80, relevance_score=60,
+                          resume_markers=0, score_out_of_100=70, status="Good Match"),
+        main.ResumeReport(filename="b.pdf", skill_match_score=50, experience_score=50, relevance_score=50,
+                          resume_markers=main.MARKER_SENIOR, score_out_of_100=55, status="Needs Improvement"),
+        main.ResumeReport(filename="legacy.pdf", skill_match_score=90, experience_score=90, score_out_of_100=70,
+                          status="Good Match"),
+    ])
+    session.commit()
+    session.close()
+
+    # a: 90*.4 + 80*.25 + 60*.35 = 77 replaces the stale 70; b: 50 + 5 senior bonus = 55 is current
+    assert main.rescore_reports(batch_size=1) == {"rescored": 2, "updated": 1, "skipped": 1}
+    # New weights: a = 90*.6 + 80*.2 + 60*.2 = 82, b = 30 + 10 + 10 + 5 = 55 again
+    monkeypatch.setattr(main, "SKILL_WEIGHT", 0.6)
+    monkeypatch.setattr(main, "EXPERIENCE_WEIGHT", 0.2)
+    monkeypatch.setattr(main, "RELEVANCE_WEIGHT", 0.2)
+    assert main.rescore_reports(batch_size=1) == {"rescored": 2, "updated": 1, "skipped": 1}
+
+    # The report without stored signals is left alone
+    session = main.get_session()
+    rows = [(r.score_out_of_100, r.status) for r in session.query(main.ResumeReport).order_by(main.ResumeReport.id)]
+    session.close()
+    assert rows == [(82, "Excellent Match"), (55, "Needs Improvement"), (70, "Good Match")]
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+
+from backend.scrape_resumes import extract_document, scrape
+
+RESUMES_PER_PAGE = 3
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """LiveCareer-shaped search and resume pages"""
+
+    hits = {}
+    lock = threading.Lock()
+    fail_once = {"/resume/teacher-1-0"}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        with self.lock:
+            self.hits[url.path] = self.hits.get(url.path, 0) + 1
+            first_hit = self.hits[url.path] == 1
+        if url.path == "/resume-search/search":
+            query = parse_qs(url.query)
+            job, page = query["jt"][0], query["pg"][0]
+            items = "".join(
+                f'<li><a rel="ugc" href="/resume/{job}-{page}-{i}">Resume {i}</a></li>' for i in range(RESUMES_PER_PAGE)
+            )
+            body = f'<html><body><ul>{items}<li><a href="/about">About</a></li></ul></body></html>'
+        elif url.path.startswith("/resume/"):
+            if url.path in self.fail_once and first_hit:
+                self.send_response(503)
+                self.end_headers()
+                return
+            name = url.path.rsplit("/", 1)[1]
+            body = (
+                '<html><body><div class="nav"><div>menu</div></div>'
+                f'<div id="document"><div class="section"><h2>Summary</h2><p>{name} résumé</p></div>'
+                f'<div><p>Skills: Python</p></div></div><div id="footer">footer</div></body></html>'
+            )
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def test_extract_document_matches_full_parse():
+    html = '<div id="top"><div>x</div></div><DIV id="document"><div><b>A</b>&amp; B</div></DIV><div>tail</div>'
+    raw, text = extract_document(html)
+    assert raw.startswith('<div id="document">') and "tail" not in raw
+    assert text.split() == ["A", "&", "B"]
+    assert extract_document("<html><body>no resume</body></html>") == ("", "")
+
+
+def test_scraper_resumes_from_checkpoint(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    options = dict(output_dir=str(tmp_path), base_url=base_url, concurrency=4, delay=0, shard_size=2, fmt="parquet")
+    try:
+        # An interrupted run: only part of the resumes get scraped
+        asyncio.run(scrape(["HR", "Teacher"], 2, limit=5, **options))
+        searched = {path: n for path, n in FixtureHandler.hits.items() if path.startswith("/resume-search")}
+        path = asyncio.run(scrape(["HR", "Teacher"], 2, **options))
+    finally:
+        server.shutdown()
+
+    df = pd.read_csv(path)
+    assert len(df) == 2 * 2 * RESUMES_PER_PAGE
+    assert df["link"].is_unique
+    assert set(df["Category"]) == {"hr", "teacher"}
+    assert df["Resume"].str.contains("Skills: Python").all()
+    assert not df["Raw_html"].str.contains("footer").any()
+    # Search pages weren't fetched again and no resume was scraped twice (the 503 was retried)
+    assert searched == {"/resume-search/search": 4}
+    resume_hits = {p: n for p, n in FixtureHandler.hits.items() if p.startswith("/resume/")}
+    assert len(resume_hits) == 12
+    assert all(n == (2 if p in FixtureHandler.fail_once else 1) for p, n in resume_hits.items())
@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+
+from fastapi.testclient import TestClient
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def run_python(code: str, env: dict) -> str:
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env={"PATH": os.environ.get("PATH", ""), "PYTHONPATH": REPO_ROOT, **env},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+
+def test_import_without_credentials_does_not_touch_external_services():
+    # Needs a fresh interpreter: the in-process tests import these modules into this one
+    out = run_python(
+        "import sys, json, backend.main; "
+        "print(json.dumps([m for m in ('openai', 'firebase_admin', 'google.cloud.firestore', 'gdown') "
+        "if m in sys.modules]))",
+        env={},
+    )
+    assert json.loads(out) == []
+
+
+def test_readiness_reports_each_dependency(app_db, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    for name in ("FIREBASE_CREDENTIALS_PATH", "FIREBASE_PROJECT_ID", "FIREBASE_PRIVATE_KEY", "FIREBASE_CLIENT_EMAIL"):
+        monkeypatch.delenv(name, raising=False)
+
+    response = TestClient(app_db.app).get("/ready")
+    dependencies = response.json()["dependencies"]
+    assert response.status_code == 200
+    assert dependencies["database"]["status"] == "ok"
+    assert dependencies["openai"]["status"] == "ok"
+    assert dependencies["firebase"]["status"] == "error"
+    assert dependencies["firestore"]["status"] == "error"
+    assert set(dependencies) >= {"smtp", "corpus"}